@@ -0,0 +1,263 @@
+"""Benchmarks of the simulation hot paths.
+
+Usage:
+    python -m benchmarks.bench --output results.json
+    python -m benchmarks.bench --baseline benchmarks/baseline.json --threshold 0.25
+
+Every benchmark reports the best and median wall time (in s) of one call over
+repeated runs. Compared to a baseline, a benchmark regresses when its best time
+exceeds the baseline's by more than the threshold (relative, e.g. 0.25 = 25%), in
+which case the exit code is 1.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import typing
+
+import numpy as np
+import scipy
+
+import insilicho
+
+# Relative slowdown tolerated before a benchmark counts as a regression.
+DEFAULT_THRESHOLD = 0.25
+
+CFG_DICT = {"parameters": {"K_lys": "0.05 1/h"}, "initial_conditions": {"V": 0.025}}
+
+IMPORT = """
+import time
+t0 = time.perf_counter()
+import numpy, scipy.integrate
+t1 = time.perf_counter()
+import insilicho.run
+print(time.perf_counter() - t1)
+"""
+
+
+def constant_feed(time):
+    return 0.003
+
+
+def bolus_feed(time, bolus_size=0.03, num_bolus=10, bolus_frequency=24):
+    """The tent-function bolus feed of tests/conftest.py."""
+
+    def tentfunc(t):
+        return max(0, 1 - abs(t))
+
+    N = 10.0
+    return bolus_size * sum(
+        N * tentfunc(N * (time - (i + 1) * bolus_frequency)) for i in range(num_bolus)
+    )
+
+
+def temp(time):
+    return 36.4
+
+
+def scenario(
+    feed_fn: typing.Callable, solver_max_step_size: float = np.inf
+) -> typing.Dict[str, typing.Any]:
+    """Inputs of solver.solve as run.GrowCHO.execute passes them."""
+    from insilicho import run
+
+    model = run.GrowCHO(
+        CFG_DICT,
+        feed_fn=feed_fn,
+        temp_fn=temp,
+        solver_max_step_size=solver_max_step_size,
+    )
+    return dict(
+        params=model.params,
+        initial_conditions=model.initial_conditions,
+        tspan=np.linspace(0, 24 * model.params.Ndays, 1000 * model.params.Ndays),
+        feed_fn=feed_fn,
+        temp_fn=temp,
+        solver_hmax=solver_max_step_size,
+    )
+
+
+def benchmarks() -> (
+    typing.Dict[str, typing.Tuple[typing.Callable[[], typing.Any], int]]
+):
+    """Benchmarked callables, with the number of calls per timed run."""
+    from insilicho import growth_model, parameters, run, solver
+
+    constant = scenario(constant_feed)
+    bolus = scenario(bolus_feed, solver_max_step_size=0.1)
+    state, state_vars, _ = solver.solve(**constant)
+    args = constant["params"].tolist()
+    y0 = np.array(constant["initial_conditions"].tolist(), dtype=float)
+    out = np.empty(len(y0))
+    flat = growth_model.flat_parameters(constant["params"])
+
+    return {
+        "model_call": (
+            lambda: growth_model.model(1.0, y0, args, constant_feed, temp),
+            1000,
+        ),
+        "kernel_call": (
+            lambda: growth_model.kernel(1.0, y0, flat, constant_feed, temp, out),
+            1000,
+        ),
+        "solve_constant_feed": (lambda: solver.solve(**constant), 1),
+        "solve_bolus_feed": (lambda: solver.solve(**bolus), 1),
+        "state_vars": (
+            lambda: growth_model.state_vars_array(
+                constant["tspan"], state, constant["params"], constant_feed, temp
+            ),
+            10,
+        ),
+        "flex2_sampling": (
+            lambda: run.flex2_sampling(
+                state, state_vars, constant["params"], constant["tspan"], 0.05
+            ),
+            100,
+        ),
+        "parameters_with_units": (
+            lambda: parameters.InputParameters(
+                mu_max="0.043 1/h", K_lys="0.05 1/h", k_glc="0.2 mM", q_mab="0.3 ng/h"
+            ),
+            100,
+        ),
+    }
+
+
+def import_time() -> float:
+    """Import time (in s) of insilicho on top of numpy and scipy, in a fresh
+    interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT], capture_output=True, check=True, text=True
+    )
+    return float(out.stdout)
+
+
+def run_benchmarks(
+    repeat: int = 5, only: typing.Optional[typing.Sequence[str]] = None
+) -> typing.Dict[str, typing.Any]:
+    """Times all benchmarks.
+
+    Args:
+        repeat (int, optional): Number of timed runs per benchmark. Defaults to 5.
+        only (typing.Optional[typing.Sequence[str]], optional): Names of the
+            benchmarks to run. Defaults to None (all).
+
+    Returns:
+        typing.Dict[str, typing.Any]: "meta" describing the environment and "results"
+            with, per benchmark, the best and median time of one call (in s).
+    """
+    results = {}
+    for name, (fn, number) in benchmarks().items():
+        if only and name not in only:
+            continue
+        fn()  # warm up caches
+        times = [t / number for t in timeit.repeat(fn, number=number, repeat=repeat)]
+        results[name] = {
+            "best": min(times),
+            "median": statistics.median(times),
+            "number": number,
+            "repeat": repeat,
+        }
+    if not only or "import_time" in only:
+        times = [import_time() for _ in range(repeat)]
+        results["import_time"] = {
+            "best": min(times),
+            "median": statistics.median(times),
+            "number": 1,
+            "repeat": repeat,
+        }
+
+    return {
+        "meta": {
+            "insilicho": insilicho.__version__,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "scipy": scipy.__version__,
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: typing.Dict[str, typing.Any],
+    baseline: typing.Dict[str, typing.Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    thresholds: typing.Optional[typing.Dict[str, float]] = None,
+) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    """Compares best times to a baseline.
+
+    Args:
+        current (typing.Dict[str, typing.Any]): Output of `run_benchmarks`.
+        baseline (typing.Dict[str, typing.Any]): Output of an earlier
+            `run_benchmarks`.
+        threshold (float, optional): Tolerated relative slowdown. Defaults to
+            DEFAULT_THRESHOLD.
+        thresholds (typing.Optional[typing.Dict[str, float]], optional): Tolerated
+            relative slowdown per benchmark, overriding `threshold`. Defaults to None.
+
+    Returns:
+        typing.Dict[str, typing.Dict[str, typing.Any]]: Per benchmark present in both,
+            the time ratio to the baseline and whether it regressed.
+    """
+    thresholds = thresholds or {}
+    report = {}
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        ratio = result["best"] / baseline["results"][name]["best"]
+        report[name] = {
+            "ratio": ratio,
+            "regressed": ratio > 1 + thresholds.get(name, threshold),
+        }
+    return report
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="json file to write results to")
+    parser.add_argument("--baseline", help="json results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--benchmark-threshold",
+        action="append",
+        default=[],
+        metavar="NAME=THRESHOLD",
+        help="threshold for a single benchmark, may be repeated",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="benchmarks to run")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(repeat=args.repeat, only=args.only)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+
+    report: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        thresholds = {
+            name: float(value)
+            for name, value in (t.split("=") for t in args.benchmark_threshold)
+        }
+        report = compare(current, baseline, args.threshold, thresholds)
+
+    for name, result in current["results"].items():
+        line = f"{name:<24}{result['best'] * 1e6:>14.1f} us"
+        if name in report:
+            flag = "  REGRESSED" if report[name]["regressed"] else ""
+            line += f"{report[name]['ratio']:>8.2f}x{flag}"
+        print(line)
+    return int(any(r["regressed"] for r in report.values()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
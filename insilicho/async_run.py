@@ -0,0 +1,231 @@
+import asyncio
+import concurrent.futures
+import dataclasses
+import hashlib
+import json
+import threading
+import types
+import typing
+
+import insilicho
+from insilicho import parallel, run
+
+ResultType = typing.Tuple[typing.Dict[str, typing.Any], types.SimpleNamespace]
+
+
+class SimulationCancelled(Exception):
+    """Raised inside a solve whose request was cancelled."""
+
+
+class AsyncRunner:
+    """Executes GrowCHO jobs from asyncio code without blocking the event loop.
+
+    Solves run on a thread pool, at most `max_concurrency` at a time; the rest wait
+    their turn. Cancelling a request (e.g. `task.cancel()` when the inputs it was
+    made for change) frees its slot right away if it has not started, and otherwise
+    aborts the solve at its next feed/temp evaluation. Identical requests in flight
+    share one computation, which is only cancelled once all of them are.
+
+    Example:
+        async with AsyncRunner(max_concurrency=2) as runner:
+            sampled, full_result = await runner.execute(parallel.Job(cfg, F, T))
+    """
+
+    def __init__(self, max_concurrency: int = 4):
+        """
+        Args:
+            max_concurrency (int, optional): Maximum number of solves running at
+                once. Defaults to 4.
+
+        Raises:
+            ValueError: If `max_concurrency` is not positive.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="insilicho"
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight: typing.Dict[str, _Flight] = {}
+        self.computations = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct computations that are queued or running."""
+        return len(self._in_flight)
+
+    async def execute(self, job: parallel.Job, random_seed: int = 0) -> ResultType:
+        """Executes `job`, see run.GrowCHO and run.GrowCHO.execute.
+
+        Args:
+            job (parallel.Job): Configuration to execute.
+            random_seed (int, optional): Random seed of the run, see run.GrowCHO.
+                Defaults to 0.
+
+        Raises:
+            IOError: If initial conditions were not supplied.
+            ValueError: If the job's execute_kwargs are invalid.
+            RuntimeError: If integration/LSODA solver runs into failures.
+            SimulationCancelled: If the runner was shut down during the solve.
+
+        Returns:
+            ResultType: The sampled result and the full result. Coalesced requests
+                receive the same objects, which must therefore not be modified.
+        """
+        key = request_key(job, random_seed)
+        flight = self._in_flight.get(key) if key else None
+        if flight is None:
+            flight = self._start(job, random_seed, key)
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                self._cancel(flight)
+
+    def _start(
+        self, job: parallel.Job, random_seed: int, key: typing.Optional[str]
+    ) -> "_Flight":
+        flight = _Flight(key, threading.Event())
+        flight.task = asyncio.ensure_future(self._run(job, random_seed, flight))
+        if key:
+            self._in_flight[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(flight))
+        return flight
+
+    async def _run(
+        self, job: parallel.Job, random_seed: int, flight: "_Flight"
+    ) -> ResultType:
+        async with self._semaphore:
+            self.computations += 1
+            future = asyncio.get_running_loop().run_in_executor(
+                self._executor, _execute, job, random_seed, flight.cancelled
+            )
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                flight.cancelled.set()
+                # hold the slot until the solve has actually stopped
+                await asyncio.wait([future])
+                raise
+
+    def _cancel(self, flight: "_Flight"):
+        # later identical requests start afresh
+        self._forget(flight)
+        flight.cancelled.set()
+        flight.task.cancel()
+
+    def _forget(self, flight: "_Flight"):
+        if flight.key and self._in_flight.get(flight.key) is flight:
+            del self._in_flight[flight.key]
+
+    def shutdown(self, wait: bool = True):
+        """Stops the thread pool, see concurrent.futures.Executor.shutdown."""
+        for flight in list(self._in_flight.values()):
+            flight.cancelled.set()
+        self._executor.shutdown(wait=wait)
+
+    async def __aenter__(self) -> "AsyncRunner":
+        return self
+
+    async def __aexit__(self, *exc_info: typing.Any):
+        self.shutdown(wait=False)
+
+
+def request_key(job: parallel.Job, random_seed: int = 0) -> typing.Optional[str]:
+    """Stable hash identifying the result of `job`.
+
+    Like cache.ResultCache.make_key, jobs whose feed/temp are plain callables
+    rather than profiles (see insilicho.profiles), or whose settings are not json
+    serializable, cannot be keyed, and None is returned.
+
+    Args:
+        job (parallel.Job): Configuration to execute.
+        random_seed (int, optional): Random seed of the run. Defaults to 0.
+
+    Returns:
+        typing.Optional[str]: Hex digest, or None if the job cannot be keyed.
+    """
+    fields = {}
+    for field in dataclasses.fields(job):
+        value = getattr(job, field.name)
+        if field.name in ("feed_fn", "temp_fn") and value is not None:
+            if not hasattr(value, "to_config"):
+                return None
+            value = value.to_config()
+        fields[field.name] = value
+
+    payload = {
+        "insilicho": insilicho.__version__,
+        "job": fields,
+        "random_seed": random_seed,
+    }
+    try:
+        encoded = json.dumps(payload, sort_keys=True, default=_encode).encode()
+    except TypeError:
+        return None
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@dataclasses.dataclass
+class _Flight:
+    """A computation shared by `waiters` identical requests."""
+
+    key: typing.Optional[str]
+    cancelled: threading.Event
+    task: "asyncio.Future[ResultType]" = dataclasses.field(init=False)
+    waiters: int = 0
+
+
+class _Cancellable:
+    """Feed or temp profile that aborts the solve once `cancelled` is set.
+
+    Other attributes are looked up on the wrapped profile, so breakpoints and the like
+    are still seen by the solver.
+    """
+
+    def __init__(self, fn: typing.Callable, cancelled: threading.Event):
+        self.fn = fn
+        self.cancelled = cancelled
+
+    def __call__(self, t: typing.Any) -> typing.Any:
+        if self.cancelled.is_set():
+            raise SimulationCancelled()
+        return self.fn(t)
+
+    def __getattr__(self, name: str) -> typing.Any:
+        if name == "fn":
+            raise AttributeError(name)
+        return getattr(self.fn, name)
+
+
+def _execute(
+    job: parallel.Job, random_seed: int, cancelled: threading.Event
+) -> ResultType:
+    if cancelled.is_set():
+        raise SimulationCancelled()
+    model = run.GrowCHO(
+        job.config,
+        feed_fn=job.feed_fn,
+        temp_fn=job.temp_fn,
+        random_seed=random_seed,
+        param_rel_stddev=job.param_rel_stddev,
+        solver_max_step_size=job.solver_max_step_size,
+        solver_method=job.solver_method,
+        solver_rtol=job.solver_rtol,
+        solver_atol=job.solver_atol,
+    )
+    if model.feed_fn is not None:
+        model.feed_fn = _Cancellable(model.feed_fn, cancelled)
+    if model.temp_fn is not None:
+        model.temp_fn = _Cancellable(model.temp_fn, cancelled)
+    sampled = model.execute(**job.execute_kwargs)
+    return sampled, model.full_result
+
+
+def _encode(value: typing.Any) -> typing.Any:
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Cannot key {type(value).__name__}")
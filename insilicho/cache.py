@@ -0,0 +1,222 @@
+import collections
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import types
+import typing
+
+import numpy as np
+
+import insilicho
+
+# Bump whenever a change to the model or solver alters results, so cached results
+# from older versions are never served.
+MODEL_VERSION = 1
+
+
+@dataclasses.dataclass
+class CacheStats:
+    hits: int = 0  # served from memory
+    disk_hits: int = 0  # served from the on-disk tier
+    misses: int = 0
+    bypasses: int = 0  # runs that could not be keyed, see `make_key`
+
+
+class ResultCache:
+    """Content-addressed cache of full simulation results.
+
+    Results are kept in a bounded in-memory LRU tier and, optionally, in an on-disk
+    tier of npz files that several processes can share. Cached arrays are read-only.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        directory: typing.Optional[str] = None,
+        model_version: typing.Any = MODEL_VERSION,
+    ):
+        """
+        Args:
+            maxsize (int, optional): Max number of results held in memory. Defaults to
+                128.
+            directory (typing.Optional[str], optional): Directory of the on-disk tier,
+                created if missing. Defaults to None (memory only).
+            model_version (typing.Any, optional): Version folded into every key;
+                changing it invalidates all previously cached results. Defaults to
+                MODEL_VERSION.
+        """
+        self.maxsize = maxsize
+        self.directory = directory
+        self.model_version = model_version
+        self.stats = CacheStats()
+        self._memory: typing.OrderedDict[str, types.SimpleNamespace] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def make_key(
+        self,
+        params: typing.Any,
+        initial_conditions: typing.Any,
+        tspan: np.ndarray,
+        feed_fn: typing.Any,
+        temp_fn: typing.Any,
+        **settings: typing.Any,
+    ) -> typing.Optional[str]:
+        """Stable hash of everything that determines a full result.
+
+        Profiles are keyed by their definition (`to_config()`). Other callables cannot
+        be keyed reliably (their result may depend on globals or closures), in which
+        case None is returned and the run should bypass the cache.
+
+        Args:
+            params (typing.Any): Resolved parameters.InputParameters.
+            initial_conditions (typing.Any): Resolved parameters.InitialConditions.
+            tspan (np.ndarray): Output time points.
+            feed_fn (typing.Any): Feed profile.
+            temp_fn (typing.Any): Temp profile.
+            **settings (typing.Any): Solver settings and any further inputs, e.g.
+                boluses; values must be json serializable or expose `tolist()`.
+
+        Returns:
+            typing.Optional[str]: Hex digest, or None if the run cannot be keyed.
+        """
+        profiles = []
+        for fn in [feed_fn, temp_fn]:
+            if not hasattr(fn, "to_config"):
+                return None
+            profiles.append(fn.to_config())
+
+        payload = {
+            "insilicho": insilicho.__version__,
+            "model_version": self.model_version,
+            "params": params.tolist(),
+            "initial_conditions": initial_conditions.tolist(),
+            "tspan": hashlib.sha256(
+                np.ascontiguousarray(tspan, dtype=float).tobytes()
+            ).hexdigest(),
+            "profiles": profiles,
+            "settings": settings,
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=_encode).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> typing.Optional[types.SimpleNamespace]:
+        """Cached result for `key`, or None (counted as a miss)."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats.hits += 1
+                return self._memory[key]
+
+        result = self._load(key)
+        with self._lock:
+            if result is None:
+                self.stats.misses += 1
+                return None
+            self.stats.disk_hits += 1
+            self._remember(key, result)
+        return result
+
+    def put(self, key: str, result: types.SimpleNamespace):
+        """Stores a read-only copy of a full result (state, state_vars, t, info)
+        under `key`."""
+        result = _frozen(result, copy=True)
+        with self._lock:
+            self._remember(key, result)
+        if self.directory:
+            self._store(key, result)
+
+    def bypass(self):
+        """Counts a run that could not be keyed, see `make_key`."""
+        with self._lock:
+            self.stats.bypasses += 1
+
+    def clear(self, disk: bool = True):
+        """Drops all cached results, including the on-disk tier if `disk`."""
+        with self._lock:
+            self._memory.clear()
+        if disk and self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith(".npz"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def __len__(self):
+        return len(self._memory)
+
+    def _remember(self, key: str, result: types.SimpleNamespace):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(typing.cast(str, self.directory), f"{key}.npz")
+
+    def _store(self, key: str, result: types.SimpleNamespace):
+        arrays = {"state": result.state, "state_vars": result.state_vars, "t": result.t}
+        arrays.update({f"info_{k}": np.asarray(v) for k, v in result.info.items()})
+        # write then rename, so concurrent readers never see partial files
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _load(self, key: str) -> typing.Optional[types.SimpleNamespace]:
+        if not self.directory or not os.path.exists(self._path(key)):
+            return None
+        with np.load(self._path(key)) as data:
+            info = {
+                k.removeprefix("info_"): data[k]
+                for k in data.files
+                if k.startswith("info_")
+            }
+            info["message"] = str(info["message"])
+            if "method" in info:
+                info["method"] = str(info["method"])
+            return _frozen(
+                types.SimpleNamespace(
+                    state=data["state"],
+                    state_vars=data["state_vars"],
+                    t=data["t"],
+                    info=info,
+                )
+            )
+
+
+def _frozen(result: types.SimpleNamespace, copy: bool = False) -> types.SimpleNamespace:
+    """`result` with read-only arrays, copied first if `copy`."""
+
+    def freeze(value: typing.Any) -> typing.Any:
+        if not isinstance(value, np.ndarray):
+            return value
+        if copy:
+            value = value.copy()
+        value.setflags(write=False)
+        return value
+
+    return types.SimpleNamespace(
+        state=freeze(result.state),
+        state_vars=freeze(result.state_vars),
+        t=freeze(result.t),
+        info={k: freeze(v) for k, v in result.info.items()},
+    )
+
+
+def _encode(value: typing.Any) -> typing.Any:
+    if hasattr(value, "to_config"):
+        return value.to_config()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)  # type: ignore[arg-type]
+    raise TypeError(f"Cannot build a cache key from {value!r}")
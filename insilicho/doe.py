@@ -0,0 +1,392 @@
+import concurrent.futures
+import copy
+import dataclasses
+import hashlib
+import json
+import os
+import typing
+
+import numpy as np
+
+from insilicho import growth_model, parameters, profiles, results, run
+
+# Factors besides the float fields of parameters.InputParameters and
+# parameters.InitialConditions: a constant feed rate (in L/h) and a constant
+# temperature setpoint (in degC), replacing the feed and temp profiles.
+PROFILE_FACTORS = ("feed", "temp")
+DESIGNS = ("full_factorial", "latin_hypercube", "sobol")
+
+_PARAMETER_FACTORS = tuple(
+    f.name
+    for f in dataclasses.fields(parameters.InputParameters)
+    if f.type == typing.Union[float, str]
+)
+_INITIAL_CONDITION_FACTORS = growth_model.STATE_NAMES
+
+
+@dataclasses.dataclass
+class Factor:
+    """A quantity varied by a design, and its range.
+
+    Attributes:
+        name: A float field of parameters.InputParameters or
+            parameters.InitialConditions, or one of PROFILE_FACTORS.
+        low: Lower bound, in the units of the field (see its units_map).
+        high: Upper bound.
+        log: Whether to spread values logarithmically, e.g. for rate constants
+            spanning decades.
+    """
+
+    name: str
+    low: float
+    high: float
+    log: bool = False
+
+
+def design(
+    factors: typing.Sequence[Factor],
+    kind: str = "latin_hypercube",
+    n: typing.Optional[int] = None,
+    levels: int = 3,
+    seed: typing.Optional[int] = 0,
+) -> np.ndarray:
+    """Design points over the ranges of `factors`.
+
+    Args:
+        factors (typing.Sequence[Factor]): Factors to vary.
+        kind (str, optional): One of DESIGNS. Defaults to "latin_hypercube".
+        n (typing.Optional[int], optional): Number of points of "latin_hypercube" and
+            "sobol" designs; Sobol designs are balanced for powers of 2. Defaults to
+            None.
+        levels (int, optional): Levels of every factor in "full_factorial" designs,
+            evenly spread from low to high. Defaults to 3.
+        seed (typing.Optional[int], optional): Seed of the randomized designs.
+            Defaults to 0.
+
+    Raises:
+        ValueError: If the design kind or a factor is invalid, or `n` is missing.
+
+    Returns:
+        np.ndarray: Design of shape (n_points, len(factors)), in the units of the
+            factors.
+    """
+    _check_factors(factors)
+    if kind == "full_factorial":
+        grids = np.meshgrid(
+            *[np.linspace(0.0, 1.0, levels)] * len(factors), indexing="ij"
+        )
+        unit = np.stack([g.ravel() for g in grids], axis=-1)
+    elif kind in ["latin_hypercube", "sobol"]:
+        if n is None:
+            raise ValueError(f"Number of points required for {kind} designs")
+        from scipy.stats import qmc
+
+        sampler = (
+            qmc.LatinHypercube(len(factors), seed=seed)
+            if kind == "latin_hypercube"
+            else qmc.Sobol(len(factors), seed=seed)
+        )
+        unit = sampler.random(n)
+    else:
+        raise ValueError(f"Unknown design: {kind}")
+
+    low = np.array([f.low for f in factors], dtype=float)
+    high = np.array([f.high for f in factors], dtype=float)
+    log = np.array([f.log for f in factors])
+    low[log], high[log] = np.log(low[log]), np.log(high[log])
+    points = low + unit * (high - low)
+    points[:, log] = np.exp(points[:, log])
+    return points
+
+
+@dataclasses.dataclass
+class _Settings:
+    """Everything a worker needs to run a design point, besides its values."""
+
+    config: typing.Dict[str, typing.Any]
+    factor_names: typing.List[str]
+    feed_fn: typing.Optional[growth_model.FeedFunctionType]
+    temp_fn: typing.Optional[growth_model.TempFunctionType]
+    param_rel_stddev: float
+    root_seed: typing.Optional[int]
+    model_kwargs: typing.Dict[str, typing.Any]
+
+
+class Sweep:
+    """A design run in parallel, with results written straight to disk.
+
+    A sweep lives in a directory holding the design ("design.npy"), the full results
+    of all points as results.Trajectories ("trajectories/") and a mask of the points
+    done ("done.npy"). Workers write their results into the memory-mapped
+    trajectories themselves, so nothing is pickled back; put the directory on a RAM
+    disk (e.g. under /dev/shm) to keep it all in shared memory. Points are only marked
+    done once their results are on disk, so an interrupted sweep resumes where it
+    stopped: `run` skips the points done.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        config: typing.Dict[str, typing.Any],
+        factors: typing.Sequence[Factor],
+        points: np.ndarray,
+        feed_fn: typing.Optional[growth_model.FeedFunctionType] = None,
+        temp_fn: typing.Optional[growth_model.TempFunctionType] = None,
+        output: typing.Optional[
+            typing.Union[typing.Sequence[float], np.ndarray]
+        ] = None,
+        record: typing.Optional[typing.Sequence[str]] = None,
+        dtype: typing.Any = np.float64,
+        param_rel_stddev: float = 0.0,
+        root_seed: typing.Optional[int] = 0,
+        model_kwargs: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    ):
+        """Creates the sweep in `directory`, or reopens the same sweep found there.
+
+        Args:
+            directory (str): Directory of the sweep, created if missing.
+            config (typing.Dict[str, typing.Any]): GrowCHO config (see run.GrowCHO)
+                the factors are set in.
+            factors (typing.Sequence[Factor]): Factors of the design. Varying Xv also
+                sets Xt, unless Xt is a factor too.
+            points (np.ndarray): Design of shape (n_points, len(factors)), see
+                `design`.
+            feed_fn (typing.Optional[growth_model.FeedFunctionType], optional): Feed
+                profile, unless "feed" is a factor; must be picklable. Defaults to the
+                profile of the config.
+            temp_fn (typing.Optional[growth_model.TempFunctionType], optional): Temp
+                profile, unless "temp" is a factor; must be picklable. Defaults to the
+                profile of the config.
+            output (typing.Optional[typing.Union[typing.Sequence[float], np.ndarray]],
+                optional): Time points (in hrs) of the results. Defaults to hourly
+                over the Ndays of the config.
+            record (typing.Optional[typing.Sequence[str]], optional): States and state
+                variables kept, see run.GrowCHO.execute. Defaults to None (all).
+            dtype (typing.Any, optional): Storage precision of the results. Defaults
+                to np.float64.
+            param_rel_stddev (float, optional): Relative std deviation of the
+                parameters of every point, see run.GrowCHO. Defaults to 0.0, i.e.
+                exactly the design values.
+            root_seed (typing.Optional[int], optional): Seed the per-point random
+                streams are spawned from, see parallel.run_many. Defaults to 0.
+            model_kwargs (typing.Optional[typing.Dict[str, typing.Any]], optional):
+                Further arguments of run.GrowCHO, e.g. solver settings. Defaults to
+                None.
+
+        Raises:
+            ValueError: If a factor is invalid, the points do not match the factors,
+                or the directory holds a different sweep, i.e. one of other factors,
+                points or settings.
+        """
+        _check_factors(factors)
+        points = np.asarray(points, dtype=float)
+        if points.ndim != 2 or points.shape[1] != len(factors):
+            raise ValueError(
+                f"Expected points of shape (n_points, {len(factors)}), got "
+                f"{points.shape}"
+            )
+        self.directory = directory
+        self.factors = list(factors)
+        self._settings = _Settings(
+            config=copy.deepcopy(config),
+            factor_names=[f.name for f in factors],
+            feed_fn=feed_fn,
+            temp_fn=temp_fn,
+            param_rel_stddev=param_rel_stddev,
+            root_seed=root_seed,
+            model_kwargs=dict(model_kwargs or {}),
+        )
+
+        if output is None:
+            Ndays = run.unpack(config)[0].Ndays
+            output = np.linspace(0, 24 * Ndays, 24 * Ndays + 1)
+        key = _settings_key(self._settings, output, record, dtype)
+
+        meta_path = os.path.join(directory, "sweep.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            if (
+                meta["factors"] != [dataclasses.asdict(f) for f in factors]
+                or meta.get("settings") != key
+                or not np.array_equal(np.load(self._path("design.npy")), points)
+            ):
+                raise ValueError(f"{directory} holds a different sweep")
+            self.trajectories = results.Trajectories.open(
+                self._path("trajectories"), mode="r+"
+            )
+            self.done = np.load(self._path("done.npy"), mmap_mode="r+")
+            return
+
+        os.makedirs(directory, exist_ok=True)
+        np.save(self._path("design.npy"), points)
+        self.trajectories = results.Trajectories.create(
+            self._path("trajectories"), len(points), output, names=record, dtype=dtype
+        )
+        self.done = np.lib.format.open_memmap(
+            self._path("done.npy"), mode="w+", dtype=bool, shape=(len(points),)
+        )
+        self.done.flush()
+        # written last: a directory without it is recreated from scratch
+        with open(meta_path, "w") as f:
+            json.dump(
+                {"factors": [dataclasses.asdict(f) for f in factors], "settings": key},
+                f,
+            )
+
+    @property
+    def points(self) -> np.ndarray:
+        """The design, of shape (n_points, n_factors)."""
+        return np.load(self._path("design.npy"))
+
+    @property
+    def pending(self) -> np.ndarray:
+        """Indices of the points not done yet."""
+        return np.flatnonzero(~np.asarray(self.done))
+
+    def values(self, i: int) -> typing.Dict[str, float]:
+        """Factor values of point `i`."""
+        return dict(zip(self._settings.factor_names, self.points[i].tolist()))
+
+    def run(self, max_workers: typing.Optional[int] = None) -> typing.Dict[int, str]:
+        """Runs the points not done yet across a process pool.
+
+        Args:
+            max_workers (typing.Optional[int], optional): Number of worker processes;
+                1 runs the points in this process. Defaults to the number of
+                processors on the machine.
+
+        Returns:
+            typing.Dict[int, str]: Errors of the points that failed (e.g. integration
+                failures), which stay pending.
+        """
+        pending = self.pending.tolist()
+        if not pending:
+            return {}
+        errors = {}
+        if max_workers == 1:
+            worker = _Worker(self.directory, self._settings)
+            for i in pending:
+                error = worker(i)
+                if error is not None:
+                    errors[i] = error
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(self.directory, self._settings),
+            ) as pool:
+                futures = {pool.submit(_run_point, i): i for i in pending}
+                for future in concurrent.futures.as_completed(futures):
+                    error = future.result()
+                    if error is not None:
+                        errors[futures[future]] = error
+        return dict(sorted(errors.items()))
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+
+class _Worker:
+    """Runs design points of a sweep, writing their results into its memory maps."""
+
+    def __init__(self, directory: str, settings: _Settings):
+        self.settings = settings
+        self.points = np.load(os.path.join(directory, "design.npy"))
+        self.trajectories = results.Trajectories.open(
+            os.path.join(directory, "trajectories"), mode="r+"
+        )
+        self.done = np.load(os.path.join(directory, "done.npy"), mmap_mode="r+")
+        self.seeds = np.random.SeedSequence(settings.root_seed).spawn(len(self.points))
+
+    def __call__(self, i: int) -> typing.Optional[str]:
+        try:
+            model = _model(self.settings, self.points[i], self.seeds[i])
+            model.execute(output=self.trajectories.t, record=self.trajectories.names)
+        except (RuntimeError, ValueError) as e:
+            return f"{type(e).__name__}: {e}"
+        self.trajectories[i] = model.full_result
+        self.trajectories.flush()
+        self.done[i] = True
+        self.done.flush()
+        return None
+
+
+_WORKER: typing.Optional[_Worker] = None
+
+
+def _init_worker(directory: str, settings: _Settings):
+    global _WORKER
+    _WORKER = _Worker(directory, settings)
+
+
+def _run_point(i: int) -> typing.Optional[str]:
+    assert _WORKER is not None
+    return _WORKER(i)
+
+
+def _model(
+    settings: _Settings, values: np.ndarray, seed: np.random.SeedSequence
+) -> run.GrowCHO:
+    """GrowCHO of a design point."""
+    config = copy.deepcopy(settings.config)
+    feed_fn, temp_fn = settings.feed_fn, settings.temp_fn
+    for name, value in zip(settings.factor_names, values.tolist()):
+        if name == "feed":
+            feed_fn = profiles.PiecewiseConstant([0.0], [value])
+        elif name == "temp":
+            temp_fn = profiles.PiecewiseConstant([0.0], [value])
+        elif name in _PARAMETER_FACTORS:
+            config.setdefault("parameters", {})[name] = value
+        else:
+            initial_conditions = config.setdefault("initial_conditions", {})
+            initial_conditions[name] = value
+            if name == "Xv" and "Xt" not in settings.factor_names:
+                initial_conditions["Xt"] = value
+    return run.GrowCHO(
+        config,
+        feed_fn=feed_fn,
+        temp_fn=temp_fn,
+        random_seed=np.random.default_rng(seed),
+        param_rel_stddev=settings.param_rel_stddev,
+        **settings.model_kwargs,
+    )
+
+
+def _settings_key(
+    settings: _Settings, output: typing.Any, record: typing.Any, dtype: typing.Any
+) -> str:
+    """Hash of the settings the results of a sweep depend on."""
+    payload = {
+        "settings": dataclasses.asdict(settings),
+        "output": np.asarray(output, dtype=float).tolist(),
+        "record": None if record is None else list(record),
+        "dtype": np.dtype(dtype).str,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=_describe).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _describe(value: typing.Any) -> typing.Any:
+    """Json stand-in for profiles, callables and arrays in sweep settings."""
+    if hasattr(value, "to_config"):
+        return value.to_config()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if callable(value):
+        name = getattr(value, "__qualname__", type(value).__qualname__)
+        return f"{value.__module__}.{name}"
+    return type(value).__name__
+
+
+def _check_factors(factors: typing.Sequence[Factor]):
+    names = [f.name for f in factors]
+    for f in factors:
+        if f.name not in (
+            _PARAMETER_FACTORS + _INITIAL_CONDITION_FACTORS + PROFILE_FACTORS
+        ):
+            raise ValueError(f"Unknown factor: {f.name}")
+        if not f.low <= f.high or (f.log and f.low <= 0):
+            raise ValueError(f"Invalid range of factor {f.name}: {f.low}, {f.high}")
+    if len(set(names)) != len(names):
+        raise ValueError(f"Factors given more than once: {names}")
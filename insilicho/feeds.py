@@ -0,0 +1,84 @@
+# mypy: disable-error-code=operator
+
+import dataclasses
+import typing
+
+import numpy as np
+
+from insilicho import parameters
+from insilicho.growth_model import STATE_NAMES
+
+# Cells are diluted by a bolus, species are mixed with the bolus composition. Coxygen
+# and pH are held constant by the model and are left untouched.
+DILUTED = ["Xv", "Xt"]
+MIXED = ["Cglc", "Cgln", "Clac", "Camm", "Cmab"]
+
+
+@dataclasses.dataclass
+class Bolus(parameters.UnitValidationMixin):
+    """An instantaneous feed addition.
+
+    Attributes:
+        time: Time of the addition, in hrs.
+        volume: Volume added, in L.
+        composition: Concentrations (mmol/L) of the species in the bolus, keyed by
+            state name (one of Cglc, Cgln, Clac, Camm, Cmab). Defaults to the
+            continuous feed composition, i.e. Cglc_feed and Cgln_feed.
+    """
+
+    time: typing.Union[float, str]
+    volume: typing.Union[float, str]
+    composition: typing.Optional[typing.Dict[str, float]] = None
+
+    def __post_init__(self):
+        super().__post_init__()
+        unknown = set(self.composition or {}) - set(MIXED)
+        if unknown:
+            raise ValueError(f"Bolus composition has unknown species: {unknown}")
+
+    @staticmethod
+    def units_map():
+        return {"time": "hr", "volume": "L"}
+
+
+def as_boluses(
+    boluses: typing.Optional[typing.Iterable[typing.Any]],
+) -> typing.List[Bolus]:
+    """Normalizes Bolus objects or (time, volume[, composition]) tuples, sorted by
+    time."""
+    return sorted(
+        (b if isinstance(b, Bolus) else Bolus(*b) for b in boluses or []),
+        key=lambda b: b.time,
+    )
+
+
+def apply_bolus(state: np.ndarray, bolus: Bolus, params: typing.Any) -> np.ndarray:
+    """Applies a bolus to the states as an exact volume and concentration jump.
+
+    Args:
+        state (np.ndarray): States before the bolus, following the order of
+            parameters.InitialConditions.
+        bolus (Bolus): Bolus to add.
+        params (typing.Any): Parameters of GrowCHO model, providing the default
+            Cglc_feed and Cgln_feed.
+
+    Returns:
+        np.ndarray: States right after the bolus.
+    """
+    composition = bolus.composition
+    if composition is None:
+        composition = {"Cglc": params.Cglc_feed, "Cgln": params.Cgln_feed}
+
+    V = state[STATE_NAMES.index("V")]
+    V_new = V + bolus.volume
+
+    new_state = np.array(state, dtype=float)
+    for name in DILUTED:
+        new_state[STATE_NAMES.index(name)] *= V / V_new
+    for name in MIXED:
+        i = STATE_NAMES.index(name)
+        new_state[i] = (
+            state[i] * V + composition.get(name, 0.0) * bolus.volume
+        ) / V_new
+    new_state[STATE_NAMES.index("V")] = V_new
+    return new_state
@@ -0,0 +1,354 @@
+import concurrent.futures
+import dataclasses
+import time
+import typing
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from insilicho import feeds, growth_model, parameters, solver
+from insilicho.chemistry import Species
+
+# Measured quantities as linear functions of the states, in the units of
+# run.flex2_sampling (cells in millions/mL).
+OBSERVABLES = {
+    "Xv": {"Xv": 1e-9},
+    "Xt": {"Xt": 1e-9},
+    "Cglc": {"Cglc": 1.0},
+    "Cgln": {"Cgln": 1.0},
+    "Clac": {"Clac": 1.0},
+    "Camm": {"Camm": 1.0},
+    "Cmab": {"Cmab": 1.0},
+    "Coxygen": {"Coxygen": 1.0},
+    "V": {"V": 1.0},
+    "pH": {"pH": 1.0},
+    "Osmolarity": {
+        "Cglc": Species.Glc.phi,
+        "Cgln": Species.Gln.phi,
+        "Clac": Species.Lac.phi,
+        "Camm": Species.NH3.phi,
+    },
+}
+
+
+@dataclasses.dataclass
+class FreeParameter:
+    """A parameter of parameters.InputParameters to estimate, within bounds.
+
+    Attributes:
+        name: Name of the parameter, one of solver.SENSITIVITY_PARAMS.
+        lower: Lower bound.
+        upper: Upper bound.
+        initial: Initial guess. Defaults to the value in the parameters fitted.
+    """
+
+    name: str
+    lower: float
+    upper: float
+    initial: typing.Optional[float] = None
+
+
+@dataclasses.dataclass
+class FitResult:
+    """Outcome of `fit`.
+
+    Attributes:
+        params: Parameters with the estimated values filled in.
+        values: Estimated values, keyed by parameter name.
+        cost: Half the sum of squared weighted residuals at the solution.
+        success: Whether the optimizer converged.
+        message: Optimizer message.
+        nsolves: Number of model solves, counting an augmented sensitivity solve as
+            one.
+        timings: Wall time (in s) spent solving for residuals ("residuals"), for
+            jacobians ("jacobian"), in augmented sensitivity solves that give both
+            at once ("augmented", the only solves with jacobian="sensitivities"), in
+            the optimizer itself ("optimizer") and in total ("total").
+        optimize_result: Full scipy.optimize.OptimizeResult.
+    """
+
+    params: parameters.InputParameters
+    values: typing.Dict[str, float]
+    cost: float
+    success: bool
+    message: str
+    nsolves: int
+    timings: typing.Dict[str, float]
+    optimize_result: typing.Any
+
+
+def fit(
+    measurements: typing.Dict[str, typing.Sequence[float]],
+    free: typing.Sequence[FreeParameter],
+    feed_fn: growth_model.FeedFunctionType,
+    temp_fn: growth_model.TempFunctionType,
+    params: typing.Optional[parameters.InputParameters] = None,
+    initial_conditions: typing.Optional[parameters.InitialConditions] = None,
+    boluses: typing.Optional[typing.Sequence[feeds.Bolus]] = None,
+    weights: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    jacobian: str = "sensitivities",
+    max_workers: typing.Optional[int] = None,
+    solver_max_step_size: float = np.inf,
+    solver_rtol: float = solver.RTOL,
+    solver_atol: float = solver.ATOL,
+    t0: float = 0.0,
+    **least_squares_kwargs: typing.Any,
+) -> FitResult:
+    """Estimates parameters by weighted least squares against measured samples.
+
+    Measurements are shaped like the output of run.flex2_sampling: a "time" list (in
+    hrs) and lists of measured values for any of OBSERVABLES, with None or nan where a
+    value was not measured. Residuals are weight * (model - measured).
+
+    Parameters are optimized relative to their initial values, so parameters of very
+    different magnitudes are handled alike. Each evaluation point is solved once, for
+    both residuals and jacobian: with jacobian="sensitivities" the jacobian comes from
+    the forward sensitivities of that single solve (see solver.solve), with
+    jacobian="fd" from central differences, solved across `max_workers` processes.
+
+    Args:
+        measurements (typing.Dict[str, typing.Sequence[float]]): Measured samples.
+        free (typing.Sequence[FreeParameter]): Parameters to estimate.
+        feed_fn (growth_model.FeedFunctionType): Feed profile of the experiment.
+        temp_fn (growth_model.TempFunctionType): Temp profile of the experiment.
+        params (typing.Optional[parameters.InputParameters], optional): Values of the
+            parameters that are not estimated. Defaults to
+            parameters.InputParameters().
+        initial_conditions (typing.Optional[parameters.InitialConditions],
+            optional): Initial conditions of the experiment. Defaults to
+            parameters.InitialConditions().
+        boluses (typing.Optional[typing.Sequence[feeds.Bolus]], optional): Bolus
+            feeds of the experiment. Defaults to None.
+        weights (typing.Optional[typing.Dict[str, typing.Any]], optional): Weight, or
+            array of weights, per measured quantity; e.g. 1 / measurement std.
+            Defaults to 1 / the largest magnitude measured for each quantity.
+        jacobian (str, optional): "sensitivities" or "fd". Defaults to
+            "sensitivities".
+        max_workers (typing.Optional[int], optional): Number of processes to solve
+            finite differences across; feed/temp callables must then be picklable.
+            Defaults to None (solve in this process).
+        solver_max_step_size (float, optional): Max step size for the odeint solver
+            to take. Defaults to np.inf.
+        solver_rtol (float, optional): Relative tolerance of the solver. Defaults to
+            solver.RTOL.
+        solver_atol (float, optional): Absolute tolerance of the solver. Defaults to
+            solver.ATOL.
+        t0 (float, optional): Start time (in hrs) of the experiment. Defaults to 0.
+        **least_squares_kwargs (typing.Any): Passed on to
+            scipy.optimize.least_squares, e.g. ftol or max_nfev.
+
+    Raises:
+        ValueError: If a quantity or parameter is unknown, `jacobian` is invalid,
+            nothing was measured, or measurements precede `t0`.
+        RuntimeError: If integration/LSODA solver runs into failures.
+
+    Returns:
+        FitResult: Estimated parameters and fit statistics.
+    """
+    started = time.perf_counter()
+    if jacobian not in ["sensitivities", "fd"]:
+        raise ValueError(f"Unknown jacobian: {jacobian}")
+    params = params or parameters.InputParameters()
+    initial_conditions = initial_conditions or parameters.InitialConditions()
+    unknown = {p.name for p in free} - set(solver.SENSITIVITY_PARAMS)
+    if unknown:
+        raise ValueError(f"Cannot fit parameters: {unknown}")
+
+    names = [p.name for p in free]
+    scale = np.array(
+        [getattr(params, p.name) if p.initial is None else p.initial for p in free],
+        dtype=float,
+    )
+    if np.any(scale == 0):
+        raise ValueError("Initial values of fitted parameters must be non-zero")
+    lower = np.array([p.lower for p in free], dtype=float) / scale
+    upper = np.array([p.upper for p in free], dtype=float) / scale
+    # bounds swap for negative initial values
+    lower, upper = np.minimum(lower, upper), np.maximum(lower, upper)
+
+    tspan, rows, C, y_measured, w = _residual_layout(measurements, weights, t0)
+    settings: typing.Dict[str, typing.Any] = dict(
+        tspan=tspan,
+        feed_fn=feed_fn,
+        temp_fn=temp_fn,
+        solver_hmax=solver_max_step_size,
+        boluses=boluses,
+        rtol=solver_rtol,
+        atol=solver_atol,
+        # odeint's step budget applies between output points, which are far apart
+        max_steps=solver.MAX_STEPS_PER_DAY
+        * max(int(np.ceil(np.diff(tspan).max(initial=0.0) / 24)), 1),
+    )
+    stats: typing.Dict[str, typing.Any] = {
+        "nsolves": 0,
+        "residuals": 0.0,
+        "jacobian": 0.0,
+        "augmented": 0.0,
+    }
+    evaluated: typing.Dict[bytes, typing.Tuple[np.ndarray, np.ndarray]] = {}
+
+    def with_values(x: np.ndarray) -> parameters.InputParameters:
+        values: typing.Dict[str, typing.Any] = {
+            name: float(v) for name, v in zip(names, x * scale)
+        }
+        return dataclasses.replace(params, **values)
+
+    def observe(state: np.ndarray) -> np.ndarray:
+        return np.einsum("ni,ni->n", state[rows], C)
+
+    def evaluate(x: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Residuals and jacobian at x, solved once per point."""
+        key = x.tobytes()
+        if key in evaluated:
+            return evaluated[key]
+
+        tic = time.perf_counter()
+        if jacobian == "sensitivities":
+            state, _, info = solver.solve(
+                with_values(x),
+                initial_conditions,
+                sensitivities=names,
+                **settings,
+            )
+            _check(info)
+            stats["nsolves"] += 1
+            S = info["sensitivities"][rows]  # (n, 10, k)
+            J = np.einsum("ni,nik->nk", C, S) * scale
+            stats["augmented"] += time.perf_counter() - tic
+        else:
+            state = _solve(with_values(x), initial_conditions, settings)
+            stats["nsolves"] += 1
+            stats["residuals"] += time.perf_counter() - tic
+            tic = time.perf_counter()
+            h = 1e-4 * np.maximum(np.abs(x), 1.0)
+            perturbed = [
+                with_values(x + sign * h[k] * np.eye(len(x))[k])
+                for sign in [1, -1]
+                for k in range(len(x))
+            ]
+            states = list(
+                _map(
+                    pool,
+                    _solve,
+                    perturbed,
+                    [initial_conditions] * len(perturbed),
+                    [settings] * len(perturbed),
+                )
+            )
+            stats["nsolves"] += len(states)
+            observed = np.array([observe(s) for s in states])  # (2k, n)
+            J = ((observed[: len(x)] - observed[len(x) :]) / (2 * h[:, None])).T
+            stats["jacobian"] += time.perf_counter() - tic
+
+        evaluated.clear()  # only the latest point is asked for again
+        evaluated[key] = (w * (observe(state) - y_measured), w[:, None] * J)
+        return evaluated[key]
+
+    pool = (
+        concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+        if max_workers and jacobian == "fd"
+        else None
+    )
+    try:
+        result = least_squares(
+            lambda x: evaluate(x)[0],
+            np.ones(len(free)),
+            jac=lambda x: evaluate(x)[1],
+            bounds=(lower, upper),
+            **least_squares_kwargs,
+        )
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    total = time.perf_counter() - started
+    solving = stats["residuals"] + stats["jacobian"] + stats["augmented"]
+    return FitResult(
+        params=with_values(result.x),
+        values={name: float(v) for name, v in zip(names, result.x * scale)},
+        cost=float(result.cost),
+        success=bool(result.success),
+        message=result.message,
+        nsolves=stats["nsolves"],
+        timings={
+            "residuals": stats["residuals"],
+            "jacobian": stats["jacobian"],
+            "augmented": stats["augmented"],
+            "optimizer": total - solving,
+            "total": total,
+        },
+        optimize_result=result,
+    )
+
+
+def _residual_layout(
+    measurements: typing.Dict[str, typing.Sequence[float]],
+    weights: typing.Optional[typing.Dict[str, typing.Any]],
+    t0: float,
+) -> typing.Tuple[np.ndarray, ...]:
+    """Flattens measurements into solve times and per-residual rows into them,
+    observable coefficients, measured values and weights."""
+    times = np.asarray(measurements["time"], dtype=float)
+    unknown = set(measurements) - set(OBSERVABLES) - {"time"}
+    if unknown:
+        raise ValueError(f"Cannot fit unknown quantities: {unknown}")
+    if np.any(times < t0):
+        raise ValueError(f"Measurement times must not precede t0 = {t0} hrs")
+    tspan = np.union1d([t0], times)
+
+    rows, C, y_measured, w = [], [], [], []
+    for name in measurements:
+        if name == "time":
+            continue
+        values = np.array(
+            [np.nan if v is None else v for v in measurements[name]], dtype=float
+        )
+        measured = ~np.isnan(values)
+        if not measured.any():
+            continue
+        weight = np.broadcast_to(
+            (weights or {}).get(name, 1.0 / max(np.abs(values[measured]).max(), 1e-12)),
+            values.shape,
+        )
+        coefficients = np.zeros(len(growth_model.STATE_NAMES))
+        for state_name, c in OBSERVABLES[name].items():
+            coefficients[growth_model.STATE_NAMES.index(state_name)] = c
+
+        rows.append(np.searchsorted(tspan, times[measured]))
+        C.append(np.tile(coefficients, (measured.sum(), 1)))
+        y_measured.append(values[measured])
+        w.append(weight[measured])
+    if not rows:
+        raise ValueError("No measured values to fit")
+    return (
+        tspan,
+        np.concatenate(rows),
+        np.concatenate(C),
+        np.concatenate(y_measured),
+        np.concatenate(w).astype(float),
+    )
+
+
+def _solve(
+    params: parameters.InputParameters,
+    initial_conditions: parameters.InitialConditions,
+    settings: typing.Dict[str, typing.Any],
+) -> np.ndarray:
+    state, _, info = solver.solve(params, initial_conditions, **settings)
+    _check(info)
+    return state
+
+
+def _check(info: typing.Dict[str, typing.Any]):
+    if info["message"] != "Integration successful.":
+        raise RuntimeError(
+            "Integration failed at specified params and/or initial values."
+        )
+
+
+def _map(
+    pool: typing.Optional[concurrent.futures.Executor],
+    fn: typing.Callable,
+    *iterables: typing.Iterable,
+) -> typing.Iterator:
+    return pool.map(fn, *iterables) if pool is not None else map(fn, *iterables)
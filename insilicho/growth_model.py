@@ -1,5 +1,8 @@
 # mypy: disable-error-code=operator
 
+import dataclasses
+import math
+import types
 import typing
 
 import numpy as np
@@ -10,6 +13,24 @@ from insilicho.chemistry import Species
 FeedFunctionType = typing.Callable[[float], float]
 TempFunctionType = typing.Callable[[float], float]
 
+# Column names of the state and state_vars arrays.
+STATE_NAMES = tuple(f.name for f in dataclasses.fields(parameters.InitialConditions))
+STATE_VAR_NAMES = (
+    "F",
+    "T",
+    "mu",
+    "mu_d",
+    "q_glc",
+    "q_gln",
+    "q_lac",
+    "q_amm",
+    "q_mab",
+    "Osmolarity",
+)
+_PARAMETER_INDEX = {
+    f.name: i for i, f in enumerate(dataclasses.fields(parameters.InputParameters))
+}
+
 
 def exponential_dependence_around_optima(
     x: float, optima: float, spread: float = 1.0
@@ -146,6 +167,167 @@ def state_vars(
     )
 
 
+def evaluate_profile(
+    fn: typing.Union[FeedFunctionType, TempFunctionType], t: np.ndarray
+) -> np.ndarray:
+    """Evaluates a feed/temp profile on an array of time points.
+
+    The profile is called once with the whole array; profiles that only accept
+    scalars (i.e. raise or return a mismatched shape) are evaluated point by point.
+
+    Args:
+        fn (typing.Union[FeedFunctionType, TempFunctionType]): Profile to evaluate.
+        t (np.ndarray): Time points.
+
+    Returns:
+        np.ndarray: Profile values with the shape of `t`.
+    """
+    try:
+        values = np.asarray(fn(t), dtype=np.float64)  # type: ignore[arg-type]
+    except Exception:
+        values = None
+
+    if values is None or values.shape not in ((), t.shape):
+        return np.array([fn(ti) for ti in t.ravel().tolist()], dtype=float).reshape(
+            t.shape
+        )
+    return np.broadcast_to(values, t.shape)
+
+
+def kinetics(
+    F: np.ndarray, T: np.ndarray, state: np.ndarray, params: typing.Any
+) -> typing.Tuple[np.ndarray, ...]:
+    """Array-wise evaluation of the variables returned by `state_vars`.
+
+    Args:
+        F (np.ndarray): Feed rates, broadcastable against the states.
+        T (np.ndarray): Temperatures, broadcastable against the states.
+        state (np.ndarray): States with the species on the last axis, following the
+            order of parameters.InitialConditions.
+        params (typing.Any): parameters.InputParameters, or any object exposing its
+            fields as attributes broadcastable against the states.
+
+    Returns:
+        typing.Tuple[np.ndarray, ...]: F, T, mu, mu_d, q_glc, q_gln, q_lac, q_amm,
+            q_mab and Osmolarity, broadcast to a common shape.
+    """
+    Xv, Xt, Cglc, Cgln, Clac, Camm, Cmab, Coxygen, V, pH = np.moveaxis(state, -1, 0)
+
+    Osmolarity = (
+        Cglc * Species.Glc.phi
+        + Cgln * Species.Gln.phi
+        + Clac * Species.Lac.phi
+        + Camm * Species.NH3.phi
+    )
+
+    mu = (
+        (
+            params.mu_max
+            * Cglc
+            / (Cglc + params.Ks_glc)
+            * Cgln
+            / (Cgln + params.Ks_gln)
+            * params.Ki_amm
+            / (Camm + params.Ki_amm)
+        )
+        * exponential_dependence_around_optima(
+            T, params.T_optimal, params.T_optimal_decay_spread  # type: ignore[arg-type]
+        )
+        * exponential_dependence_around_optima(
+            pH, params.pH_optimal, params.pH_optimal_decay_spread
+        )
+    )
+    mu_d = params.mu_d_min + (
+        params.mu_d_max
+        * params.Ks_glc
+        / (Cglc + params.Ks_glc)
+        * params.Ks_gln
+        / (Cgln + params.Ks_gln)
+        * Camm
+        / (Camm + params.Ki_amm)
+    )
+
+    q_glc = (
+        params.q_glc_max
+        * Cglc
+        / (Cglc + params.k_glc)
+        * (mu / (mu + params.mu_max) + 0.5)
+    )
+    q_gln = params.q_gln_max * Cgln / (Cgln + params.k_gln)
+    q_lac_uptake = np.where(Cglc < 0.5, params.q_lac_max, 0.0)
+    q_lac = (
+        params.Y_lac_glc * Cglc / (Clac + parameters.SMALL_CONC) * q_glc - q_lac_uptake
+    )
+    q_amm = params.Y_amm_gln * q_gln
+    q_mab = np.where(Camm > params.Ki_amm, 0.0, params.q_mab)
+
+    return tuple(
+        np.broadcast_arrays(
+            F, T, mu, mu_d, q_glc, q_gln, q_lac, q_amm, q_mab, Osmolarity
+        )
+    )
+
+
+def state_vars_array(
+    t: np.ndarray,
+    state: np.ndarray,
+    params: typing.Any,
+    feed_fn: typing.Optional[FeedFunctionType] = None,
+    temp_fn: typing.Optional[TempFunctionType] = None,
+) -> np.ndarray:
+    """Array-wise `state_vars` over a whole trajectory.
+
+    Args:
+        t (np.ndarray): Time points, of shape (T,).
+        state (np.ndarray): States of shape (..., T, 10), following the order of
+            parameters.InitialConditions.
+        params (typing.Any): Parameters of GrowCHO model, see `kinetics`.
+        feed_fn (typing.Optional[FeedFunctionType], optional): Callable describing feed
+            profile. Defaults to None.
+        temp_fn (typing.Optional[TempFunctionType], optional): Callable describing temp
+            profile. Defaults to None.
+
+    Raises:
+        ValueError: Raised if `feed_fn` or `temp_fn` are not provided.
+
+    Returns:
+        np.ndarray: Array of shape (..., T, 10) holding the variables returned by
+            `state_vars` for every time point.
+    """
+    if not feed_fn or not temp_fn:
+        raise ValueError("feed/temp model missing")
+
+    t = np.asarray(t, dtype=float)
+    return np.stack(
+        kinetics(
+            evaluate_profile(feed_fn, t),
+            evaluate_profile(temp_fn, t),
+            np.asarray(state, dtype=float),
+            params,
+        ),
+        axis=-1,
+    )
+
+
+def batch_parameters(params: np.ndarray) -> types.SimpleNamespace:
+    """Exposes a parameter matrix as named columns usable by `kinetics`.
+
+    Args:
+        params (np.ndarray): Array of shape (..., n_fields), with fields in the order
+            of parameters.InputParameters.
+
+    Returns:
+        types.SimpleNamespace: One attribute per InputParameters field, each holding
+            the (...)-shaped slice of `params` for that field.
+    """
+    return types.SimpleNamespace(
+        **{
+            f.name: params[..., i]
+            for i, f in enumerate(dataclasses.fields(parameters.InputParameters))
+        }
+    )
+
+
 def model(
     t,
     state,
@@ -187,3 +369,414 @@ def model(
         dV,
         dpH,
     ]
+
+
+def flat_parameters(params: parameters.InputParameters) -> typing.Tuple[float, ...]:
+    """Resolves parameters into the flat, immutable vector consumed by `kernel`.
+
+    Args:
+        params (parameters.InputParameters): Parameters of GrowCHO model.
+
+    Returns:
+        typing.Tuple[float, ...]: Parameter values as python floats, in the field order
+            of parameters.InputParameters.
+    """
+    return tuple(float(v) for v in params.tolist())
+
+
+def kernel(
+    t: float,
+    state: np.ndarray,
+    args: typing.Tuple[float, ...],
+    feed_fn: FeedFunctionType,
+    temp_fn: TempFunctionType,
+    out: np.ndarray,
+) -> np.ndarray:
+    """Allocation-free equivalent of `model`, used by solver.solve by default.
+
+    Evaluates the same kinetics as `state_vars`/`model` but works on a pre-resolved
+    parameter vector and writes the derivatives into a preallocated buffer, instead
+    of rebuilding parameters.InputParameters on every call.
+
+    Args:
+        t (float): Time point to evaluate on.
+        state (np.ndarray): Current states, in the order of
+            parameters.InitialConditions.
+        args (typing.Tuple[float, ...]): Parameter vector from `flat_parameters`.
+        feed_fn (FeedFunctionType): Callable describing feed profile.
+        temp_fn (TempFunctionType): Callable describing temp profile.
+        out (np.ndarray): Buffer of shape (10,) the derivatives are written to.
+
+    Returns:
+        np.ndarray: `out`, holding the derivatives of the states.
+    """
+    (
+        mu_max,
+        mu_d_max,
+        mu_d_min,
+        k_glc,
+        k_gln,
+        K_lys,
+        _,  # Ks_amm
+        Ki_amm,
+        Ks_glc,
+        Ks_gln,
+        q_mab,
+        q_glc_max,
+        q_gln_max,
+        q_lac_max,
+        Y_amm_gln,
+        Y_lac_glc,
+        Cglc_feed,
+        Cgln_feed,
+        T_optimal,
+        T_optimal_decay_spread,
+        pH_optimal,
+        pH_optimal_decay_spread,
+        _,  # Ndays
+        _,  # Nsamples
+    ) = args
+    Xv, Xt, Cglc, Cgln, Clac, Camm, Cmab, _, V, pH = state.tolist()
+
+    F = feed_fn(t)
+    T = temp_fn(t)
+
+    mu = (
+        mu_max
+        * Cglc
+        / (Cglc + Ks_glc)
+        * Cgln
+        / (Cgln + Ks_gln)
+        * Ki_amm
+        / (Camm + Ki_amm)
+    ) * (
+        math.exp(-((T - T_optimal) ** 2.0) / T_optimal_decay_spread**2.0)
+        * math.exp(-((pH - pH_optimal) ** 2.0) / pH_optimal_decay_spread**2.0)
+    )
+    mu_d = mu_d_min + (
+        mu_d_max
+        * Ks_glc
+        / (Cglc + Ks_glc)
+        * Ks_gln
+        / (Cgln + Ks_gln)
+        * Camm
+        / (Camm + Ki_amm)
+    )
+
+    q_glc = q_glc_max * Cglc / (Cglc + k_glc) * (mu / (mu + mu_max) + 0.5)
+    q_gln = q_gln_max * Cgln / (Cgln + k_gln)
+    q_lac = Y_lac_glc * Cglc / (Clac + parameters.SMALL_CONC) * q_glc - (
+        q_lac_max if Cglc < 0.5 else 0.0
+    )
+    q_amm = Y_amm_gln * q_gln
+    if Camm > Ki_amm:
+        q_mab = 0.0
+
+    D = F / V
+    out[0] = (mu - mu_d - D) * Xv
+    out[1] = mu * Xv - K_lys * (Xt - Xv) - D * Xt
+    out[2] = -q_glc * Xv + F * (Cglc_feed - Cglc) / V
+    out[3] = -q_gln * Xv + F * (Cgln_feed - Cgln) / V
+    out[4] = q_lac * Xv - F * Clac / V
+    out[5] = q_amm * Xv - F * Camm / V
+    out[6] = q_mab * Xv - F * Cmab / V
+    out[7] = 0.0
+    out[8] = F
+    out[9] = 0.0
+    return out
+
+
+def jacobian(
+    t: float,
+    state: np.ndarray,
+    args: typing.Tuple[float, ...],
+    feed_fn: FeedFunctionType,
+    temp_fn: TempFunctionType,
+) -> np.ndarray:
+    """Analytic Jacobian of `kernel` with respect to the states.
+
+    The rows of Coxygen and pH (held constant) and of V (which only depends on F) are
+    identically zero, see `jacobian_sparsity`.
+
+    Args:
+        t (float): Time point to evaluate on.
+        state (np.ndarray): Current states, in the order of
+            parameters.InitialConditions.
+        args (typing.Tuple[float, ...]): Parameter vector from `flat_parameters`.
+        feed_fn (FeedFunctionType): Callable describing feed profile.
+        temp_fn (TempFunctionType): Callable describing temp profile.
+
+    Returns:
+        np.ndarray: Array of shape (10, 10), J[i, j] = d(dstate_i/dt) / dstate_j.
+    """
+    (
+        mu_max,
+        mu_d_max,
+        mu_d_min,
+        k_glc,
+        k_gln,
+        K_lys,
+        _,  # Ks_amm
+        Ki_amm,
+        Ks_glc,
+        Ks_gln,
+        q_mab,
+        q_glc_max,
+        q_gln_max,
+        q_lac_max,
+        Y_amm_gln,
+        Y_lac_glc,
+        Cglc_feed,
+        Cgln_feed,
+        T_optimal,
+        T_optimal_decay_spread,
+        pH_optimal,
+        pH_optimal_decay_spread,
+        _,  # Ndays
+        _,  # Nsamples
+    ) = args
+    Xv, Xt, Cglc, Cgln, Clac, Camm, Cmab, _, V, pH = state.tolist()
+
+    F = feed_fn(t)
+    T = temp_fn(t)
+
+    # mu = mu_max * g * q * a * exp(T) * exp(pH), and its partials
+    g = Cglc / (Cglc + Ks_glc)
+    q = Cgln / (Cgln + Ks_gln)
+    a = Ki_amm / (Camm + Ki_amm)
+    base = mu_max * (
+        math.exp(-((T - T_optimal) ** 2.0) / T_optimal_decay_spread**2.0)
+        * math.exp(-((pH - pH_optimal) ** 2.0) / pH_optimal_decay_spread**2.0)
+    )
+    mu = base * g * q * a
+    dmu_dglc = base * Ks_glc / (Cglc + Ks_glc) ** 2 * q * a
+    dmu_dgln = base * g * Ks_gln / (Cgln + Ks_gln) ** 2 * a
+    dmu_damm = -base * g * q * Ki_amm / (Camm + Ki_amm) ** 2
+    dmu_dpH = -2.0 * mu * (pH - pH_optimal) / pH_optimal_decay_spread**2.0
+
+    # mu_d = mu_d_min + mu_d_max * h_glc * h_gln * h_amm
+    h_glc = Ks_glc / (Cglc + Ks_glc)
+    h_gln = Ks_gln / (Cgln + Ks_gln)
+    h_amm = Camm / (Camm + Ki_amm)
+    mu_d = mu_d_min + mu_d_max * h_glc * h_gln * h_amm
+    dmu_d_dglc = -mu_d_max * Ks_glc / (Cglc + Ks_glc) ** 2 * h_gln * h_amm
+    dmu_d_dgln = -mu_d_max * h_glc * Ks_gln / (Cgln + Ks_gln) ** 2 * h_amm
+    dmu_d_damm = mu_d_max * h_glc * h_gln * Ki_amm / (Camm + Ki_amm) ** 2
+
+    # q_glc = q_glc_max * r * s
+    r = Cglc / (Cglc + k_glc)
+    s = mu / (mu + mu_max) + 0.5
+    q_glc = q_glc_max * r * s
+    ds_dmu = mu_max / (mu + mu_max) ** 2
+    dq_glc_dglc = q_glc_max * (k_glc / (Cglc + k_glc) ** 2 * s + r * ds_dmu * dmu_dglc)
+    dq_glc_dgln = q_glc_max * r * ds_dmu * dmu_dgln
+    dq_glc_damm = q_glc_max * r * ds_dmu * dmu_damm
+    dq_glc_dpH = q_glc_max * r * ds_dmu * dmu_dpH
+
+    q_gln = q_gln_max * Cgln / (Cgln + k_gln)
+    dq_gln_dgln = q_gln_max * k_gln / (Cgln + k_gln) ** 2
+
+    # q_lac = Y_lac_glc * Cglc / (Clac + SMALL_CONC) * q_glc - q_lac_uptake
+    lac = Y_lac_glc * Cglc / (Clac + parameters.SMALL_CONC)
+    q_lac = lac * q_glc - (q_lac_max if Cglc < 0.5 else 0.0)
+    dq_lac_dglc = Y_lac_glc / (Clac + parameters.SMALL_CONC) * q_glc + (
+        lac * dq_glc_dglc
+    )
+    dq_lac_dlac = -lac * q_glc / (Clac + parameters.SMALL_CONC)
+
+    if Camm > Ki_amm:
+        q_mab = 0.0
+
+    D = F / V
+    dD_dV = -F / V**2
+
+    J = np.zeros((10, 10))
+    # Xv
+    J[0, 0] = mu - mu_d - D
+    J[0, 2] = (dmu_dglc - dmu_d_dglc) * Xv
+    J[0, 3] = (dmu_dgln - dmu_d_dgln) * Xv
+    J[0, 5] = (dmu_damm - dmu_d_damm) * Xv
+    J[0, 8] = -dD_dV * Xv
+    J[0, 9] = dmu_dpH * Xv
+    # Xt
+    J[1, 0] = mu + K_lys
+    J[1, 1] = -K_lys - D
+    J[1, 2] = dmu_dglc * Xv
+    J[1, 3] = dmu_dgln * Xv
+    J[1, 5] = dmu_damm * Xv
+    J[1, 8] = -dD_dV * Xt
+    J[1, 9] = dmu_dpH * Xv
+    # Cglc
+    J[2, 0] = -q_glc
+    J[2, 2] = -dq_glc_dglc * Xv - D
+    J[2, 3] = -dq_glc_dgln * Xv
+    J[2, 5] = -dq_glc_damm * Xv
+    J[2, 8] = dD_dV * (Cglc_feed - Cglc)
+    J[2, 9] = -dq_glc_dpH * Xv
+    # Cgln
+    J[3, 0] = -q_gln
+    J[3, 3] = -dq_gln_dgln * Xv - D
+    J[3, 8] = dD_dV * (Cgln_feed - Cgln)
+    # Clac
+    J[4, 0] = q_lac
+    J[4, 2] = dq_lac_dglc * Xv
+    J[4, 3] = lac * dq_glc_dgln * Xv
+    J[4, 4] = dq_lac_dlac * Xv - D
+    J[4, 5] = lac * dq_glc_damm * Xv
+    J[4, 8] = -dD_dV * Clac
+    J[4, 9] = lac * dq_glc_dpH * Xv
+    # Camm
+    J[5, 0] = Y_amm_gln * q_gln
+    J[5, 3] = Y_amm_gln * dq_gln_dgln * Xv
+    J[5, 5] = -D
+    J[5, 8] = -dD_dV * Camm
+    # Cmab
+    J[6, 0] = q_mab
+    J[6, 6] = -D
+    J[6, 8] = -dD_dV * Cmab
+    return J
+
+
+def parameter_jacobian(
+    t: float,
+    state: np.ndarray,
+    args: typing.Tuple[float, ...],
+    feed_fn: FeedFunctionType,
+    temp_fn: TempFunctionType,
+) -> np.ndarray:
+    """Analytic Jacobian of `kernel` with respect to the parameters.
+
+    The switches of q_lac uptake (at Cglc = 0.5) and of q_mab (at Camm = Ki_amm) are
+    taken as fixed, i.e. their location does not contribute.
+
+    Args:
+        t (float): Time point to evaluate on.
+        state (np.ndarray): Current states, in the order of
+            parameters.InitialConditions.
+        args (typing.Tuple[float, ...]): Parameter vector from `flat_parameters`.
+        feed_fn (FeedFunctionType): Callable describing feed profile.
+        temp_fn (TempFunctionType): Callable describing temp profile.
+
+    Returns:
+        np.ndarray: Array of shape (10, len(args)), J[i, k] = d(dstate_i/dt) / dp_k,
+            with parameters in the field order of parameters.InputParameters.
+    """
+    (
+        mu_max,
+        mu_d_max,
+        mu_d_min,
+        k_glc,
+        k_gln,
+        K_lys,
+        _,  # Ks_amm
+        Ki_amm,
+        Ks_glc,
+        Ks_gln,
+        q_mab,
+        q_glc_max,
+        q_gln_max,
+        q_lac_max,
+        Y_amm_gln,
+        Y_lac_glc,
+        Cglc_feed,
+        Cgln_feed,
+        T_optimal,
+        T_optimal_decay_spread,
+        pH_optimal,
+        pH_optimal_decay_spread,
+        _,  # Ndays
+        _,  # Nsamples
+    ) = args
+    Xv, Xt, Cglc, Cgln, Clac, Camm, Cmab, _, V, pH = state.tolist()
+    i = _PARAMETER_INDEX
+
+    F = feed_fn(t)
+    T = temp_fn(t)
+
+    # mu = mu_max * g * q * a * exp(T) * exp(pH), and its partials
+    g = Cglc / (Cglc + Ks_glc)
+    q = Cgln / (Cgln + Ks_gln)
+    a = Ki_amm / (Camm + Ki_amm)
+    optimum = math.exp(
+        -((T - T_optimal) ** 2.0) / T_optimal_decay_spread**2.0
+    ) * math.exp(-((pH - pH_optimal) ** 2.0) / pH_optimal_decay_spread**2.0)
+    mu = mu_max * optimum * g * q * a
+    dmu = np.zeros(len(args))
+    dmu[i["mu_max"]] = optimum * g * q * a
+    dmu[i["Ks_glc"]] = -mu / (Cglc + Ks_glc)
+    dmu[i["Ks_gln"]] = -mu / (Cgln + Ks_gln)
+    dmu[i["Ki_amm"]] = mu_max * optimum * g * q * Camm / (Camm + Ki_amm) ** 2
+    dmu[i["T_optimal"]] = 2.0 * mu * (T - T_optimal) / T_optimal_decay_spread**2.0
+    dmu[i["T_optimal_decay_spread"]] = (
+        2.0 * mu * (T - T_optimal) ** 2.0 / T_optimal_decay_spread**3.0
+    )
+    dmu[i["pH_optimal"]] = 2.0 * mu * (pH - pH_optimal) / pH_optimal_decay_spread**2.0
+    dmu[i["pH_optimal_decay_spread"]] = (
+        2.0 * mu * (pH - pH_optimal) ** 2.0 / pH_optimal_decay_spread**3.0
+    )
+
+    # mu_d = mu_d_min + mu_d_max * h_glc * h_gln * h_amm
+    h_glc = Ks_glc / (Cglc + Ks_glc)
+    h_gln = Ks_gln / (Cgln + Ks_gln)
+    h_amm = Camm / (Camm + Ki_amm)
+    dmu_d = np.zeros(len(args))
+    dmu_d[i["mu_d_min"]] = 1.0
+    dmu_d[i["mu_d_max"]] = h_glc * h_gln * h_amm
+    dmu_d[i["Ks_glc"]] = mu_d_max * Cglc / (Cglc + Ks_glc) ** 2 * h_gln * h_amm
+    dmu_d[i["Ks_gln"]] = mu_d_max * h_glc * Cgln / (Cgln + Ks_gln) ** 2 * h_amm
+    dmu_d[i["Ki_amm"]] = -mu_d_max * h_glc * h_gln * Camm / (Camm + Ki_amm) ** 2
+
+    # q_glc = q_glc_max * r * s
+    r = Cglc / (Cglc + k_glc)
+    s = mu / (mu + mu_max) + 0.5
+    q_glc = q_glc_max * r * s
+    dq_glc = q_glc_max * r * mu_max / (mu + mu_max) ** 2 * dmu
+    dq_glc[i["mu_max"]] -= q_glc_max * r * mu / (mu + mu_max) ** 2
+    dq_glc[i["q_glc_max"]] += r * s
+    dq_glc[i["k_glc"]] -= q_glc_max * Cglc / (Cglc + k_glc) ** 2 * s
+
+    q_gln = q_gln_max * Cgln / (Cgln + k_gln)
+    dq_gln = np.zeros(len(args))
+    dq_gln[i["q_gln_max"]] = Cgln / (Cgln + k_gln)
+    dq_gln[i["k_gln"]] = -q_gln_max * Cgln / (Cgln + k_gln) ** 2
+
+    # q_lac = Y_lac_glc * Cglc / (Clac + SMALL_CONC) * q_glc - q_lac_uptake
+    lac = Y_lac_glc * Cglc / (Clac + parameters.SMALL_CONC)
+    dq_lac = lac * dq_glc
+    dq_lac[i["Y_lac_glc"]] += Cglc / (Clac + parameters.SMALL_CONC) * q_glc
+    dq_lac[i["q_lac_max"]] -= 1.0 if Cglc < 0.5 else 0.0
+
+    dq_amm = Y_amm_gln * dq_gln
+    dq_amm[i["Y_amm_gln"]] += q_gln
+
+    D = F / V
+
+    J = np.zeros((10, len(args)))
+    J[0] = (dmu - dmu_d) * Xv
+    J[1] = dmu * Xv
+    J[1, i["K_lys"]] -= Xt - Xv
+    J[2] = -dq_glc * Xv
+    J[2, i["Cglc_feed"]] += D
+    J[3] = -dq_gln * Xv
+    J[3, i["Cgln_feed"]] += D
+    J[4] = dq_lac * Xv
+    J[5] = dq_amm * Xv
+    J[6, i["q_mab"]] = 0.0 if Camm > Ki_amm else Xv
+    return J
+
+
+def jacobian_sparsity() -> np.ndarray:
+    """Structural non-zeros of `jacobian`.
+
+    Returns:
+        np.ndarray: Boolean array of shape (10, 10).
+    """
+    S = np.zeros((10, 10), dtype=bool)
+    S[0, [0, 2, 3, 5, 8, 9]] = True
+    S[1, [0, 1, 2, 3, 5, 8, 9]] = True
+    S[2, [0, 2, 3, 5, 8, 9]] = True
+    S[3, [0, 3, 8]] = True
+    S[4, [0, 2, 3, 4, 5, 8, 9]] = True
+    S[5, [0, 3, 5, 8]] = True
+    S[6, [0, 6, 8]] = True
+    return S
@@ -0,0 +1,90 @@
+import dataclasses
+import time
+import typing
+
+import numpy as np
+
+# Called with the stats of every instrumented run, e.g. to export them to a metrics
+# system.
+StatsHookType = typing.Callable[["RunStats"], typing.Any]
+
+
+@dataclasses.dataclass
+class RunStats:
+    """Where the time of a GrowCHO.execute run went.
+
+    Attributes:
+        rhs_evals: Evaluations of the model right hand side by the solver.
+        jacobian_evals: Evaluations of the model jacobian by the solver.
+        steps: Steps taken by the solver.
+        method_switches: Switches of LSODA between its non-stiff (Adams) and stiff
+            (BDF) methods, as observed at the output points. None for native output,
+            which does not report the method used.
+        feed_calls: Calls of the feed profile; array-wise calls count once.
+        feed_time: Wall time (in s) spent in the feed profile.
+        temp_calls: Calls of the temp profile; array-wise calls count once.
+        temp_time: Wall time (in s) spent in the temp profile.
+        cached: Whether the full result was served from the result cache, in which
+            case the solver counts are those of the original solve and nothing was
+            called.
+        phases: Wall time (in s) per phase of the run: "solve" (including cache
+            lookups), within it "integrate" and "state_vars", "plot", "sampling" and
+            "total".
+    """
+
+    rhs_evals: int = 0
+    jacobian_evals: int = 0
+    steps: int = 0
+    method_switches: typing.Optional[int] = None
+    feed_calls: int = 0
+    feed_time: float = 0.0
+    temp_calls: int = 0
+    temp_time: float = 0.0
+    cached: bool = False
+    phases: typing.Dict[str, float] = dataclasses.field(default_factory=dict)
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        """Flat dictionary of all stats, phases prefixed with "phase_"."""
+        stats = dataclasses.asdict(self)
+        phases = stats.pop("phases")
+        stats.update({f"phase_{name}": value for name, value in phases.items()})
+        return stats
+
+    def add_solver_counts(self, info: typing.Dict[str, typing.Any]):
+        """Reads step, function and jacobian evaluation counts off a solver infodict,
+        see solver.solve and solver.solve_native."""
+        for attr, key in [
+            ("steps", "nst"),
+            ("rhs_evals", "nfe"),
+            ("jacobian_evals", "nje"),
+        ]:
+            if len(info.get(key, [])):
+                setattr(self, attr, int(info[key][-1]))
+        if "mused" in info:
+            self.method_switches = int(np.count_nonzero(np.diff(info["mused"])))
+
+
+class CallCounter:
+    """Counts calls of, and time spent in, a feed or temp profile.
+
+    Other attributes are looked up on the wrapped profile, so breakpoints and the like
+    are still seen by the solver.
+    """
+
+    def __init__(self, fn: typing.Callable):
+        self.fn = fn
+        self.calls = 0
+        self.time = 0.0
+
+    def __call__(self, t: typing.Any) -> typing.Any:
+        tic = time.perf_counter()
+        try:
+            return self.fn(t)
+        finally:
+            self.time += time.perf_counter() - tic
+            self.calls += 1
+
+    def __getattr__(self, name: str) -> typing.Any:
+        if name == "fn":
+            raise AttributeError(name)
+        return getattr(self.fn, name)
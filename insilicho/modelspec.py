@@ -0,0 +1,734 @@
+import ast
+import dataclasses
+import hashlib
+import json
+import keyword
+import math
+import typing
+
+import numpy as np
+
+from insilicho import chemistry, growth_model, parameters, units
+
+# Names expressions may use besides states, parameters, constants and rates: time (in
+# hrs), and the feed rate and temperature from the feed and temp profiles.
+INPUTS = ("t", "F", "T")
+
+# Functions expressions may call. Switches are written as `where(cond, a, b)` rather
+# than `a if cond else b`, so that expressions evaluate array-wise as well.
+FUNCTIONS = ("exp", "log", "sqrt", "abs", "sign", "where", "minimum", "maximum")
+_ARITY = {"where": 3, "minimum": 2, "maximum": 2}
+
+_SYNTAX = (
+    ast.Expression,
+    ast.Load,
+    ast.Name,
+    ast.Constant,
+    ast.Call,
+    ast.UnaryOp,
+    ast.UAdd,
+    ast.USub,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.Pow,
+    ast.Compare,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+    ast.Eq,
+    ast.NotEq,
+)
+
+_SCALAR_FUNCTIONS = {
+    "exp": math.exp,
+    "log": math.log,
+    "sqrt": math.sqrt,
+    "abs": abs,
+    "sign": lambda x: math.copysign(1.0, x) if x else 0.0,
+    "minimum": min,
+    "maximum": max,
+}
+_ARRAY_FUNCTIONS = {
+    "exp": np.exp,
+    "log": np.log,
+    "sqrt": np.sqrt,
+    "abs": np.abs,
+    "sign": np.sign,
+    "where": np.where,
+    "minimum": np.minimum,
+    "maximum": np.maximum,
+}
+
+
+@dataclasses.dataclass
+class StateSpec:
+    """A state of a ModelSpec.
+
+    Attributes:
+        name: Name of the state in expressions.
+        initial: Default initial value, a number or a string with units.
+        units: Units the state is integrated in.
+        species: Species of a concentration, see chemistry.Species. The
+            concentrations of all states with a species add up to the "Osmolarity",
+            weighted by their phi.
+    """
+
+    name: str
+    initial: typing.Union[float, str] = 0.0
+    units: str = "mmol/L"
+    species: typing.Optional[chemistry.Specie] = None
+
+
+@dataclasses.dataclass
+class ModelSpec:
+    """Declarative definition of a growth model, see `compile_spec`.
+
+    Expressions are Python arithmetic (+, -, *, /, ** and comparisons) over the states,
+    parameters, constants, INPUTS and previously defined rates, calling FUNCTIONS.
+
+    Attributes:
+        states: States, in the order of the state vector.
+        parameters: Parameters with their default values; strings with units are
+            converted to `parameter_units`.
+        derivatives: Expression of the time derivative of every state; states left
+            out are constant.
+        rates: Expressions of intermediate variables (growth rates, uptake rates...),
+            evaluated in order and reported as state vars. A rate may take the name
+            of a parameter, which it then replaces in all later expressions.
+        parameter_units: Units of the parameters, e.g.
+            parameters.InputParameters.units_map().
+        constants: Numbers inlined into the generated code.
+    """
+
+    states: typing.List[StateSpec]
+    parameters: typing.Dict[str, typing.Union[float, str]]
+    derivatives: typing.Dict[str, str]
+    rates: typing.Dict[str, str] = dataclasses.field(default_factory=dict)
+    parameter_units: typing.Dict[str, str] = dataclasses.field(default_factory=dict)
+    constants: typing.Dict[str, float] = dataclasses.field(default_factory=dict)
+
+
+class CompiledModel:
+    """Flat-array code generated from a ModelSpec, see `compile_spec`.
+
+    Pass it as the model of solver.solve to integrate the spec, with parameters and
+    initial conditions given as in `parameter_vector` and `initial_state`.
+
+    Attributes:
+        spec: The spec.
+        key: Hash of the spec, see `spec_key`.
+        state_names: Names of the states.
+        state_var_names: Names of the state vars: F, T, the rates and, if any state
+            has a species, "Osmolarity".
+        parameter_names: Names of the parameters, in the order of `parameter_vector`.
+        rhs: Time derivatives of the states, with the signature of
+            growth_model.kernel; parameters come from `parameter_vector`.
+        jacobian: Jacobian of `rhs` with respect to the states, from symbolic
+            differentiation of the spec. Called like `rhs`, returns a (n, n) array.
+            Also set as `rhs.jacobian`, where solver.solve picks it up.
+        source: The generated code.
+    """
+
+    def __init__(self, spec: ModelSpec):
+        """
+        Args:
+            spec (ModelSpec): Spec to compile.
+
+        Raises:
+            ValueError: If the spec has invalid names, expressions or units.
+        """
+        self.spec = spec
+        self.key = spec_key(spec)
+        self.state_names = [s.name for s in spec.states]
+        self.parameter_names = list(spec.parameters)
+
+        species = [s for s in spec.states if s.species is not None]
+        rate_names = list(spec.rates)
+        if species:
+            rate_names.append("Osmolarity")
+        self.state_var_names = ["F", "T"] + rate_names
+        _check_names(spec, rate_names)
+
+        unknown = set(spec.derivatives) - set(self.state_names)
+        if unknown:
+            raise ValueError(f"Derivatives of unknown states: {unknown}")
+
+        # parse in order of evaluation: the osmolarity only depends on the states.
+        # Parameters are read as _p_<name>, so rates taking their names differ from
+        # them in the generated code (and its derivatives)
+        known = set(self.state_names) | set(self.parameter_names) | set(INPUTS)
+        renamed = {name: _parameter(name) for name in self.parameter_names}
+        rates: typing.Dict[str, ast.expr] = {}
+        if species:
+            osmolarity = " + ".join(
+                f"{s.name} * {float(s.species.phi)!r}"  # type: ignore[union-attr]
+                for s in species
+            )
+            rates["Osmolarity"] = _parse(osmolarity, known, {}, "Osmolarity")
+            known.add("Osmolarity")
+        for name, expression in spec.rates.items():
+            rates[name] = _parse(expression, known, spec.constants, name, renamed)
+            known.add(name)
+            renamed.pop(name, None)
+        derivatives = [
+            _parse(
+                spec.derivatives.get(name, "0.0"), known, spec.constants, name, renamed
+            )
+            for name in self.state_names
+        ]
+
+        self._defaults = tuple(
+            _magnitude(value, spec.parameter_units.get(name), name)
+            for name, value in spec.parameters.items()
+        )
+        self._initial = [_magnitude(s.initial, s.units, s.name) for s in spec.states]
+
+        scalar_source = _scalar_source(
+            self.state_names, self.parameter_names, rates, derivatives
+        )
+        array_source = _array_source(
+            self.state_names, self.parameter_names, rates, self.state_var_names
+        )
+        self.source = scalar_source + "\n\n\n" + array_source
+        filename = f"<modelspec {self.key[:12]}>"
+        scalar: typing.Dict[str, typing.Any] = dict(_SCALAR_FUNCTIONS, _np=np)
+        exec(compile(scalar_source, filename, "exec"), scalar)
+        array: typing.Dict[str, typing.Any] = dict(
+            _ARRAY_FUNCTIONS, _np=np, _evaluate_profile=growth_model.evaluate_profile
+        )
+        exec(compile(array_source, filename, "exec"), array)
+
+        self.rhs: typing.Callable[..., np.ndarray] = scalar["rhs"]
+        self.jacobian: typing.Callable[..., np.ndarray] = scalar["jacobian"]
+        self.rhs.jacobian = self.jacobian  # type: ignore[attr-defined]
+        self._state_vars = array["state_vars"]
+
+    def __reduce__(self):
+        # generated code cannot be pickled, recompile it (once) on the other side
+        return compile_spec, (self.spec,)
+
+    def parameter_vector(self, params: typing.Any = None) -> typing.Tuple[float, ...]:
+        """Parameter vector of `rhs`.
+
+        Args:
+            params (typing.Any, optional): Values overriding the defaults of the spec:
+                a mapping of parameter names, or an object with parameters as
+                attributes, e.g. parameters.InputParameters. Strings with units are
+                converted. Defaults to None (defaults of the spec).
+
+        Raises:
+            ValueError: If a mapping has unknown parameters, or units do not
+                convert.
+
+        Returns:
+            typing.Tuple[float, ...]: Values in the order of `parameter_names`.
+        """
+        return tuple(
+            _overrides(
+                params,
+                self.parameter_names,
+                self._defaults,
+                lambda name, value: _magnitude(
+                    value, self.spec.parameter_units.get(name), name
+                ),
+            )
+        )
+
+    def initial_state(
+        self, initial_conditions: typing.Any = None
+    ) -> typing.List[float]:
+        """Initial state vector.
+
+        Args:
+            initial_conditions (typing.Any, optional): Values overriding the defaults
+                of the spec: a mapping of state names, an object with states as
+                attributes (e.g. parameters.InitialConditions), or a full state vector.
+                Strings with units are converted. Defaults to None (defaults of the
+                spec).
+
+        Raises:
+            ValueError: If a mapping has unknown states, a state vector has the wrong
+                length, or units do not convert.
+
+        Returns:
+            typing.List[float]: Values in the order of `state_names`.
+        """
+        if isinstance(initial_conditions, (np.ndarray, list, tuple)):
+            if len(initial_conditions) != len(self.state_names):
+                raise ValueError(
+                    f"Expected {len(self.state_names)} initial states, got "
+                    f"{len(initial_conditions)}"
+                )
+            return [float(v) for v in initial_conditions]
+        state_units = {s.name: s.units for s in self.spec.states}
+        return _overrides(
+            initial_conditions,
+            self.state_names,
+            self._initial,
+            lambda name, value: _magnitude(value, state_units[name], name),
+        )
+
+    def state_vars(
+        self,
+        t: np.ndarray,
+        state: np.ndarray,
+        args: typing.Sequence[float],
+        feed_fn: typing.Optional[growth_model.FeedFunctionType] = None,
+        temp_fn: typing.Optional[growth_model.TempFunctionType] = None,
+    ) -> np.ndarray:
+        """Array-wise state vars over a whole trajectory, like
+        growth_model.state_vars_array.
+
+        Args:
+            t (np.ndarray): Time points, of shape (T,).
+            state (np.ndarray): States of shape (..., T, n).
+            args (typing.Sequence[float]): Parameter vector, see `parameter_vector`.
+            feed_fn (typing.Optional[growth_model.FeedFunctionType], optional):
+                Callable describing feed profile. Defaults to None.
+            temp_fn (typing.Optional[growth_model.TempFunctionType], optional):
+                Callable describing temp profile. Defaults to None.
+
+        Raises:
+            ValueError: Raised if `feed_fn` or `temp_fn` are not provided.
+
+        Returns:
+            np.ndarray: Array of shape (..., T, len(state_var_names)).
+        """
+        if not feed_fn or not temp_fn:
+            raise ValueError("feed/temp model missing")
+        return self._state_vars(t, state, args, feed_fn, temp_fn)
+
+
+_COMPILED: typing.Dict[str, CompiledModel] = {}
+
+
+def spec_key(spec: ModelSpec) -> str:
+    """Content hash of a spec; equal specs compile to the same code."""
+    blob = json.dumps(dataclasses.asdict(spec), sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def compile_spec(spec: ModelSpec) -> CompiledModel:
+    """Generates the right hand side, jacobian and array-wise state vars of a spec.
+
+    Code is generated once per distinct spec (see `spec_key`) and reused by all later
+    calls, so model variants can be compiled freely.
+
+    Args:
+        spec (ModelSpec): Spec to compile.
+
+    Raises:
+        ValueError: If the spec has invalid names, expressions or units.
+
+    Returns:
+        CompiledModel: The compiled model.
+    """
+    key = spec_key(spec)
+    if key not in _COMPILED:
+        _COMPILED[key] = CompiledModel(spec)
+    return _COMPILED[key]
+
+
+def _check_names(spec: ModelSpec, rate_names: typing.List[str]):
+    names = (
+        [s.name for s in spec.states]
+        + list(spec.parameters)
+        + list(spec.constants)
+        + [name for name in rate_names if name not in spec.parameters]
+    )
+    for name in names:
+        if (
+            not name.isidentifier()
+            or keyword.iskeyword(name)
+            or name.startswith("_")
+            or name in INPUTS
+            or name in FUNCTIONS
+        ):
+            raise ValueError(f"Invalid or reserved name: {name!r}")
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"Names defined more than once: {duplicates}")
+
+
+def _magnitude(
+    value: typing.Union[float, str], to_units: typing.Optional[str], name: str
+) -> float:
+    if not isinstance(value, str):
+        return float(value)
+    if to_units is None:
+        raise ValueError(f"No units to convert {name} to")
+    try:
+        return units.convert(value, to_units)
+    except ValueError:
+        raise ValueError(
+            f"Dimensionality error in setting {name}, cannot convert from:"
+            f"{units.parse(value)[1]} to: {to_units}"
+        )
+
+
+def _overrides(
+    values: typing.Any,
+    names: typing.List[str],
+    defaults: typing.Sequence[float],
+    convert: typing.Callable[[str, typing.Any], float],
+) -> typing.List[float]:
+    """Defaults, overridden by a mapping or by the attributes of an object."""
+    if values is None:
+        return list(defaults)
+    if isinstance(values, typing.Mapping):
+        unknown = set(values) - set(names)
+        if unknown:
+            raise ValueError(f"Unknown names: {unknown}")
+        return [
+            convert(name, values.get(name, default))
+            for name, default in zip(names, defaults)
+        ]
+    return [
+        convert(name, getattr(values, name, default))
+        for name, default in zip(names, defaults)
+    ]
+
+
+def _parse(
+    expression: str,
+    names: typing.Set[str],
+    constants: typing.Dict[str, float],
+    context: str,
+    renamed: typing.Optional[typing.Dict[str, str]] = None,
+) -> ast.expr:
+    """Parses and validates an expression, inlining constants and renaming the
+    names in `renamed`."""
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression of {context}: {expression!r}") from e
+
+    calls = {id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    for node in ast.walk(tree):
+        if not isinstance(node, _SYNTAX):
+            raise ValueError(
+                f"Unsupported syntax in expression of {context}: {expression!r}"
+            )
+        if isinstance(node, ast.Call) and not (
+            isinstance(node.func, ast.Name)
+            and node.func.id in FUNCTIONS
+            and not node.keywords
+            and len(node.args) == _ARITY.get(node.func.id, 1)
+        ):
+            raise ValueError(
+                f"Unsupported call in expression of {context}: {ast.unparse(node)}"
+            )
+        if isinstance(node, ast.Compare) and len(node.ops) > 1:
+            raise ValueError(
+                f"Chained comparison in expression of {context}: {ast.unparse(node)}"
+            )
+        if isinstance(node, ast.Constant) and type(node.value) not in (int, float):
+            raise ValueError(
+                f"Unsupported constant in expression of {context}: {node.value!r}"
+            )
+        if (
+            isinstance(node, ast.Name)
+            and id(node) not in calls
+            and node.id not in names
+            and node.id not in constants
+        ):
+            raise ValueError(f"Unknown name {node.id!r} in expression of {context}")
+
+    class Inline(ast.NodeTransformer):
+        def visit_Name(self, node):
+            if id(node) not in calls and node.id in constants:
+                return ast.Constant(float(constants[node.id]))
+            if id(node) not in calls and node.id in (renamed or {}):
+                return ast.Name(renamed[node.id])
+            return node
+
+    return Inline().visit(tree).body
+
+
+def _names(node: ast.expr) -> typing.Set[str]:
+    return {n.id for n in ast.walk(node) if isinstance(n, ast.Name)}
+
+
+def _needed_rates(
+    rates: typing.Dict[str, ast.expr], expressions: typing.List[ast.expr]
+) -> typing.List[str]:
+    """Rates the expressions depend on, directly or through other rates, in order."""
+    needed: typing.Set[str] = set()
+    for expression in expressions:
+        needed |= _names(expression)
+    for name in reversed(list(rates)):
+        if name in needed:
+            needed |= _names(rates[name])
+    return [name for name in rates if name in needed]
+
+
+def _scalar_source(
+    state_names: typing.List[str],
+    parameter_names: typing.List[str],
+    rates: typing.Dict[str, ast.expr],
+    derivatives: typing.List[ast.expr],
+) -> str:
+    """Code of `rhs` and `jacobian`, evaluating on Python floats."""
+    needed = _needed_rates(rates, derivatives)
+    header = [f"    {', '.join(state_names)}, = _state.tolist()"]
+    if parameter_names:
+        header.append(f"    {', '.join(map(_parameter, parameter_names))}, = _args")
+    header += ["    F = _feed_fn(t)", "    T = _temp_fn(t)"]
+    header += [f"    {name} = {_scalar(rates[name])}" for name in needed]
+
+    rhs = ["def rhs(t, _state, _args, _feed_fn, _temp_fn, _out):"] + header
+    rhs += [f"    _out[{i}] = {_scalar(d)}" for i, d in enumerate(derivatives)]
+    rhs.append("    return _out")
+
+    # chain rule through the rates: _d{k}_{j} is d(rate k)/d(state j)
+    jacobian = ["def jacobian(t, _state, _args, _feed_fn, _temp_fn, *_):"] + header
+    nonzero: typing.Set[typing.Tuple[int, int]] = set()
+
+    def total(expression: ast.expr, n_rates: int, j: int) -> typing.Optional[ast.expr]:
+        d = _derivative(expression, state_names[j])
+        for k in range(n_rates):
+            if (k, j) in nonzero:
+                d = _add(
+                    d, _mul(_derivative(expression, needed[k]), ast.Name(f"_d{k}_{j}"))
+                )
+        return d
+
+    for k, name in enumerate(needed):
+        for j in range(len(state_names)):
+            d = total(rates[name], k, j)
+            if d is not None:
+                jacobian.append(f"    _d{k}_{j} = {_scalar(d)}")
+                nonzero.add((k, j))
+    n = len(state_names)
+    jacobian.append(f"    _J = _np.zeros(({n}, {n}))")
+    for i, derivative in enumerate(derivatives):
+        for j in range(n):
+            d = total(derivative, len(needed), j)
+            if d is not None:
+                jacobian.append(f"    _J[{i}, {j}] = {_scalar(d)}")
+    jacobian.append("    return _J")
+    return "\n".join(rhs) + "\n\n\n" + "\n".join(jacobian)
+
+
+def _array_source(
+    state_names: typing.List[str],
+    parameter_names: typing.List[str],
+    rates: typing.Dict[str, ast.expr],
+    outputs: typing.List[str],
+) -> str:
+    """Code of `state_vars`, evaluating on numpy arrays."""
+    lines = [
+        "def state_vars(t, _state, _args, _feed_fn, _temp_fn):",
+        "    t = _np.asarray(t, dtype=float)",
+        "    _state = _np.asarray(_state, dtype=float)",
+        "    F = _evaluate_profile(_feed_fn, t)",
+        "    T = _evaluate_profile(_temp_fn, t)",
+    ]
+    lines += [f"    {name} = _state[..., {i}]" for i, name in enumerate(state_names)]
+    if parameter_names:
+        lines.append(f"    {', '.join(map(_parameter, parameter_names))}, = _args")
+    lines += [f"    {name} = {ast.unparse(rates[name])}" for name in rates]
+    lines.append(
+        f"    return _np.stack(_np.broadcast_arrays({', '.join(outputs)}), axis=-1)"
+    )
+    return "\n".join(lines)
+
+
+def _parameter(name: str) -> str:
+    """Name of parameter `name` in the generated code."""
+    return f"_p_{name}"
+
+
+def _scalar(expression: ast.expr) -> str:
+    """Source of an expression on floats: `where` calls become conditionals."""
+
+    class Conditionals(ast.NodeTransformer):
+        def visit_Call(self, node):
+            self.generic_visit(node)
+            if node.func.id == "where":
+                return ast.IfExp(
+                    test=node.args[0], body=node.args[1], orelse=node.args[2]
+                )
+            return node
+
+    return ast.unparse(Conditionals().visit(ast.parse(ast.unparse(expression))))
+
+
+def _derivative(node: ast.expr, var: str) -> typing.Optional[ast.expr]:
+    """Symbolic d(node)/d(var), None where identically zero. Other names (including
+    rates, see `_scalar_source`) are held constant."""
+    if isinstance(node, ast.Name):
+        return ast.Constant(1.0) if node.id == var else None
+    if isinstance(node, ast.UnaryOp):
+        d = _derivative(node.operand, var)
+        return _neg(d) if isinstance(node.op, ast.USub) else d
+    if isinstance(node, ast.BinOp):
+        u, v = node.left, node.right
+        du, dv = _derivative(u, var), _derivative(v, var)
+        if isinstance(node.op, ast.Add):
+            return _add(du, dv)
+        if isinstance(node.op, ast.Sub):
+            return _add(du, _neg(dv))
+        if isinstance(node.op, ast.Mult):
+            return _add(_mul(du, v), _mul(u, dv))
+        if isinstance(node.op, ast.Div):
+            return _add(
+                _div(du, v),
+                _neg(_div(_mul(u, dv), ast.BinOp(v, ast.Pow(), ast.Constant(2.0)))),
+            )
+        # ast.Pow
+        if dv is None:
+            exponent: typing.Any = v.value if isinstance(v, ast.Constant) else None
+            if exponent == 2:
+                power: ast.expr = u
+            elif exponent is not None and exponent > 2:
+                power = ast.BinOp(u, ast.Pow(), ast.Constant(exponent - 1))
+            else:
+                power = ast.BinOp(
+                    u, ast.Pow(), ast.BinOp(v, ast.Sub(), ast.Constant(1))
+                )
+            return _mul(_mul(v, power), du)
+        return _mul(node, _add(_mul(dv, _call("log", u)), _div(_mul(v, du), u)))
+    if isinstance(node, ast.Call):
+        name, args = node.func.id, node.args  # type: ignore[attr-defined]
+        if name == "where":
+            da, db = _derivative(args[1], var), _derivative(args[2], var)
+            if da is None and db is None:
+                return None
+            return _call(
+                "where", args[0], da or ast.Constant(0.0), db or ast.Constant(0.0)
+            )
+        if name in ("minimum", "maximum"):
+            op = ast.LtE() if name == "minimum" else ast.GtE()
+            condition = ast.Compare(args[0], [op], [args[1]])
+            return _derivative(_call("where", condition, *args), var)
+        d = _derivative(args[0], var)
+        if name == "exp":
+            return _mul(node, d)
+        if name == "log":
+            return _div(d, args[0])
+        if name == "sqrt":
+            return _div(d, ast.BinOp(ast.Constant(2.0), ast.Mult(), node))
+        if name == "abs":
+            return _mul(_call("sign", args[0]), d)
+    # constants, comparisons and sign
+    return None
+
+
+def _call(name: str, *args: ast.expr) -> ast.expr:
+    return ast.Call(ast.Name(name), list(args), [])
+
+
+def _add(
+    a: typing.Optional[ast.expr], b: typing.Optional[ast.expr]
+) -> typing.Optional[ast.expr]:
+    if a is None or b is None:
+        return b if a is None else a
+    if isinstance(b, ast.UnaryOp) and isinstance(b.op, ast.USub):
+        return ast.BinOp(a, ast.Sub(), b.operand)
+    return ast.BinOp(a, ast.Add(), b)
+
+
+def _neg(a: typing.Optional[ast.expr]) -> typing.Optional[ast.expr]:
+    if a is None:
+        return None
+    if isinstance(a, ast.UnaryOp) and isinstance(a.op, ast.USub):
+        return a.operand
+    return ast.UnaryOp(ast.USub(), a)
+
+
+def _mul(
+    a: typing.Optional[ast.expr], b: typing.Optional[ast.expr]
+) -> typing.Optional[ast.expr]:
+    if a is None or b is None:
+        return None
+    for x, y in [(a, b), (b, a)]:
+        if isinstance(x, ast.Constant) and x.value == 1:
+            return y
+        if _is_negative_one(x):
+            return _neg(y)
+    return ast.BinOp(a, ast.Mult(), b)
+
+
+def _is_negative_one(a: ast.expr) -> bool:
+    return (
+        isinstance(a, ast.UnaryOp)
+        and isinstance(a.op, ast.USub)
+        and isinstance(a.operand, ast.Constant)
+        and a.operand.value == 1
+    )
+
+
+def _div(a: typing.Optional[ast.expr], b: ast.expr) -> typing.Optional[ast.expr]:
+    if a is None:
+        return None
+    return ast.BinOp(a, ast.Div(), b)
+
+
+# The model of growth_model.kernel, as a spec to derive variants from.
+GROWCHO = ModelSpec(
+    states=[
+        StateSpec(
+            name,
+            getattr(parameters.InitialConditions(), name),
+            parameters.InitialConditions.units_map()[name],
+            species,
+        )
+        for name, species in zip(
+            growth_model.STATE_NAMES,
+            [
+                None,
+                None,
+                chemistry.Species.Glc,
+                chemistry.Species.Gln,
+                chemistry.Species.Lac,
+                chemistry.Species.NH3,
+                None,
+                None,
+                None,
+                None,
+            ],
+        )
+    ],
+    parameters={
+        f.name: getattr(parameters.InputParameters(), f.name)
+        for f in dataclasses.fields(parameters.InputParameters)
+        if f.type == typing.Union[float, str]
+    },
+    rates={
+        "mu": (
+            "(mu_max * Cglc / (Cglc + Ks_glc) * Cgln / (Cgln + Ks_gln)"
+            " * Ki_amm / (Camm + Ki_amm))"
+            " * (exp(-((T - T_optimal) ** 2.0) / T_optimal_decay_spread ** 2.0)"
+            " * exp(-((pH - pH_optimal) ** 2.0) / pH_optimal_decay_spread ** 2.0))"
+        ),
+        "mu_d": (
+            "mu_d_min + (mu_d_max * Ks_glc / (Cglc + Ks_glc) * Ks_gln / (Cgln + Ks_gln)"
+            " * Camm / (Camm + Ki_amm))"
+        ),
+        "q_glc": "q_glc_max * Cglc / (Cglc + k_glc) * (mu / (mu + mu_max) + 0.5)",
+        "q_gln": "q_gln_max * Cgln / (Cgln + k_gln)",
+        "q_lac": (
+            "Y_lac_glc * Cglc / (Clac + SMALL_CONC) * q_glc"
+            " - where(Cglc < 0.5, q_lac_max, 0.0)"
+        ),
+        "q_amm": "Y_amm_gln * q_gln",
+        "q_mab": "where(Camm > Ki_amm, 0.0, q_mab)",
+    },
+    derivatives={
+        "Xv": "(mu - mu_d - F / V) * Xv",
+        "Xt": "mu * Xv - K_lys * (Xt - Xv) - F / V * Xt",
+        "Cglc": "-q_glc * Xv + F * (Cglc_feed - Cglc) / V",
+        "Cgln": "-q_gln * Xv + F * (Cgln_feed - Cgln) / V",
+        "Clac": "q_lac * Xv - F * Clac / V",
+        "Camm": "q_amm * Xv - F * Camm / V",
+        "Cmab": "q_mab * Xv - F * Cmab / V",
+        "V": "F",
+    },
+    parameter_units=parameters.InputParameters.units_map(),
+    constants={"SMALL_CONC": parameters.SMALL_CONC},
+)
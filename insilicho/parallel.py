@@ -0,0 +1,81 @@
+import concurrent.futures
+import dataclasses
+import types
+import typing
+
+import numpy as np
+
+from insilicho import growth_model, run, solver
+
+
+@dataclasses.dataclass
+class Job:
+    """A GrowCHO configuration to execute, see run.GrowCHO and run.GrowCHO.execute.
+
+    Feed and temp callables must be picklable (e.g. defined at module level).
+    """
+
+    config: typing.Union[typing.Dict[str, typing.Any], str]
+    feed_fn: typing.Optional[growth_model.FeedFunctionType]
+    temp_fn: typing.Optional[growth_model.TempFunctionType]
+    param_rel_stddev: float = 0.05
+    solver_max_step_size: float = np.inf
+    solver_method: str = "odeint"
+    solver_rtol: float = solver.RTOL
+    solver_atol: float = solver.ATOL
+    execute_kwargs: typing.Dict[str, typing.Any] = dataclasses.field(
+        default_factory=dict
+    )
+
+
+def run_many(
+    jobs: typing.Sequence[Job],
+    root_seed: typing.Optional[int] = 0,
+    max_workers: typing.Optional[int] = None,
+) -> typing.Iterator[
+    typing.Tuple[int, typing.Dict[str, typing.Any], types.SimpleNamespace]
+]:
+    """Executes GrowCHO jobs across a process pool, yielding results as they complete.
+
+    Every job gets its own np.random.Generator, spawned from `root_seed` according to
+    the job's position in `jobs`. Results are therefore identical whatever the number
+    of workers or the order in which jobs finish.
+
+    Args:
+        jobs (typing.Sequence[Job]): Configurations to execute.
+        root_seed (typing.Optional[int], optional): Seed the per-job random streams
+            are spawned from. Defaults to 0.
+        max_workers (typing.Optional[int], optional): Number of worker processes.
+            Defaults to the number of processors on the machine.
+
+    Yields:
+        typing.Tuple[int, typing.Dict[str, typing.Any], types.SimpleNamespace]: Index
+            of the job in `jobs`, its sampled result and its full result.
+    """
+    seeds = np.random.SeedSequence(root_seed).spawn(len(jobs))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(_execute, job, seed): i
+            for i, (job, seed) in enumerate(zip(jobs, seeds))
+        }
+        for future in concurrent.futures.as_completed(futures):
+            sampled, full_result = future.result()
+            yield futures[future], sampled, full_result
+
+
+def _execute(
+    job: Job, seed: np.random.SeedSequence
+) -> typing.Tuple[typing.Dict[str, typing.Any], types.SimpleNamespace]:
+    model = run.GrowCHO(
+        job.config,
+        feed_fn=job.feed_fn,
+        temp_fn=job.temp_fn,
+        random_seed=np.random.default_rng(seed),
+        param_rel_stddev=job.param_rel_stddev,
+        solver_max_step_size=job.solver_max_step_size,
+        solver_method=job.solver_method,
+        solver_rtol=job.solver_rtol,
+        solver_atol=job.solver_atol,
+    )
+    sampled = model.execute(**job.execute_kwargs)
+    return sampled, model.full_result
@@ -23,14 +23,13 @@ class UnitValidationMixin:
 
     def __setattr__(self, name, val):
         if isinstance(val, str):
-            unitd_val = units.UNIT(val)
             to_units = self.units_map()[name]
             try:
-                self.__dict__[name] = unitd_val.to(to_units).magnitude
-            except units.pint.errors.DimensionalityError:
+                self.__dict__[name] = units.convert(val, to_units)
+            except ValueError:
                 raise ValueError(
                     f"Dimensionality error in setting {name}, cannot convert from:"
-                    f"{unitd_val.units} to: {to_units}"
+                    f"{units.parse(val)[1]} to: {to_units}"
                 )
         else:
             super().__setattr__(name, val)
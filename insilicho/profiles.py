@@ -0,0 +1,143 @@
+import bisect
+import typing
+
+import numpy as np
+
+
+class PiecewiseConstant:
+    """Profile holding `values[i]` over [times[i], times[i + 1]).
+
+    Before `times[0]` the profile holds `values[0]`, after `times[-1]` it holds
+    `values[-1]`. Evaluates on scalars or arrays of time points in O(log n).
+    """
+
+    kind = "piecewise_constant"
+    # Jumps at breakpoints require the solver to restart there.
+    continuous = False
+
+    def __init__(self, times: typing.Sequence[float], values: typing.Sequence[float]):
+        self.times = np.asarray(times, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+        if self.times.ndim != 1 or self.times.shape != self.values.shape:
+            raise ValueError("times and values must be 1d and of equal length")
+        if not len(self.times):
+            raise ValueError("Profile requires at least one time point")
+        if np.any(np.diff(self.times) <= 0):
+            raise ValueError("Profile times must be strictly increasing")
+        self._times = self.times.tolist()
+        self._values = self.values.tolist()
+
+    @property
+    def breakpoints(self) -> np.ndarray:
+        """Times (in hrs) at which the profile is not smooth."""
+        return self.times[1:]
+
+    def __call__(self, t):
+        if isinstance(t, (int, float)):
+            return self._values[max(bisect.bisect_right(self._times, t) - 1, 0)]
+        idx = np.searchsorted(self.times, t, side="right") - 1
+        return self.values[np.maximum(idx, 0)]
+
+    def to_config(self) -> typing.Dict[str, typing.Any]:
+        """Config section describing the profile, see `from_config`."""
+        return {"type": self.kind, "times": self._times, "values": self._values}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_config() == other.to_config()
+
+    def __hash__(self):
+        return hash((type(self), tuple(self._times), tuple(self._values)))
+
+    def __repr__(self):
+        return f"{type(self).__name__}(times={self._times}, values={self._values})"
+
+
+class PiecewiseLinear(PiecewiseConstant):
+    """Profile interpolating linearly between (times[i], values[i]).
+
+    Before `times[0]` and after `times[-1]` the profile holds its end values.
+    """
+
+    kind = "piecewise_linear"
+    # Kinks only, the solver just needs to step onto breakpoints.
+    continuous = True
+
+    @property
+    def breakpoints(self) -> np.ndarray:
+        return self.times
+
+    def __call__(self, t):
+        if isinstance(t, (int, float)):
+            i = bisect.bisect_right(self._times, t)
+            if i == 0:
+                return self._values[0]
+            if i == len(self._times):
+                return self._values[-1]
+            t0, t1 = self._times[i - 1], self._times[i]
+            v0, v1 = self._values[i - 1], self._values[i]
+            return v0 + (v1 - v0) * (t - t0) / (t1 - t0)
+        return np.interp(t, self.times, self.values)
+
+
+class SetpointShift(PiecewiseConstant):
+    """Piecewise constant profile given as an initial setpoint and later shifts.
+
+    Example: `SetpointShift(36.5, [(120, 33.0)])` is a temperature shift from 36.5
+    degC to 33 degC on day 5.
+    """
+
+    kind = "setpoint_shift"
+
+    def __init__(
+        self,
+        initial: float,
+        shifts: typing.Sequence[typing.Tuple[float, float]] = (),
+    ):
+        self.initial = float(initial)
+        self.shifts = [(float(t), float(v)) for t, v in shifts]
+        times = [-np.inf] + [t for t, _ in self.shifts]
+        values = [self.initial] + [v for _, v in self.shifts]
+        super().__init__(times, values)
+
+    def to_config(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "type": self.kind,
+            "initial": self.initial,
+            "shifts": [list(s) for s in self.shifts],
+        }
+
+    def __repr__(self):
+        return f"{type(self).__name__}(initial={self.initial}, shifts={self.shifts})"
+
+
+ProfileType = typing.Union[PiecewiseConstant, PiecewiseLinear, SetpointShift]
+
+
+def from_config(cfg: typing.Dict[str, typing.Any]) -> ProfileType:
+    """Builds a profile from a config section (e.g. parsed from yaml).
+
+    Supported sections:
+        {"type": "constant", "value": v}
+        {"type": "piecewise_constant", "times": [...], "values": [...]}
+        {"type": "piecewise_linear", "times": [...], "values": [...]}
+        {"type": "setpoint_shift", "initial": v, "shifts": [[t, v], ...]}
+
+    Args:
+        cfg (typing.Dict[str, typing.Any]): Profile definition.
+
+    Raises:
+        ValueError: If the profile type is unknown.
+
+    Returns:
+        ProfileType: The profile.
+    """
+    kind = cfg.get("type")
+    if kind == "constant":
+        return PiecewiseConstant([0.0], [cfg["value"]])
+    if kind == PiecewiseConstant.kind:
+        return PiecewiseConstant(cfg["times"], cfg["values"])
+    if kind == PiecewiseLinear.kind:
+        return PiecewiseLinear(cfg["times"], cfg["values"])
+    if kind == SetpointShift.kind:
+        return SetpointShift(cfg["initial"], cfg.get("shifts", []))
+    raise ValueError(f"Unknown profile type: {kind}")
@@ -1,6 +1,281 @@
 import dataclasses
+import functools
+import types
+import typing
+
+import numpy as np
+
+from insilicho import growth_model, modelspec, parameters, solver
+
+# What happens once V reaches the working volume of a vessel:
+#   overflow: the feed keeps running, the excess culture overflows and V is held;
+#   harvest: culture is drawn down to `Vessel.harvest_volume`, repeatedly;
+#   stop_feed: the feed is switched off.
+ON_FULL = ("overflow", "harvest", "stop_feed")
+
+# GROWCHO with V held from `t_full` on. Concentrations still dilute with the feed,
+# since overflowing culture leaves at the concentrations of the vessel.
+OVERFLOW = dataclasses.replace(
+    modelspec.GROWCHO,
+    parameters=dict(modelspec.GROWCHO.parameters, t_full=np.inf),
+    derivatives=dict(modelspec.GROWCHO.derivatives, V="where(t < t_full, F, 0.0)"),
+)
+
+# Step (in hrs) of the grid the feed is integrated on to find fill times.
+_INFLOW_STEP = 0.25
 
 
 @dataclasses.dataclass
 class Vessel:
+    """A bioreactor of maximum working volume `volume` (in L).
+
+    `on_full` (one of ON_FULL) is applied when the culture reaches `volume`. Harvests
+    leave `harvest_volume` (in L) in the vessel, half of `volume` by default.
+    """
+
     volume: float = 250 / 1000
+    on_full: str = "overflow"
+    harvest_volume: typing.Optional[float] = None
+
+    def __post_init__(self):
+        if self.on_full not in ON_FULL:
+            raise ValueError(
+                f"Unknown on_full: {self.on_full}, expected one of {ON_FULL}"
+            )
+        if self.harvest_volume is None:
+            self.harvest_volume = self.volume / 2
+        if not 0 < self.harvest_volume < self.volume:
+            raise ValueError("harvest_volume must be between 0 and the vessel volume")
+
+
+class VesselArray:
+    """An array of vessels, each with its own feed and temperature schedules.
+
+    Vessels are integrated one by one on the fast path of solver.solve, with the
+    working volume enforced through exact solver events: fill times are found
+    up front from the integral of each feed (V only depends on the feed), and the
+    solver restarts there, drawing culture down for harvests. Results of all vessels
+    are returned as stacked arrays.
+    """
+
+    def __init__(
+        self,
+        vessels: typing.Sequence[Vessel],
+        feed_fns: typing.Any,
+        temp_fns: typing.Any,
+        params: typing.Union[
+            None,
+            parameters.InputParameters,
+            typing.Sequence[parameters.InputParameters],
+        ] = None,
+        initial_conditions: typing.Union[
+            None,
+            parameters.InitialConditions,
+            typing.Sequence[parameters.InitialConditions],
+        ] = None,
+    ):
+        """
+        Args:
+            vessels (typing.Sequence[Vessel]): The N vessels of the array.
+            feed_fns (typing.Any): Feed profile shared by all vessels, or a sequence of
+                one profile per vessel.
+            temp_fns (typing.Any): Temperature profile shared by all vessels, or a
+                sequence of one profile per vessel.
+            params (optional): Parameters shared by all vessels, or one set per vessel.
+                Defaults to None (parameters.InputParameters()).
+            initial_conditions (optional): Initial conditions shared by all vessels, or
+                one set per vessel. Defaults to None (parameters.InitialConditions()).
+
+        Raises:
+            ValueError: If the number of profiles, parameter sets or initial
+                conditions does not match the number of vessels, or a vessel starts
+                above its working volume.
+        """
+        self.vessels = list(vessels)
+        N = len(self.vessels)
+        self.feed_fns = _per_vessel(feed_fns, N, callable, "feed profiles")
+        self.temp_fns = _per_vessel(temp_fns, N, callable, "temperature profiles")
+        self.params = _per_vessel(
+            params or parameters.InputParameters(),
+            N,
+            lambda p: isinstance(p, parameters.InputParameters),
+            "parameter sets",
+        )
+        self.initial_conditions = _per_vessel(
+            initial_conditions or parameters.InitialConditions(),
+            N,
+            lambda ic: isinstance(ic, parameters.InitialConditions),
+            "initial conditions",
+        )
+        for i, (vessel, ic) in enumerate(zip(self.vessels, self.initial_conditions)):
+            if ic.V > vessel.volume:
+                raise ValueError(
+                    f"Vessel {i} starts at {ic.V} L, above its volume of "
+                    f"{vessel.volume} L"
+                )
+
+    def __len__(self):
+        return len(self.vessels)
+
+    def simulate(
+        self,
+        tspan: typing.Any = None,
+        solver_hmax: float = np.inf,
+        method: typing.Union[str, solver.IntegratorType] = "odeint",
+        rtol: float = solver.RTOL,
+        atol: float = solver.ATOL,
+    ) -> types.SimpleNamespace:
+        """Simulates all vessels over `tspan`.
+
+        Args:
+            tspan (typing.Any, optional): Time points (in hrs) shared by all vessels.
+                Defaults to hourly over the Ndays of the first vessel.
+            solver_hmax (float, optional): max step size solver can take. Defaults to
+                np.inf.
+            method (typing.Union[str, solver.IntegratorType], optional): Integration
+                method, see solver.solve. Defaults to "odeint".
+            rtol (float, optional): Relative tolerance. Defaults to solver.RTOL.
+            atol (float, optional): Absolute tolerance. Defaults to solver.ATOL.
+
+        Returns:
+            types.SimpleNamespace: With attributes
+                t: The (T,) time points.
+                state: Array of shape (N, T, 10) of states.
+                state_vars: Array of shape (N, T, 10) of state variables.
+                info: List of solver infodicts, one per vessel.
+                full_at: Array of shape (N,) of the times vessels first reached their
+                    volume, NaN for vessels that never did.
+                harvest_times: List of arrays of harvest times, one per vessel.
+                removed: Array of shape (N,) of the culture volumes (in L) that
+                    overflowed or were harvested.
+        """
+        if tspan is None:
+            Ndays = self.params[0].Ndays
+            tspan = np.linspace(0, 24 * Ndays, 24 * Ndays + 1)
+        tspan = np.asarray(tspan, dtype=float)
+
+        N = len(self)
+        state = np.empty((N, len(tspan), len(growth_model.STATE_NAMES)))
+        state_vars = np.empty((N, len(tspan), len(growth_model.STATE_VAR_NAMES)))
+        info = []
+        full_at = np.full(N, np.nan)
+        harvest_times = []
+        removed = np.zeros(N)
+        for i, vessel in enumerate(self.vessels):
+            params, ic = self.params[i], self.initial_conditions[i]
+            feed_fn, temp_fn = self.feed_fns[i], self.temp_fns[i]
+            grid, inflow = _inflow(feed_fn, tspan[0], tspan[-1])
+            room = vessel.volume - ic.V
+            model: typing.Any = growth_model.kernel
+            events: typing.List[solver.EventType] = []
+            harvests = np.empty(0)
+
+            if inflow[-1] >= room:
+                full_at[i] = float(_time_at(grid, inflow, room))
+                if vessel.on_full == "overflow":
+                    model = modelspec.compile_spec(OVERFLOW)
+                    params = types.SimpleNamespace(**vars(params), t_full=full_at[i])
+                    events = [(full_at[i], None)]
+                    removed[i] = inflow[-1] - room
+                elif vessel.on_full == "harvest":
+                    harvest_volume = typing.cast(float, vessel.harvest_volume)
+                    drawn = vessel.volume - harvest_volume
+                    n = int((inflow[-1] - room) // drawn) + 1
+                    harvests = _time_at(grid, inflow, room + drawn * np.arange(n))
+                    jump = functools.partial(_harvest, volume=harvest_volume)
+                    events = [(float(t), jump) for t in harvests]
+                    removed[i] = drawn * n
+                else:
+                    feed_fn = _StoppedFeed(feed_fn, full_at[i])
+
+            state[i], state_vars[i], member_info = solver.solve(
+                params,
+                ic,
+                model=model,
+                tspan=tspan,
+                feed_fn=feed_fn,
+                temp_fn=temp_fn,
+                solver_hmax=solver_hmax,
+                method=method,
+                rtol=rtol,
+                atol=atol,
+                events=events,
+            )
+            info.append(member_info)
+            harvest_times.append(harvests)
+
+        return types.SimpleNamespace(
+            t=tspan,
+            state=state,
+            state_vars=state_vars,
+            info=info,
+            full_at=full_at,
+            harvest_times=harvest_times,
+            removed=removed,
+        )
+
+
+class _StoppedFeed:
+    """Feed profile `fn` switched off from `t_stop` on."""
+
+    continuous = False
+
+    def __init__(self, fn: typing.Any, t_stop: float):
+        self.fn = fn
+        self.t_stop = t_stop
+
+    @property
+    def breakpoints(self) -> np.ndarray:
+        return np.append(getattr(self.fn, "breakpoints", []), self.t_stop)
+
+    def __call__(self, t):
+        if isinstance(t, (int, float)):
+            return self.fn(t) if t < self.t_stop else 0.0
+        t = np.asarray(t, dtype=float)
+        return np.where(t < self.t_stop, growth_model.evaluate_profile(self.fn, t), 0.0)
+
+
+def _harvest(state: np.ndarray, volume: float) -> np.ndarray:
+    """Draws culture down to `volume`, leaving concentrations unchanged."""
+    state = np.array(state, dtype=float)
+    state[growth_model.STATE_NAMES.index("V")] = volume
+    return state
+
+
+def _inflow(
+    feed_fn: typing.Any, t0: float, t_end: float
+) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Cumulative feed volume (in L) over [t0, t_end].
+
+    The feed is integrated by the midpoint rule on a grid that includes its
+    breakpoints, which is exact for piecewise constant and linear profiles.
+    """
+    n = int(np.ceil((t_end - t0) / _INFLOW_STEP)) + 1
+    breakpoints = np.asarray(getattr(feed_fn, "breakpoints", []), dtype=float)
+    grid = np.union1d(
+        np.linspace(t0, t_end, max(n, 2)),
+        breakpoints[(breakpoints > t0) & (breakpoints < t_end)],
+    )
+    rate = growth_model.evaluate_profile(feed_fn, (grid[1:] + grid[:-1]) / 2)
+    return grid, np.concatenate([[0.0], np.cumsum(rate * np.diff(grid))])
+
+
+def _time_at(grid: np.ndarray, inflow: np.ndarray, volume: typing.Any) -> typing.Any:
+    """First time(s) the cumulative `inflow` reaches `volume`, which it must."""
+    k = np.minimum(np.searchsorted(inflow, volume), len(inflow) - 1)
+    k0 = np.maximum(k - 1, 0)
+    span = np.where(k > 0, inflow[k] - inflow[k0], 1.0)
+    return grid[k0] + np.where(k > 0, (volume - inflow[k0]) / span, 0.0) * (
+        grid[k] - grid[k0]
+    )
+
+
+def _per_vessel(
+    value: typing.Any, N: int, is_single: typing.Callable, what: str
+) -> typing.List[typing.Any]:
+    if is_single(value):
+        return [value] * N
+    values = list(value)
+    if len(values) != N:
+        raise ValueError(f"Got {len(values)} {what} for {N} vessels.")
+    return values
@@ -0,0 +1,235 @@
+import json
+import os
+import types
+import typing
+
+import numpy as np
+
+from insilicho import growth_model
+
+# Bump whenever the on-disk layout of Trajectories changes.
+FORMAT_VERSION = 1
+NAMES = list(growth_model.STATE_NAMES) + list(growth_model.STATE_VAR_NAMES)
+
+
+class Trajectories:
+    """Full results of many runs on a shared time axis, in one structured array.
+
+    Every run is a record with one field per recorded variable (see NAMES), each
+    holding the variable over the whole time axis. Variables are thus contiguous per
+    run, and `self["Xv"]` is a zero-copy (n_runs, T) view. Saved to a directory of
+    `data.npy`, `t.npy` and `meta.json`, which `open` memory-maps, so analyses only
+    read the variables and runs they slice.
+    """
+
+    def __init__(self, t: np.ndarray, data: np.ndarray):
+        """
+        Args:
+            t (np.ndarray): Time axis (in hrs) of shape (T,), shared by all runs.
+            data (np.ndarray): Structured array of shape (n_runs,), see
+                `record_dtype`.
+        """
+        self.t = t
+        self.data = data
+
+    @staticmethod
+    def record_dtype(
+        names: typing.Sequence[str], n_times: int, dtype: typing.Any = np.float64
+    ) -> np.dtype:
+        """Structured dtype of a single run.
+
+        Args:
+            names (typing.Sequence[str]): Recorded variables, from NAMES.
+            n_times (int): Length of the time axis.
+            dtype (typing.Any, optional): Storage precision, e.g. np.float32 to halve
+                the size. Defaults to np.float64.
+
+        Raises:
+            ValueError: If a name is unknown.
+
+        Returns:
+            np.dtype: The dtype.
+        """
+        unknown = set(names) - set(NAMES)
+        if unknown:
+            raise ValueError(f"Unknown variables: {unknown}")
+        return np.dtype([(name, dtype, (n_times,)) for name in names])
+
+    @classmethod
+    def empty(
+        cls,
+        n_runs: int,
+        t: typing.Union[typing.Sequence[float], np.ndarray],
+        names: typing.Optional[typing.Sequence[str]] = None,
+        dtype: typing.Any = np.float64,
+    ) -> "Trajectories":
+        """In-memory container for `n_runs` runs, filled in with `self[i] = ...`.
+
+        Args:
+            n_runs (int): Number of runs.
+            t (typing.Union[typing.Sequence[float], np.ndarray]): Shared time axis (in
+                hrs).
+            names (typing.Optional[typing.Sequence[str]], optional): Recorded
+                variables. Defaults to NAMES.
+            dtype (typing.Any, optional): Storage precision. Defaults to np.float64.
+
+        Returns:
+            Trajectories: Zero-filled container.
+        """
+        t = np.asarray(t, dtype=float)
+        return cls(
+            t, np.zeros(n_runs, dtype=cls.record_dtype(names or NAMES, len(t), dtype))
+        )
+
+    @classmethod
+    def create(
+        cls,
+        directory: str,
+        n_runs: int,
+        t: typing.Union[typing.Sequence[float], np.ndarray],
+        names: typing.Optional[typing.Sequence[str]] = None,
+        dtype: typing.Any = np.float64,
+    ) -> "Trajectories":
+        """On-disk container for `n_runs` runs, memory-mapped for writing; runs
+        assigned with `self[i] = ...` go straight to disk. See `empty` for arguments.
+        """
+        t = np.asarray(t, dtype=float)
+        record = cls.record_dtype(names or NAMES, len(t), dtype)
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "t.npy"), t)
+        _write_meta(directory, record)
+        data = np.lib.format.open_memmap(
+            os.path.join(directory, "data.npy"),
+            mode="w+",
+            dtype=record,
+            shape=(n_runs,),
+        )
+        return cls(t, data)
+
+    @classmethod
+    def from_results(
+        cls,
+        results: typing.Sequence[types.SimpleNamespace],
+        dtype: typing.Any = np.float64,
+    ) -> "Trajectories":
+        """Packs full results (see run.GrowCHO.full_result) of runs on the same time
+        axis, keeping the variables recorded by the first.
+
+        Args:
+            results (typing.Sequence[types.SimpleNamespace]): Full results.
+            dtype (typing.Any, optional): Storage precision. Defaults to np.float64.
+
+        Raises:
+            ValueError: If the results have different time axes or lack variables.
+
+        Returns:
+            Trajectories: The packed results.
+        """
+        first = results[0]
+        trajectories = cls.empty(
+            len(results), first.t, _recorded_names(first), dtype=dtype
+        )
+        for i, result in enumerate(results):
+            trajectories[i] = result
+        return trajectories
+
+    @classmethod
+    def open(cls, directory: str, mode: str = "r") -> "Trajectories":
+        """Memory-maps trajectories saved by `save` or `create`, without reading them.
+
+        Args:
+            directory (str): Directory of the trajectories.
+            mode (str, optional): Memory-map mode, see np.memmap; "r+" to write.
+                Defaults to "r".
+
+        Raises:
+            ValueError: If the directory holds an unsupported format version.
+
+        Returns:
+            Trajectories: The memory-mapped trajectories.
+        """
+        with open(os.path.join(directory, "meta.json"), "r") as f:
+            meta = json.load(f)
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported trajectories version: {meta['version']}")
+        return cls(
+            np.load(os.path.join(directory, "t.npy")),
+            np.load(
+                os.path.join(directory, "data.npy"),
+                mmap_mode=mode,  # type: ignore[arg-type]
+            ),
+        )
+
+    def save(self, directory: str):
+        """Writes the trajectories to `directory`, see `open`."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "t.npy"), self.t)
+        np.save(os.path.join(directory, "data.npy"), self.data)
+        _write_meta(directory, self.data.dtype)
+
+    def flush(self):
+        """Writes pending changes of memory-mapped trajectories to disk."""
+        if isinstance(self.data, np.memmap):
+            self.data.flush()
+
+    @property
+    def names(self) -> typing.List[str]:
+        """Recorded variables."""
+        return list(self.data.dtype.names or [])
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """Variable `name` of all runs, a (n_runs, T) view."""
+        return self.data[name]
+
+    def __setitem__(self, i: int, result: types.SimpleNamespace):
+        """Stores full result `result` (see run.GrowCHO.full_result) as run `i`."""
+        if not np.array_equal(result.t, self.t):
+            raise ValueError("Result is not on the shared time axis")
+        recorded = _recorded_names(result)
+        missing = set(self.names) - set(recorded)
+        if missing:
+            raise ValueError(f"Result lacks variables: {missing}")
+        columns = np.concatenate(
+            [np.asarray(result.state), np.asarray(result.state_vars)], axis=1
+        )
+        for name in self.names:
+            self.data[name][i] = columns[:, recorded.index(name)]
+
+    def run(self, i: int) -> types.SimpleNamespace:
+        """Run `i` in the layout of run.GrowCHO.full_result, in float64."""
+        state_names = [n for n in self.names if n in growth_model.STATE_NAMES]
+        state_var_names = [n for n in self.names if n in growth_model.STATE_VAR_NAMES]
+        return types.SimpleNamespace(
+            state=self._columns(i, state_names),
+            state_vars=self._columns(i, state_var_names),
+            t=self.t,
+            info={},
+            state_names=state_names,
+            state_var_names=state_var_names,
+        )
+
+    def _columns(self, i: int, names: typing.List[str]) -> np.ndarray:
+        columns = np.empty((len(self.t), len(names)))
+        for k, name in enumerate(names):
+            columns[:, k] = self.data[name][i]
+        return columns
+
+
+def _recorded_names(result: types.SimpleNamespace) -> typing.List[str]:
+    """Names of the state and state var columns of a full result."""
+    return list(getattr(result, "state_names", growth_model.STATE_NAMES)) + list(
+        getattr(result, "state_var_names", growth_model.STATE_VAR_NAMES)
+    )
+
+
+def _write_meta(directory: str, record: np.dtype):
+    meta = {
+        "version": FORMAT_VERSION,
+        "names": list(record.names or []),
+        "dtype": str(record[0].base),
+    }
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(meta, f)
@@ -1,15 +1,35 @@
 import dataclasses
+import json
+import time
 import types
 import typing
 
 import numpy as np
-import yaml
 
-from insilicho import growth_model, parameters, plotter, solver, util
+from insilicho import (
+    cache,
+    feeds,
+    growth_model,
+    instrumentation,
+    parameters,
+    profiles,
+    solver,
+    util,
+)
+
+RandomGeneratorType = typing.Union[np.random.Generator, np.random.RandomState]
+# Bump whenever the layout of GrowCHO.checkpoint changes.
+CHECKPOINT_VERSION = 2
+# How checkpoints spell non-finite floats, which json has no tokens for.
+_NON_FINITE = ("inf", "-inf", "nan")
+# "dense", "samples", "native", or an explicit time grid, see GrowCHO.execute
+OutputType = typing.Union[str, typing.Sequence[float], np.ndarray]
 
 
 def add_relative_normal_noise(
-    a: typing.Union[np.ndarray, float, int], relative_std_dev: float
+    a: typing.Union[np.ndarray, float, int],
+    relative_std_dev: float,
+    rng: typing.Optional[RandomGeneratorType] = None,
 ) -> np.ndarray:
     """_summary_
 
@@ -20,6 +40,8 @@ def add_relative_normal_noise(
             sample will be taken from a normal distribution of mean = 1, standard
             deviation = `relative_std_dev`. The noise sample(s) will then be multiplied
             to value(s) in `a`.
+        rng (typing.Optional[RandomGeneratorType], optional): Random generator to draw
+            the noise from. Defaults to the global numpy random state.
 
     Returns:
         np.ndarray: an array of values with added noise.
@@ -29,7 +51,7 @@ def add_relative_normal_noise(
     else:
         array = a
 
-    return array * np.random.normal(
+    return array * (rng or np.random).normal(
         loc=1.0, scale=float(relative_std_dev), size=len(array)
     )
 
@@ -40,9 +62,15 @@ class GrowCHO:
         config: typing.Union[typing.Dict[str, typing.Any], str],
         feed_fn: typing.Optional[growth_model.FeedFunctionType],
         temp_fn: typing.Optional[growth_model.TempFunctionType],
-        random_seed: int = 0,
-        param_rel_stddev: float = 0.05,
+        random_seed: typing.Union[int, np.random.Generator] = 0,
+        param_rel_stddev: typing.Optional[float] = 0.05,
         solver_max_step_size: float = np.inf,
+        boluses: typing.Optional[typing.Sequence[typing.Any]] = None,
+        result_cache: typing.Optional[cache.ResultCache] = None,
+        stats_hook: typing.Optional[instrumentation.StatsHookType] = None,
+        solver_method: typing.Union[str, solver.IntegratorType] = "odeint",
+        solver_rtol: float = solver.RTOL,
+        solver_atol: float = solver.ATOL,
     ):
         """Class to simulate CHO growth.
 
@@ -51,16 +79,40 @@ class GrowCHO:
                 file or a dictionary with initial conditions and parameter values.
             feed_fn (typing.Optional[growth_model.FeedFunctionType]): A callable
                 describing time dependence of feed profile, expected units for feed rate
-                are in L/h.
+                are in L/h. If None, taken from the `feed_profile` section of the
+                config, see profiles.from_config.
             temp_fn (typing.Optional[growth_model.TempFunctionType]): A callable
                 describing time dependence of temperature profile, expected units for
-                temp are in degC.
-            random_seed (int, optional): random seed to control sampling events.
-                Defaults to 0.
-            param_rel_stddev (float, optional): Relative std deviation while sampling
-                parameter, assumes a normal distribution.. Defaults to 0.05.
+                temp are in degC. If None, taken from the `temp_profile` section of the
+                config, see profiles.from_config.
+            random_seed (typing.Union[int, np.random.Generator], optional): random
+                seed, or generator, to control sampling events. Integer seeds give the
+                same stream as seeding the legacy global numpy random state, without
+                touching it. Defaults to 0.
+            param_rel_stddev (typing.Optional[float], optional): Relative std
+                deviation while sampling parameter, assumes a normal distribution.
+                None takes the configured parameters as they are, without drawing
+                from the random generator. Defaults to 0.05.
             solver_max_step_size (float, optional): Max step size for the odeint solver
                 to take. Defaults to np.inf.
+            boluses (typing.Optional[typing.Sequence[typing.Any]], optional): Bolus
+                feeds on top of the continuous `feed_fn`, as feeds.Bolus objects or
+                (time, volume[, composition]) tuples. Each is applied as an exact jump
+                in volume and concentrations. Defaults to None.
+            result_cache (typing.Optional[cache.ResultCache], optional): Cache of full
+                results shared between runs; only runs whose feed/temp are profiles
+                (see insilicho.profiles) can be cached. Defaults to None.
+            stats_hook (typing.Optional[instrumentation.StatsHookType], optional):
+                Called with the instrumentation.RunStats of every `execute`, which
+                is then instrumented by default. Defaults to None.
+            solver_method (typing.Union[str, solver.IntegratorType], optional):
+                Integration method, see solver.solve; e.g. "rk4" for cheap previews
+                or "auto". Native output always steps LSODA. Defaults to "odeint".
+            solver_rtol (float, optional): Relative tolerance of the solver, e.g.
+                looser for screening and tighter for fitting. Defaults to
+                solver.RTOL.
+            solver_atol (float, optional): Absolute tolerance of the solver.
+                Defaults to solver.ATOL.
         """
         cfg_dict, cfg_path = None, None
         if type(config) == dict:
@@ -69,16 +121,171 @@ class GrowCHO:
             cfg_path = config
 
         self.params, self.initial_conditions = unpack(cfg_dict, cfg_path)
-        self.seed = np.random.seed(random_seed)
-        self._randomize_params(param_rel_stddev)
+        if isinstance(random_seed, np.random.Generator):
+            self.seed = None
+            self.rng: RandomGeneratorType = random_seed
+        else:
+            self.seed = random_seed
+            self.rng = np.random.RandomState(random_seed)
+        if param_rel_stddev is not None:
+            self._randomize_params(param_rel_stddev)
+
+        if feed_fn is None or temp_fn is None:
+            feed_profile, temp_profile = unpack_profiles(cfg_dict, cfg_path)
+            feed_fn = feed_fn or feed_profile
+            temp_fn = temp_fn or temp_profile
 
         self.feed_fn = feed_fn
         self.temp_fn = temp_fn
         self.solver_max_step_size = solver_max_step_size
+        self.solver_method = solver_method
+        self.solver_rtol = solver_rtol
+        self.solver_atol = solver_atol
+        self.boluses = feeds.as_boluses(boluses)
+        self.result_cache = result_cache
+        self.stats_hook = stats_hook
 
         self._full_result = types.SimpleNamespace(
             state=[], state_vars=[], t=[], info={}
         )
+        self.reset()
+
+    @property
+    def t(self) -> float:
+        """Current time (in hrs) of the step-wise simulation, see `advance`."""
+        return self._t
+
+    @property
+    def state(self) -> np.ndarray:
+        """Current states of the step-wise simulation, see `advance`."""
+        if self._state is None:
+            return np.array(self.initial_conditions.tolist(), dtype=float)
+        return self._state.copy()
+
+    def reset(
+        self,
+        initial_conditions: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        t0: float = 0.0,
+    ):
+        """Restarts the step-wise simulation at `t0`, with the model's feed and temp
+        profiles (`feed_fn` and `temp_fn`).
+
+        Args:
+            initial_conditions (typing.Optional[typing.Dict[str, typing.Any]],
+                optional): Initial conditions to restart from. Defaults to the current
+                initial conditions.
+            t0 (float, optional): time (in hrs) to restart at. Defaults to 0.
+        """
+        if initial_conditions:
+            self.initial_conditions = util.DataClassUnpack.instantiate(
+                parameters.InitialConditions, initial_conditions
+            )
+        self._t = float(t0)
+        self._state: typing.Optional[np.ndarray] = None
+        # controls set by advance, None follows feed_fn/temp_fn
+        self._feed: typing.Any = None
+        self._temp: typing.Any = None
+
+    def advance(
+        self,
+        to_t: float,
+        feed: typing.Optional[
+            typing.Union[float, growth_model.FeedFunctionType]
+        ] = None,
+        temp: typing.Optional[
+            typing.Union[float, growth_model.TempFunctionType]
+        ] = None,
+        output: OutputType = "dense",
+    ) -> types.SimpleNamespace:
+        """Continues the simulation from its current time and states up to `to_t`.
+
+        Only the new interval is integrated, so a closed loop of many short steps costs
+        as much as a single run over the same horizon. Boluses falling into the interval
+        are applied. Parameters are those of the object, randomized once at
+        construction.
+
+        Args:
+            to_t (float): time (in hrs) to advance to.
+            feed (typing.Optional[typing.Union[float, growth_model.FeedFunctionType]],
+                optional): Feed rate (in L/h) or profile to use from now on, held for
+                later steps until changed. Defaults to None (keep the current one;
+                `feed_fn`, read on every step, until a feed is set).
+            temp (typing.Optional[typing.Union[float, growth_model.TempFunctionType]],
+                optional): Temperature (in degC) or profile to use from now on, held
+                for later steps until changed. Defaults to None (keep the current one;
+                `temp_fn`, read on every step, until a temp is set).
+            output (OutputType, optional): time points to report: "dense" (1000 points
+                per day), "native" (the solver's own steps) or an explicit array of
+                times within the interval. Defaults to "dense".
+
+        Raises:
+            ValueError: If `to_t` is not after the current time, or `output` is
+                invalid.
+            RuntimeError: If integration/LSODA solver runs into failures; the
+                simulation is then left at its current time.
+
+        Returns:
+            types.SimpleNamespace: state, state_vars, t and info over the interval,
+                including its start.
+        """
+        if to_t <= self._t:
+            raise ValueError(f"Cannot advance from t={self._t} to t={to_t}")
+        if feed is not None:
+            self._feed = _held(feed)
+        if temp is not None:
+            self._temp = _held(temp)
+
+        # boluses at the start of the interval were applied by the previous step
+        boluses = [
+            b
+            for b in self.boluses
+            if self._t < float(b.time) <= to_t
+            or (self._state is None and float(b.time) == self._t)
+        ]
+        kwargs: typing.Dict[str, typing.Any] = dict(
+            feed_fn=self.feed_fn if self._feed is None else self._feed,
+            temp_fn=self.temp_fn if self._temp is None else self._temp,
+            solver_hmax=self.solver_max_step_size,
+            boluses=boluses,
+            rtol=self.solver_rtol,
+            atol=self.solver_atol,
+        )
+        if isinstance(output, str) and output == "native":
+            tspan, state, state_vars, infodict = solver.solve_native(
+                self.params, self.state, t_span=(self._t, to_t), **kwargs
+            )
+        elif isinstance(output, str) and output == "dense":
+            n_points = max(int(np.ceil(1000 * (to_t - self._t) / 24)), 2)
+            tspan = np.linspace(self._t, to_t, n_points)
+            state, state_vars, infodict = solver.solve(
+                self.params,
+                self.state,
+                tspan=tspan,
+                method=self.solver_method,
+                **kwargs,
+            )
+        elif isinstance(output, str):
+            raise ValueError(f"Unknown output mode: {output}")
+        else:
+            tspan = np.union1d(np.asarray(output, dtype=float), [self._t, to_t])
+            if tspan[0] < self._t or tspan[-1] > to_t:
+                raise ValueError("Output times must lie within the interval")
+            state, state_vars, infodict = solver.solve(
+                self.params,
+                self.state,
+                tspan=tspan,
+                method=self.solver_method,
+                **kwargs,
+            )
+
+        if infodict["message"] != "Integration successful.":
+            raise RuntimeError(
+                "Integration failed at specified params and/or initial values."
+            )
+        self._t, self._state = float(to_t), state[-1].copy()
+        return types.SimpleNamespace(
+            state=state, state_vars=state_vars, t=tspan, info=infodict
+        )
 
     def _randomize_params(self, rel_stddev: float):
         """Randomize parameters for the model.
@@ -89,7 +296,7 @@ class GrowCHO:
         """
         noisy_params = self.params_with_noise()
         for pname, pval in noisy_params.items():
-            new_val = add_relative_normal_noise(pval, rel_stddev)[0]
+            new_val = add_relative_normal_noise(pval, rel_stddev, self.rng)[0]
             setattr(self.params, pname, new_val)
 
     def params_with_noise(self):
@@ -117,6 +324,10 @@ class GrowCHO:
         plot: bool = False,
         sampling_stddev: float = 0.05,
         starting_at_day: int = 0,
+        use_cache: bool = True,
+        output: OutputType = "dense",
+        record: typing.Optional[typing.Sequence[str]] = None,
+        instrument: typing.Optional[bool] = None,
     ) -> typing.Dict[str, typing.Any]:
         """Execute the GrowCHO model object
 
@@ -130,9 +341,26 @@ class GrowCHO:
                 sampling event, relative to sample magnitude. Defaults to 0.05.
             starting_at_day (int, optional): day at which to start the simulation.
                 Defaults to 0.
+            use_cache (bool, optional): look up and store the full result in
+                `result_cache`, if one was given. Defaults to True.
+            output (OutputType, optional): time points kept in `full_result`:
+                "dense" (1000 points per day), "samples" (the sampling instants
+                only), "native" (the solver's own steps plus the sampling instants)
+                or an explicit array of times (in hrs) within the simulated days.
+                The sampled output agrees between modes to within the solver
+                tolerances. Defaults to "dense".
+            record (typing.Optional[typing.Sequence[str]], optional): names of the
+                states (see growth_model.STATE_NAMES) and state variables (see
+                growth_model.STATE_VAR_NAMES) kept in `full_result`. Defaults to
+                None (all).
+            instrument (typing.Optional[bool], optional): count solver evaluations
+                and feed/temp calls and time every phase of the run, into
+                `full_result.stats` (see instrumentation.RunStats). Defaults to
+                None, i.e. only if a `stats_hook` was given.
 
         Raises:
             IOError: If initial conditions were not supplied.
+            ValueError: If `output` or `record` are invalid.
             RuntimeError: If integration/LSODA solver runs into failures.
 
         Returns:
@@ -140,6 +368,10 @@ class GrowCHO:
                 concentrations.
 
         """
+        if instrument is None:
+            instrument = self.stats_hook is not None
+        stats = instrumentation.RunStats() if instrument else None
+        started = time.perf_counter()
 
         if initial_conditions:
             self.initial_conditions = util.DataClassUnpack.instantiate(
@@ -149,29 +381,58 @@ class GrowCHO:
         if not self.initial_conditions:
             raise IOError("Initial conditions undefined for sim")
 
+        state_cols, state_var_cols = _record_columns(record)
+
         tmin = starting_at_day * 24
         tspan = np.linspace(
             tmin,
             tmin + 24 * self.params.Ndays,
             1000 * self.params.Ndays,
         )
-
-        state, state_vars, infodict = solver.solve(
-            self.params,
-            self.initial_conditions,
-            tspan=tspan,
-            feed_fn=self.feed_fn,
-            temp_fn=self.temp_fn,
-            solver_hmax=self.solver_max_step_size,
-        )
+        t_samples = tspan[sample_indices(len(tspan), self.params)]
+        native = False
+        if isinstance(output, str):
+            if output not in ["dense", "samples", "native"]:
+                raise ValueError(f"Unknown output mode: {output}")
+            native = output == "native"
+            if output != "dense":
+                tspan = t_samples
+        else:
+            # the sampling instants are solved for too, and dropped afterwards
+            t_output = np.asarray(output, dtype=float)
+            if np.any((t_output < tspan[0]) | (t_output > tspan[-1])):
+                raise ValueError(
+                    f"Output times must lie within [{tspan[0]}, {tspan[-1]}] hrs"
+                )
+            tspan = np.union1d(t_output, t_samples)
+
+        tic = time.perf_counter()
+        result = self._solve(tspan, use_cache, native, stats)
+        state, state_vars, infodict = result.state, result.state_vars, result.info
+        if stats:
+            stats.phases["solve"] = time.perf_counter() - tic
         if plot:
-            plotter.plot(tspan, state, state_vars)
+            tic = time.perf_counter()
+            # matplotlib is slow to import, load it only when plotting
+            from insilicho import plotter
 
+            plotter.plot(result.t, state, state_vars)
+            if stats:
+                stats.phases["plot"] = time.perf_counter() - tic
+
+        keep: typing.Union[slice, np.ndarray] = slice(None)
+        if not isinstance(output, str):
+            keep = np.isin(result.t, t_output)
         self._full_result = types.SimpleNamespace(
-            state=state,
-            state_vars=state_vars,
-            t=tspan,
+            state=state[keep][:, state_cols],
+            state_vars=state_vars[keep][:, state_var_cols],
+            t=result.t[keep],
             info=infodict,
+            state_names=np.array(growth_model.STATE_NAMES)[state_cols].tolist(),
+            state_var_names=np.array(growth_model.STATE_VAR_NAMES)[
+                state_var_cols
+            ].tolist(),
+            stats=stats,
         )
 
         if infodict["message"] != "Integration successful.":
@@ -179,13 +440,236 @@ class GrowCHO:
                 "Integration failed at specified params and/or initial values."
             )
 
-        return flex2_sampling(
-            state,
-            state_vars,
+        tic = time.perf_counter()
+        idx = np.searchsorted(result.t, t_samples)
+        samples = flex2_sampling(
+            state[idx],
+            state_vars[idx],
             self.params,
-            tspan,
+            t_samples,
             sampling_rel_stddev=sampling_stddev,
+            rng=self.rng,
+        )
+        if stats:
+            stats.phases["sampling"] = time.perf_counter() - tic
+            stats.phases["total"] = time.perf_counter() - started
+            if self.stats_hook is not None:
+                self.stats_hook(stats)
+        return samples
+
+    def _solve(
+        self,
+        tspan: np.ndarray,
+        use_cache: bool,
+        native: bool = False,
+        stats: typing.Optional[instrumentation.RunStats] = None,
+    ) -> types.SimpleNamespace:
+        """Full result over tspan, served from `result_cache` when possible.
+
+        If `native`, the result is reported at the solver's own steps plus tspan. If
+        `stats` are given, solver counts and feed/temp calls are recorded into them.
+        """
+        key = None
+        if self.result_cache is not None and use_cache:
+            key = self.result_cache.make_key(
+                self.params,
+                self.initial_conditions,
+                tspan,
+                self.feed_fn,
+                self.temp_fn,
+                solver_hmax=self.solver_max_step_size,
+                boluses=self.boluses,
+                native=native,
+                method=self.solver_method,
+                rtol=self.solver_rtol,
+                atol=self.solver_atol,
+            )
+            # custom integrators cannot be keyed, like plain callables
+            if not isinstance(self.solver_method, str):
+                key = None
+            if key is None:
+                self.result_cache.bypass()
+            else:
+                cached = self.result_cache.get(key)
+                if cached is not None:
+                    if stats:
+                        stats.cached = True
+                        stats.add_solver_counts(cached.info)
+                    return cached
+
+        feed_fn: typing.Any = self.feed_fn
+        temp_fn: typing.Any = self.temp_fn
+        if stats:
+            feed_fn = instrumentation.CallCounter(feed_fn)
+            temp_fn = instrumentation.CallCounter(temp_fn)
+
+        if native:
+            tspan, state, state_vars, infodict = solver.solve_native(
+                self.params,
+                self.initial_conditions,
+                t_span=(tspan[0], tspan[-1]),
+                feed_fn=feed_fn,
+                temp_fn=temp_fn,
+                solver_hmax=self.solver_max_step_size,
+                boluses=self.boluses,
+                t_eval=tspan,
+                rtol=self.solver_rtol,
+                atol=self.solver_atol,
+            )
+        else:
+            state, state_vars, infodict = solver.solve(
+                self.params,
+                self.initial_conditions,
+                tspan=tspan,
+                feed_fn=feed_fn,
+                temp_fn=temp_fn,
+                solver_hmax=self.solver_max_step_size,
+                boluses=self.boluses,
+                method=self.solver_method,
+                rtol=self.solver_rtol,
+                atol=self.solver_atol,
+            )
+        if stats:
+            stats.add_solver_counts(infodict)
+            stats.phases["integrate"] = float(infodict["integrate_time"])
+            stats.phases["state_vars"] = float(infodict["state_vars_time"])
+            stats.feed_calls, stats.feed_time = feed_fn.calls, feed_fn.time
+            stats.temp_calls, stats.temp_time = temp_fn.calls, temp_fn.time
+        result = types.SimpleNamespace(
+            state=state,
+            state_vars=state_vars,
+            t=tspan,
+            info=infodict,
+        )
+        if key is not None and infodict["message"] == "Integration successful.":
+            self.result_cache.put(key, result)  # type: ignore[union-attr]
+        return result
+
+    def checkpoint(self) -> typing.Dict[str, typing.Any]:
+        """Compact, json serializable snapshot of the step-wise simulation.
+
+        Holds the current time and states, the resolved (randomized) parameters, the
+        profiles and boluses and the random generator state, so `from_checkpoint`
+        continues exactly where this object stands, e.g. in another process. Results
+        of past steps are not included. Non-finite floats are stored as the strings
+        "inf", "-inf" and "nan", so the checkpoint is strict json.
+
+        Raises:
+            ValueError: If a feed/temp profile held by `advance` cannot be serialized,
+                see insilicho.profiles, or the solver method is a custom integrator.
+
+        Returns:
+            typing.Dict[str, typing.Any]: The checkpoint.
+        """
+        held = {}
+        for name, fn in [("feed", self._feed), ("temp", self._temp)]:
+            if fn is not None and not hasattr(fn, "to_config"):
+                raise ValueError(f"Cannot checkpoint the {name} set by advance: {fn}")
+            held[name] = _profile_config(fn)
+        if not isinstance(self.solver_method, str):
+            raise ValueError(
+                f"Cannot checkpoint the solver method {self.solver_method}"
+            )
+
+        checkpoint = {
+            "version": CHECKPOINT_VERSION,
+            "t": self._t,
+            "state": None if self._state is None else self._state.tolist(),
+            "parameters": _as_floats(self.params),
+            "initial_conditions": _as_floats(self.initial_conditions),
+            "feed_profile": _profile_config(self.feed_fn),
+            "temp_profile": _profile_config(self.temp_fn),
+            "held_feed_profile": held["feed"],
+            "held_temp_profile": held["temp"],
+            "boluses": [dataclasses.asdict(b) for b in self.boluses],
+            "solver_max_step_size": self.solver_max_step_size,
+            "solver_method": self.solver_method,
+            "solver_rtol": self.solver_rtol,
+            "solver_atol": self.solver_atol,
+            "seed": self.seed,
+            "rng": _rng_state(self.rng),
+        }
+        return _encode_non_finite(checkpoint)
+
+    @classmethod
+    def from_checkpoint(
+        cls,
+        checkpoint: typing.Dict[str, typing.Any],
+        feed_fn: typing.Optional[growth_model.FeedFunctionType] = None,
+        temp_fn: typing.Optional[growth_model.TempFunctionType] = None,
+        result_cache: typing.Optional[cache.ResultCache] = None,
+    ) -> "GrowCHO":
+        """Restores a GrowCHO object from `checkpoint`.
+
+        Args:
+            checkpoint (typing.Dict[str, typing.Any]): As returned by `checkpoint`.
+            feed_fn (typing.Optional[growth_model.FeedFunctionType], optional): Feed
+                profile, required if the checkpointed one was not a profile.
+                Defaults to None (the checkpointed profile).
+            temp_fn (typing.Optional[growth_model.TempFunctionType], optional): Temp
+                profile, required if the checkpointed one was not a profile.
+                Defaults to None (the checkpointed profile).
+            result_cache (typing.Optional[cache.ResultCache], optional): see
+                `__init__`. Defaults to None.
+
+        Raises:
+            ValueError: If the checkpoint version is unsupported or a profile is
+                missing.
+
+        Returns:
+            GrowCHO: Object continuing from the checkpointed time and states.
+        """
+        checkpoint = _decode_non_finite(checkpoint)
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(
+                f"Unsupported checkpoint version: {checkpoint.get('version')}"
+            )
+        if feed_fn is None and checkpoint["feed_profile"] is None:
+            raise ValueError("The checkpointed feed_fn is not a profile, pass feed_fn")
+        if temp_fn is None and checkpoint["temp_profile"] is None:
+            raise ValueError("The checkpointed temp_fn is not a profile, pass temp_fn")
+
+        grow_cho = cls(
+            {
+                "parameters": checkpoint["parameters"],
+                "initial_conditions": checkpoint["initial_conditions"],
+                "feed_profile": checkpoint["feed_profile"],
+                "temp_profile": checkpoint["temp_profile"],
+            },
+            feed_fn=feed_fn,
+            temp_fn=temp_fn,
+            # parameters were randomized when checkpointed, take them as they are
+            param_rel_stddev=None,
+            solver_max_step_size=checkpoint["solver_max_step_size"],
+            solver_method=checkpoint["solver_method"],
+            solver_rtol=checkpoint["solver_rtol"],
+            solver_atol=checkpoint["solver_atol"],
+            boluses=[feeds.Bolus(**b) for b in checkpoint["boluses"]],
+            result_cache=result_cache,
         )
+        grow_cho.seed = checkpoint["seed"]
+        grow_cho.rng = _rng_from_state(checkpoint["rng"])
+
+        grow_cho.reset(t0=checkpoint["t"])
+        if checkpoint["state"] is not None:
+            grow_cho._state = np.array(checkpoint["state"], dtype=float)
+        if checkpoint["held_feed_profile"] is not None:
+            grow_cho._feed = profiles.from_config(checkpoint["held_feed_profile"])
+        if checkpoint["held_temp_profile"] is not None:
+            grow_cho._temp = profiles.from_config(checkpoint["held_temp_profile"])
+        return grow_cho
+
+    def save_checkpoint(self, path: str):
+        """Writes `checkpoint()` to a json file at `path`."""
+        with open(path, "w") as f:
+            json.dump(self.checkpoint(), f, allow_nan=False)
+
+    @classmethod
+    def load_checkpoint(cls, path: str, **kwargs: typing.Any) -> "GrowCHO":
+        """Restores a GrowCHO object from a json file written by `save_checkpoint`,
+        see `from_checkpoint` for `kwargs`."""
+        with open(path, "r") as f:
+            return cls.from_checkpoint(json.load(f), **kwargs)
 
     @property
     def full_result(self):
@@ -193,7 +677,78 @@ class GrowCHO:
         return self._full_result
 
 
+def _as_floats(obj: typing.Any) -> typing.Dict[str, typing.Any]:
+    """Fields of a parameters dataclass as json serializable values."""
+    return {
+        f.name: (
+            getattr(obj, f.name)
+            if isinstance(getattr(obj, f.name), int)
+            else float(getattr(obj, f.name))
+        )
+        for f in dataclasses.fields(obj)
+    }
+
+
+def _encode_non_finite(obj: typing.Any) -> typing.Any:
+    """`obj` with non-finite floats (e.g. the default hmax) as strings."""
+    if isinstance(obj, dict):
+        return {k: _encode_non_finite(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_encode_non_finite(v) for v in obj]
+    if isinstance(obj, float) and not np.isfinite(obj):
+        return str(obj)
+    return obj
+
+
+def _decode_non_finite(obj: typing.Any) -> typing.Any:
+    """Inverse of `_encode_non_finite`."""
+    if isinstance(obj, dict):
+        return {k: _decode_non_finite(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_decode_non_finite(v) for v in obj]
+    if isinstance(obj, str) and obj in _NON_FINITE:
+        return float(obj)
+    return obj
+
+
+def _profile_config(fn: typing.Any) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    return fn.to_config() if hasattr(fn, "to_config") else None
+
+
+def _rng_state(rng: RandomGeneratorType) -> typing.Dict[str, typing.Any]:
+    if isinstance(rng, np.random.RandomState):
+        state = rng.get_state(legacy=False)
+        state["state"] = dict(state["state"], key=state["state"]["key"].tolist())
+        return {"type": "RandomState", "state": state}
+    return {"type": "Generator", "state": rng.bit_generator.state}
+
+
+def _rng_from_state(state: typing.Dict[str, typing.Any]) -> RandomGeneratorType:
+    if state["type"] == "RandomState":
+        rng = np.random.RandomState()
+        mt_state = state["state"]["state"]
+        rng.set_state(
+            dict(
+                state["state"],
+                state=dict(mt_state, key=np.array(mt_state["key"], dtype=np.uint32)),
+            )
+        )
+        return rng
+    bit_generator = getattr(np.random, state["state"]["bit_generator"])()
+    bit_generator.state = state["state"]
+    return np.random.Generator(bit_generator)
+
+
+def _held(value: typing.Any) -> typing.Any:
+    """Profile holding a constant control value, or the given profile."""
+    if callable(value):
+        return value
+    return profiles.PiecewiseConstant([0.0], [value])
+
+
 def config_parser(cfg_path):
+    import yaml
+
     data = {}
     with open(cfg_path, "r") as f:
         try:
@@ -221,12 +776,147 @@ def unpack(cfg_dict=None, cfg_path=None):
     return params, ic
 
 
+def unpack_profiles(cfg_dict=None, cfg_path=None):
+    """Feed and temp profiles defined in the `feed_profile`/`temp_profile` sections
+    of a config, None where absent."""
+    data = cfg_dict or (config_parser(cfg_path) if cfg_path else None) or {}
+    return tuple(
+        profiles.from_config(data[key]) if data.get(key) else None
+        for key in ["feed_profile", "temp_profile"]
+    )
+
+
+def sample_indices(n_points: int, params: parameters.InputParameters) -> np.ndarray:
+    """Indices of the `Ndays * Nsamples + 1` sampling instants among `n_points`
+    evenly spaced output points."""
+    return np.round(
+        np.linspace(0, n_points - 1, params.Ndays * params.Nsamples + 1)
+    ).astype(int)
+
+
+def _record_columns(
+    record: typing.Optional[typing.Sequence[str]],
+) -> typing.Tuple[typing.Union[slice, typing.List[int]], ...]:
+    """Column indices into state and state_vars of the names in `record`; slices
+    selecting all columns if `record` is None, so no copies are made."""
+    if record is None:
+        return slice(None), slice(None)
+    unknown = set(record) - set(growth_model.STATE_NAMES + growth_model.STATE_VAR_NAMES)
+    if unknown:
+        raise ValueError(f"Cannot record unknown variables: {unknown}")
+    return [i for i, name in enumerate(growth_model.STATE_NAMES) if name in record], [
+        i for i, name in enumerate(growth_model.STATE_VAR_NAMES) if name in record
+    ]
+
+
+# Quantities reported by flex2 sampling, with their scale factor on the model output.
+# Cells are reported in millions/mL.
+FLEX2_VARIABLES = {
+    "Xv": ("state", "Xv", 1e-9),
+    "Xt": ("state", "Xt", 1e-9),
+    "Cglc": ("state", "Cglc", 1.0),
+    "Cgln": ("state", "Cgln", 1.0),
+    "Clac": ("state", "Clac", 1.0),
+    "Camm": ("state", "Camm", 1.0),
+    "Cmab": ("state", "Cmab", 1.0),
+    "Coxygen": ("state", "Coxygen", 1.0),
+    "V": ("state", "V", 1.0),
+    "pH": ("state", "pH", 1.0),
+    "Osmolarity": ("state_vars", "Osmolarity", 1.0),
+}
+# Measured without error.
+FLEX2_EXACT = ["V"]
+
+
+def flex2_sampling_batch(
+    state: np.ndarray,
+    state_vars: np.ndarray,
+    params: parameters.InputParameters,
+    tspan: np.ndarray,
+    sampling_rel_stddev: float = 0.05,
+    rng: typing.Optional[RandomGeneratorType] = None,
+) -> typing.Dict[str, np.ndarray]:
+    """Samples datapoints from the simulation output of a whole ensemble at once.
+
+    The noise of all quantities and members is drawn in a single call, ordered by
+    quantity, then member, then sample. A single member thus draws the same stream as
+    `flex2_sampling` always has.
+
+    Args:
+        state (np.ndarray): States of shape (N, T, 10) or (T, 10), see
+            `flex2_sampling`.
+        state_vars (np.ndarray): State variables of shape (N, T, 10) or (T, 10).
+        params (parameters.InputParameters): Input parameters for simulation system.
+        tspan (np.ndarray): time array (in hours) of shape (T,) over which the system
+            was solved.
+        sampling_rel_stddev (float, optional): scale of error in normal distributed
+            sampling event, relative to sample magnitude. Defaults to 0.05.
+        rng (typing.Optional[RandomGeneratorType], optional): Random generator to draw
+            sampling noise from. Defaults to the global numpy random state.
+
+    Raises:
+        ValueError: If `sampling_rel_stddev` is negative.
+
+    Returns:
+        typing.Dict[str, np.ndarray]: Sampling times ("time", of shape (S,)) and
+            samples of FLEX2_VARIABLES, of shape (N, S) or (S,) following `state`.
+            See `to_frame` for a DataFrame.
+    """
+    state = np.asarray(state, dtype=float)
+    state_vars = np.asarray(state_vars, dtype=float)
+    single = state.ndim == 2
+    if single:
+        state, state_vars = state[np.newaxis], state_vars[np.newaxis]
+
+    idx = sample_indices(state.shape[1], params)
+    columns = {
+        "state": (state, growth_model.STATE_NAMES),
+        "state_vars": (state_vars, growth_model.STATE_VAR_NAMES),
+    }
+    names = list(FLEX2_VARIABLES)
+    values = np.empty((len(names), state.shape[0], len(idx)))
+    for k, (array, name, scale) in enumerate(FLEX2_VARIABLES.values()):
+        trajectories, all_names = columns[array]
+        values[k] = trajectories[:, idx, all_names.index(name)] * scale
+    values = np.maximum(values, parameters.EPSILON)
+
+    noisy = [k for k, name in enumerate(names) if name not in FLEX2_EXACT]
+    noise = (rng or np.random).normal(
+        loc=1.0, scale=float(sampling_rel_stddev), size=(len(noisy),) + values.shape[1:]
+    )
+    values[noisy] = np.maximum(values[noisy] * noise, parameters.EPSILON)
+
+    res = {"time": np.maximum(np.asarray(tspan, dtype=float)[idx], parameters.EPSILON)}
+    res.update({name: v[0] if single else v for name, v in zip(names, values)})
+    return res
+
+
+def to_frame(samples: typing.Dict[str, np.ndarray]) -> typing.Any:
+    """Long-format pandas.DataFrame of `flex2_sampling_batch` samples, with a "member"
+    and a "time" column and a column per sampled quantity."""
+    # pandas is slow to import, load it only when asked for
+    import pandas as pd
+
+    time = samples["time"]
+    shape = np.shape(samples["Xv"])
+    n_members = shape[0] if len(shape) == 2 else 1
+    frame = {
+        "member": np.repeat(np.arange(n_members), len(time)),
+        "time": np.tile(time, n_members),
+    }
+    frame.update(
+        {name: np.reshape(samples[name], -1) for name in samples if name != "time"}
+    )
+    return pd.DataFrame(frame)
+
+
 def flex2_sampling(
     state: np.ndarray,
     state_vars: np.ndarray,
     params: parameters.InputParameters,
     tspan: np.ndarray,
     sampling_rel_stddev: float = 0.05,
+    rng: typing.Optional[RandomGeneratorType] = None,
 ) -> typing.Dict[str, typing.Any]:
     """Samples datapoints from a simulation output.
 
@@ -239,45 +929,15 @@ def flex2_sampling(
         tspan (np.ndarray): time array (in hours) over which the system was solved.
         sampling_rel_stddev (float, optional): scale of error in normal distributed
             sampling event, relative to sample magnitude. Defaults to 0.05.
+        rng (typing.Optional[RandomGeneratorType], optional): Random generator to draw
+            sampling noise from. Defaults to the global numpy random state.
 
     Returns:
         typing.Dict[str, typing.Any]: Results from sampling i.e., Xv, Xt, Cglc, Cgln,
-            Clac, Camm, Cmab, Osmolarity and time.
+            Clac, Camm, Cmab, Osmolarity and time, as lists. See
+            `flex2_sampling_batch` for arrays and ensembles.
     """
-
-    Xv, Xt, Cglc, Cgln, Clac, Camm, Cmab, Coxygen, V, pH = state.transpose()
-    Osmolarity = state_vars[:, 9]
-    time = tspan.transpose()
-    res_map = {
-        "time": time,  # hrs
-        "Xv": Xv * 1e-9,  # viable cells (millions/mL conversion)
-        "Xt": Xt * 1e-9,  # total cells (millions/mL conversion)
-        "Cglc": Cglc,  # mmol
-        "Cgln": Cgln,
-        "Clac": Clac,
-        "Camm": Camm,
-        "Cmab": Cmab,
-        "Coxygen": Coxygen,
-        "V": V,
-        "pH": pH,
-        "Osmolarity": Osmolarity,
-    }
-    res = {}
-
-    # get idx to sample at
-    idx = np.round(
-        np.linspace(0, len(Xv) - 1, params.Ndays * params.Nsamples + 1)
-    ).astype(int)
-
-    # sample across small time range, add noise
-    for k, var in res_map.items():
-        var = np.maximum(var, parameters.EPSILON)
-        if k in ["time", "V"]:
-            res[k] = var[idx].tolist()
-        else:
-            res[k] = np.maximum(
-                add_relative_normal_noise(var[idx], sampling_rel_stddev),
-                parameters.EPSILON,
-            ).tolist()
-
-    return res
+    samples = flex2_sampling_batch(
+        state, state_vars, params, tspan, sampling_rel_stddev, rng
+    )
+    return {name: values.tolist() for name, values in samples.items()}
@@ -1,28 +1,90 @@
+import bisect
+import dataclasses
+import functools
+import time
+import types
 import typing
 
 import numpy as np
-from scipy.integrate import odeint
+from scipy.integrate import LSODA, odeint, solve_ivp
+from scipy.interpolate import CubicHermiteSpline
 
-from insilicho import growth_model, parameters
+from insilicho import feeds, growth_model, modelspec, parameters
+
+# odeint takes at most 500 steps between output points by default, i.e. per 1.44
+# min on the dense grid of run.GrowCHO.execute. Sparse grids, e.g. the sample times
+# fit.fit solves at, pass a budget of this many steps per day as `max_steps`.
+MAX_STEPS_PER_DAY = 5000
+
+# scipy.odeint default tolerances, also used when stepping LSODA directly.
+RTOL = ATOL = 1.49012e-8
+
+# Events closer than this (in hrs) to an output point are moved onto it.
+_SNAP_TOL = 1e-9
+
+# Integration methods of `solve`: odeint (LSODA, switching between non-stiff and
+# stiff methods by itself), the methods of scipy.integrate.solve_ivp and classic
+# fixed-step Runge-Kutta ("rk4") for cheap previews.
+IVP_METHODS = ("RK45", "RK23", "DOP853", "Radau", "BDF", "LSODA")
+METHODS = ("odeint",) + IVP_METHODS + ("rk4", "auto")
+
+# Step size (in hrs) of "rk4" if no solver_hmax is given.
+FIXED_STEP = 0.5
+
+# "auto" integrates a problem explicitly (RK45) if its fastest mode decays by at
+# most this many e-folds over the horizon, and with odeint otherwise. odeint was
+# measured to be faster on anything stiffer, including the usual runs which start
+# stiff in Clac.
+NONSTIFF_LIMIT = 10.0
+
+# Integrates (model, IC, tspan, rhs_args, solver_hmax, tcrit, rtol=, atol=) over a
+# segment without events, returning the states at tspan and an infodict, see
+# `_odeint`.
+IntegratorType = typing.Callable[
+    ..., typing.Tuple[np.ndarray, typing.Dict[str, typing.Any]]
+]
+
+# Parameters sensitivities can be computed for, see `solve`.
+SENSITIVITY_PARAMS = tuple(
+    f.name
+    for f in dataclasses.fields(parameters.InputParameters)
+    if f.type == typing.Union[float, str]
+)
+
+# A discontinuity at a given time, with the state jump to apply there (if any).
+EventType = typing.Tuple[
+    float, typing.Optional[typing.Callable[[np.ndarray], np.ndarray]]
+]
 
 
 def solve(
     params: parameters.InputParameters,
-    initial_conditions: parameters.InitialConditions,
-    model: typing.Any = growth_model.model,
+    initial_conditions: typing.Union[parameters.InitialConditions, np.ndarray],
+    model: typing.Any = growth_model.kernel,
     tspan: typing.Any = None,
     feed_fn: typing.Optional[growth_model.FeedFunctionType] = None,
     temp_fn: typing.Optional[growth_model.TempFunctionType] = None,
     solver_hmax: float = np.inf,
+    boluses: typing.Optional[typing.Sequence[feeds.Bolus]] = None,
+    sensitivities: typing.Union[bool, typing.Sequence[str]] = False,
+    method: typing.Union[str, IntegratorType] = "odeint",
+    rtol: float = RTOL,
+    atol: float = ATOL,
+    events: typing.Optional[typing.Sequence[EventType]] = None,
+    max_steps: typing.Optional[int] = None,
 ) -> typing.Tuple[np.ndarray, np.ndarray, typing.Any]:
     """Solves the supplied differential equation system using scipy.odeint (LSODA) solver.
 
     Args:
         params (parameters.InputParameters): Parameters for the model.
-        initial_conditions (parameters.InitialConditions): Initial conditions for the
-            solver.
-        model (growth_model.model, optional): Differential equations to solve. Defaults
-            to growth_model.model.
+        initial_conditions (typing.Union[parameters.InitialConditions, np.ndarray]):
+            Initial conditions for the solver, or an array of states in their order.
+        model (growth_model.kernel, optional): Differential equations to solve. Defaults
+            to growth_model.kernel, the allocation-free form of growth_model.model.
+            A modelspec.CompiledModel takes `params` and `initial_conditions` as
+            accepted by its parameter_vector and initial_state (None for the defaults
+            of its spec). Any other callable is invoked with the signature of
+            growth_model.model.
         tspan (List, optional): time array (in hrs) over which to solve the system.
             Defaults to np.linspace(0, 288, 10000).
         feed_fn (growth_model.FeedFunctionType, optional): Callable describing feed
@@ -31,45 +93,858 @@ def solve(
             profile. Defaults to None.
         solver_hmax (float, optional): max step size solver can take. Defaults to
             np.inf.
+        boluses (typing.Optional[typing.Sequence[feeds.Bolus]], optional): Bolus
+            feeds, applied as exact state jumps between integration segments. States
+            reported at a bolus time are those right after the bolus. Defaults to None.
+        sensitivities (typing.Union[bool, typing.Sequence[str]], optional): Names of
+            the parameters (see SENSITIVITY_PARAMS) to compute forward sensitivities
+            for, or True for all of them. The sensitivity equations are integrated
+            along with the states, in a single solve. Defaults to False.
+        method (typing.Union[str, IntegratorType], optional): Integration method, one
+            of METHODS, or a custom integrator (see IntegratorType). "rk4" takes fixed
+            steps of solver_hmax, or FIXED_STEP if unbounded, without error control.
+            "auto" picks one from the stiffness of the model at the initial states,
+            see `select_method`. Defaults to "odeint".
+        rtol (float, optional): Relative tolerance. Defaults to RTOL.
+        atol (float, optional): Absolute tolerance. Defaults to ATOL.
+        events (typing.Optional[typing.Sequence[EventType]], optional): Further
+            discontinuities the solver restarts at, applying their state jumps (if
+            any) like boluses. Defaults to None.
+        max_steps (typing.Optional[int], optional): Maximum number of odeint steps
+            between consecutive points of tspan. Defaults to None (scipy's default
+            of 500).
+
+    Raises:
+        ValueError: If `feed_fn` or `temp_fn` are not provided, sensitivities are
+            requested for unknown parameters, a model other than
+            growth_model.kernel, a method other than odeint or along with events,
+            boluses are given for a modelspec.CompiledModel, or the method is
+            unknown.
 
     Returns:
         state_model: Array of state solutions for all points in tspan.
         state_model: Array of state solutions for all points in tspan.
-        infodict: Dictionary of LSODA solver behavior.
+        infodict: Dictionary of LSODA solver behavior (only the message and
+            function/jacobian evaluation counts for other methods), the method used
+            ("method") and the wall time (in s) spent integrating
+            ("integrate_time") and computing state variables ("state_vars_time").
+            With `sensitivities`, "sensitivities" holds
+            d(state)/d(param) of shape (T, 10, n_params) and "sensitivity_params" the
+            parameter names along its last axis.
     """
     if tspan is None:
         tspan = np.linspace(0, 288, 10000)
+    if not feed_fn or not temp_fn:
+        raise ValueError("feed/temp model missing")
 
-    # Use default InputParameters and InitialConditions if not provided
-    if params is None:
-        params = parameters.InputParameters()
-    if initial_conditions is None:
-        initial_conditions = parameters.InitialConditions()
+    compiled = isinstance(model, modelspec.CompiledModel)
+    if compiled:
+        if boluses:
+            raise ValueError("Boluses require the growth_model.kernel model")
+        IC = model.initial_state(initial_conditions)
+        rhs_args: typing.Tuple[typing.Any, ...] = (
+            model.parameter_vector(params),
+            feed_fn,
+            temp_fn,
+            np.empty(len(IC)),
+        )
+        rhs = model.rhs
+    else:
+        # Use default InputParameters and InitialConditions if not provided
+        if params is None:
+            params = parameters.InputParameters()
+        if initial_conditions is None:
+            initial_conditions = parameters.InitialConditions()
 
-    IC = initial_conditions.tolist()
-    args = params.tolist()
+        IC = initial_conditions.tolist()
+        if model is growth_model.kernel:
+            rhs_args = (
+                growth_model.flat_parameters(params),
+                feed_fn,
+                temp_fn,
+                np.empty(len(IC)),
+            )
+        else:
+            rhs_args = (params.tolist(), feed_fn, temp_fn)
+        rhs = model
 
-    state_model, info = odeint(
-        model,
-        IC,
-        tspan,
+    tic = time.perf_counter()
+    if method == "auto":
+        method = "odeint" if sensitivities else select_method(rhs, IC, tspan, rhs_args)
+    integrator = _integrator(method, rtol, atol, max_steps)
+    if sensitivities:
+        if model is not growth_model.kernel:
+            raise ValueError("Sensitivities require the growth_model.kernel model")
+        if method != "odeint":
+            raise ValueError("Sensitivities require the odeint method")
+        if events:
+            raise ValueError("Sensitivities cannot be computed across events")
+        names = SENSITIVITY_PARAMS if sensitivities is True else list(sensitivities)
+        unknown = set(names) - set(SENSITIVITY_PARAMS)
+        if unknown:
+            raise ValueError(f"Cannot compute sensitivities for: {unknown}")
+        system = _sensitivity_system(params, names)
+        state_model, info = _integrate(
+            _sensitivity_rhs,
+            IC + [0.0] * len(IC) * len(names),
+            tspan,
+            rhs_args + (system,),
+            solver_hmax,
+            _sensitivity_bolus_events(boluses, params, system)
+            + _profile_events(feed_fn, temp_fn),
+            _profile_critical_points(feed_fn, temp_fn),
+            integrator,
+        )
+        info["sensitivities"] = (
+            state_model[:, len(IC) :]
+            .reshape(len(state_model), len(names), len(IC))
+            .transpose(0, 2, 1)
+        )
+        info["sensitivity_params"] = list(names)
+        state_model = state_model[:, : len(IC)]
+    else:
+        state_model, info = _integrate(
+            rhs,
+            IC,
+            tspan,
+            rhs_args,
+            solver_hmax,
+            _bolus_events(boluses, params)
+            + _profile_events(feed_fn, temp_fn)
+            + list(events or []),
+            _profile_critical_points(feed_fn, temp_fn),
+            integrator,
+        )
+    toc = time.perf_counter()
+    if compiled:
+        state_vars = model.state_vars(tspan, state_model, rhs_args[0], feed_fn, temp_fn)
+    else:
+        state_vars = growth_model.state_vars_array(
+            tspan, state_model, params, feed_fn, temp_fn
+        )
+    info["method"] = (
+        method
+        if isinstance(method, str)
+        else getattr(method, "__name__", type(method).__name__)
+    )
+    info["integrate_time"] = toc - tic
+    info["state_vars_time"] = time.perf_counter() - toc
+    return state_model, state_vars, info
+
+
+def solve_native(
+    params: parameters.InputParameters,
+    initial_conditions: typing.Union[parameters.InitialConditions, np.ndarray],
+    t_span: typing.Tuple[float, float] = (0, 288),
+    feed_fn: typing.Optional[growth_model.FeedFunctionType] = None,
+    temp_fn: typing.Optional[growth_model.TempFunctionType] = None,
+    solver_hmax: float = np.inf,
+    boluses: typing.Optional[typing.Sequence[feeds.Bolus]] = None,
+    t_eval: typing.Optional[typing.Union[typing.Sequence[float], np.ndarray]] = None,
+    rtol: float = RTOL,
+    atol: float = ATOL,
+) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray, typing.Dict[str, typing.Any]]:
+    """Solves the model with LSODA, reporting the solver's own steps.
+
+    Nothing is interpolated unless asked for via `t_eval`, so the output is as small
+    as the solver allows. The solver restarts at boluses and profile breakpoints, see
+    `solve`; states reported at a bolus time are those right after the bolus.
+
+    Args:
+        params (parameters.InputParameters): Parameters for the model.
+        initial_conditions (typing.Union[parameters.InitialConditions, np.ndarray]):
+            Initial conditions for the solver, or an array of states in their order.
+        t_span (typing.Tuple[float, float], optional): Start and end time (in hrs).
+            Defaults to (0, 288).
+        feed_fn (growth_model.FeedFunctionType, optional): Callable describing feed
+            profile. Defaults to None.
+        temp_fn (growth_model.TempFunctionType, optional): Callable describing temp
+            profile. Defaults to None.
+        solver_hmax (float, optional): max step size solver can take. Defaults to
+            np.inf.
+        boluses (typing.Optional[typing.Sequence[feeds.Bolus]], optional): Bolus
+            feeds, see `solve`. Defaults to None.
+        t_eval (typing.Optional[typing.Sequence[float]], optional): Further times
+            (in hrs) to report, evaluated from the solver's interpolant without
+            constraining its steps. Defaults to None.
+        rtol (float, optional): Relative tolerance. Defaults to RTOL.
+        atol (float, optional): Absolute tolerance. Defaults to ATOL.
+
+    Raises:
+        ValueError: If `feed_fn` or `temp_fn` are not provided.
+
+    Returns:
+        t: Times (in hrs) of the solver steps and `t_eval`, starting at t_span[0].
+        state_model: Array of state solutions for all points in t.
+        state_vars: Array of state variables for all points in t.
+        infodict: Dictionary with the solver message and cumulative step, function
+            and jacobian evaluation counts (nst, nfe, nje) at every point in t but
+            the first, and timings as in `solve`.
+    """
+    if not feed_fn or not temp_fn:
+        raise ValueError("feed/temp model missing")
+    t0, t_end = float(t_span[0]), float(t_span[1])
+    args = growth_model.flat_parameters(params)
+    buffer = np.empty(len(growth_model.STATE_NAMES))
+
+    def rhs(t, y):
+        return growth_model.kernel(t, y, args, feed_fn, temp_fn, buffer).copy()
+
+    def jac(t, y):
+        return growth_model.jacobian(t, y, args, feed_fn, temp_fn)
+
+    events = sorted(
         (
-            args,
+            (t_event, jump)
+            for t_event, jump in _bolus_events(boluses, params)
+            + _profile_events(feed_fn, temp_fn)
+            + [(c, None) for c in _profile_critical_points(feed_fn, temp_fn)]
+            if t0 < t_event < t_end or (jump and t0 <= t_event <= t_end)
+        ),
+        key=lambda e: e[0],
+    )
+
+    tic = time.perf_counter()
+    t, y = t0, np.array(initial_conditions.tolist(), dtype=float)
+    pending = sorted(float(te) for te in (t_eval if t_eval is not None else []))
+    pending = [te for te in pending if t0 < te <= t_end]
+    times, states = [t], [y]
+    counts: typing.Dict[str, typing.List[int]] = {"nst": [], "nfe": [], "nje": []}
+    nst, nfe, nje = 0, 0, 0
+    message = "Integration successful."
+    for t_event, jump in [*events, (t_end, None)]:
+        if t_event > t:
+            stepper = LSODA(
+                rhs, t, y, t_event, max_step=solver_hmax, rtol=rtol, atol=atol, jac=jac
+            )
+            while stepper.status == "running":
+                failure = stepper.step()
+                if stepper.status == "failed":
+                    message = failure or "Integration failed."
+                    break
+                nst += 1
+                # requested points within the step, from the step's interpolant
+                n_within = bisect.bisect_left(pending, stepper.t)
+                points = []
+                if n_within:
+                    dense = stepper.dense_output()
+                    points = [(te, dense(te)) for te in pending[:n_within]]
+                del pending[: bisect.bisect_right(pending, stepper.t)]
+                for t_point, y_point in [*points, (stepper.t, stepper.y.copy())]:
+                    times.append(t_point)
+                    states.append(y_point)
+                    counts["nst"].append(nst)
+                    counts["nfe"].append(nfe + stepper.nfev)
+                    counts["nje"].append(nje + stepper.njev)
+            nfe, nje = nfe + stepper.nfev, nje + stepper.njev
+            t, y = stepper.t, stepper.y
+            if stepper.status == "failed":
+                break
+        if jump:
+            y = jump(y)
+            states[-1] = y
+
+    tspan = np.array(times)
+    state_model = np.array(states)
+    toc = time.perf_counter()
+    state_vars = growth_model.state_vars_array(
+        tspan, state_model, params, feed_fn, temp_fn
+    )
+    info: typing.Dict[str, typing.Any] = {
+        key: np.array(value, dtype=int) for key, value in counts.items()
+    }
+    info["message"] = message
+    info["integrate_time"] = toc - tic
+    info["state_vars_time"] = time.perf_counter() - toc
+    return tspan, state_model, state_vars, info
+
+
+def solve_batch(
+    params: typing.Union[typing.Sequence[parameters.InputParameters], np.ndarray],
+    initial_conditions: typing.Union[
+        parameters.InitialConditions,
+        typing.Sequence[parameters.InitialConditions],
+        np.ndarray,
+    ],
+    tspan: typing.Any = None,
+    feed_fn: typing.Any = None,
+    temp_fn: typing.Any = None,
+    solver_hmax: float = np.inf,
+    boluses: typing.Optional[typing.Sequence[feeds.Bolus]] = None,
+    method: typing.Union[str, IntegratorType] = "odeint",
+    rtol: float = RTOL,
+    atol: float = ATOL,
+) -> typing.Tuple[np.ndarray, np.ndarray, typing.List[typing.Any]]:
+    """Solves an ensemble of N parameter sets and/or initial conditions.
+
+    Parameters are resolved once into an (N, n_fields) matrix, each member is
+    integrated with growth_model.kernel, and state variables are evaluated for the
+    whole (N, T) ensemble in one array-wise pass.
+
+    Args:
+        params (typing.Union[typing.Sequence[parameters.InputParameters], np.ndarray]):
+            N parameter sets, or an (N, n_fields) matrix in the field order of
+            parameters.InputParameters.
+        initial_conditions (typing.Union[parameters.InitialConditions,
+            typing.Sequence[parameters.InitialConditions], np.ndarray]): Initial
+            conditions shared by all members, one per member, or an (N, 10) matrix.
+        tspan (List, optional): time array (in hrs) over which to solve the system.
+            Defaults to np.linspace(0, 288, 10000).
+        feed_fn (optional): Callable describing feed profile shared by all members, or
+            a sequence of one callable per member. Defaults to None.
+        temp_fn (optional): Callable describing temp profile shared by all members, or
+            a sequence of one callable per member. Defaults to None.
+        solver_hmax (float, optional): max step size solver can take. Defaults to
+            np.inf.
+        boluses (typing.Optional[typing.Sequence[feeds.Bolus]], optional): Bolus
+            feeds given to every member, see `solve`. Defaults to None.
+        method (typing.Union[str, IntegratorType], optional): Integration method,
+            see `solve`; "auto" picks one per member. Defaults to "odeint".
+        rtol (float, optional): Relative tolerance. Defaults to RTOL.
+        atol (float, optional): Absolute tolerance. Defaults to ATOL.
+
+    Raises:
+        ValueError: If the number of parameter sets and initial conditions differ,
+            feed/temp profiles are missing, or the method is unknown.
+
+    Returns:
+        state_model: Array of shape (N, T, 10) of state solutions for all points in
+            tspan.
+        state_vars: Array of shape (N, T, 10) of state variables for all points in
+            tspan.
+        infodicts: List of dictionaries of LSODA solver behavior, one per member.
+    """
+    if tspan is None:
+        tspan = np.linspace(0, 288, 10000)
+    tspan = np.asarray(tspan, dtype=float)
+
+    P = _as_matrix(params)
+    N = len(P)
+    if isinstance(initial_conditions, parameters.InitialConditions):
+        initial_conditions = [initial_conditions] * N
+    Y0 = _as_matrix(initial_conditions)
+    if len(Y0) != N:
+        raise ValueError(f"Got {N} parameter sets but {len(Y0)} initial conditions.")
+
+    feed_fns = _per_member(feed_fn, N)
+    temp_fns = _per_member(temp_fn, N)
+    if not all(feed_fns) or not all(temp_fns):
+        raise ValueError("feed/temp model missing")
+
+    state_model = np.empty((N, len(tspan), Y0.shape[1]))
+    infodicts = []
+    for i in range(N):
+        rhs_args = (
+            tuple(P[i].tolist()),
+            feed_fns[i],
+            temp_fns[i],
+            np.empty(Y0.shape[1]),
+        )
+        member_method = (
+            select_method(growth_model.kernel, Y0[i], tspan, rhs_args)
+            if method == "auto"
+            else method
+        )
+        state_model[i], info = _integrate(
+            growth_model.kernel,
+            Y0[i],
+            tspan,
+            rhs_args,
+            solver_hmax,
+            _bolus_events(boluses, growth_model.batch_parameters(P[i]))
+            + _profile_events(feed_fns[i], temp_fns[i]),
+            _profile_critical_points(feed_fns[i], temp_fns[i]),
+            _integrator(member_method, rtol, atol),
+        )
+        infodicts.append(info)
+
+    if callable(feed_fn) and callable(temp_fn):
+        state_vars = growth_model.state_vars_array(
+            tspan,
+            state_model,
+            growth_model.batch_parameters(P[:, np.newaxis, :]),
             feed_fn,
             temp_fn,
+        )
+    else:
+        state_vars = np.stack(
+            [
+                growth_model.state_vars_array(
+                    tspan,
+                    state_model[i],
+                    growth_model.batch_parameters(P[i]),
+                    feed_fns[i],
+                    temp_fns[i],
+                )
+                for i in range(N)
+            ]
+        )
+    return state_model, state_vars, infodicts
+
+
+def _bolus_events(
+    boluses: typing.Optional[typing.Sequence[feeds.Bolus]], params: typing.Any
+) -> typing.List[EventType]:
+    return [
+        (float(b.time), functools.partial(feeds.apply_bolus, bolus=b, params=params))
+        for b in feeds.as_boluses(boluses)
+    ]
+
+
+def _profile_events(*fns: typing.Any) -> typing.List[EventType]:
+    """Restart points at the breakpoints of discontinuous profiles."""
+    return [
+        (float(t), None)
+        for fn in fns
+        if not getattr(fn, "continuous", True)
+        for t in getattr(fn, "breakpoints", [])
+    ]
+
+
+def _profile_critical_points(*fns: typing.Any) -> typing.List[float]:
+    """Points the solver must step onto, at the breakpoints of continuous profiles."""
+    return [
+        float(t)
+        for fn in fns
+        if getattr(fn, "continuous", False)
+        for t in getattr(fn, "breakpoints", [])
+    ]
+
+
+def _integrate(
+    model: typing.Any,
+    IC: typing.Any,
+    tspan: np.ndarray,
+    rhs_args: typing.Tuple[typing.Any, ...],
+    solver_hmax: float,
+    events: typing.Sequence[EventType] = (),
+    tcrit: typing.Sequence[float] = (),
+    integrator: typing.Optional[IntegratorType] = None,
+) -> typing.Tuple[np.ndarray, typing.Any]:
+    """Integrates over tspan, restarting the solver at every event.
+
+    Each segment between events is integrated at the solver's natural step size, and
+    event jumps are applied exactly in between. States are right-continuous: output
+    points that coincide with an event report the state after its jump. The solver
+    steps onto, but is not restarted at, critical points in `tcrit`. Segments are
+    integrated with `integrator`, `_odeint` by default.
+    """
+    integrator = integrator or _odeint
+    tspan = np.asarray(tspan, dtype=float)
+    # restarts without a jump are only needed strictly inside tspan
+    events = sorted(
+        (
+            (t_event, jump)
+            for t_event, jump in ((_snap(t, tspan), jump) for t, jump in events)
+            if tspan[0] < t_event < tspan[-1]
+            or (jump and tspan[0] <= t_event <= tspan[-1])
         ),
+        key=lambda e: e[0],
+    )
+    if not events:
+        return integrator(model, IC, tspan, rhs_args, solver_hmax, tcrit)
+
+    state_model = np.empty((len(tspan), len(IC)))
+    infodicts = []
+    t, y, i = tspan[0], np.asarray(IC, dtype=float), 0
+    for k, (t_event, jump) in enumerate([*events, (tspan[-1], None)]):
+        j = len(tspan) if k == len(events) else np.searchsorted(tspan, t_event)
+        lead = i == j or tspan[i] > t
+        grid = np.concatenate([[t] if lead else [], tspan[i:j]])
+        if grid[-1] < t_event:
+            grid = np.append(grid, t_event)
+
+        if len(grid) > 1:
+            solution, info = integrator(model, y, grid, rhs_args, solver_hmax, tcrit)
+            infodicts.append(info)
+        else:
+            solution = y[np.newaxis]
+        state_model[i:j] = solution[int(lead) : int(lead) + j - i]
+
+        t, y, i = grid[-1], solution[-1], j
+        if jump:
+            y = jump(y)
+    return state_model, _merge_infodicts(infodicts)
+
+
+def _snap(t_event: float, tspan: np.ndarray) -> float:
+    """Moves an event within rounding error of an output point onto it, as the
+    solver cannot step across the vanishing interval in between."""
+    k = min(int(np.searchsorted(tspan, t_event)), len(tspan) - 1)
+    for t in tspan[max(k - 1, 0) : k + 1].tolist():
+        if abs(t - t_event) <= _SNAP_TOL:
+            return t
+    return float(t_event)
+
+
+def _merge_infodicts(infodicts: typing.List[typing.Dict[str, typing.Any]]):
+    """Combines the LSODA infodicts of consecutive integration segments."""
+    if not infodicts:
+        return {"message": "Integration successful."}
+
+    merged = dict(infodicts[-1])
+    for key in ["hu", "tcur", "tolsf", "tsw", "nqu", "mused"]:
+        if key in merged:
+            merged[key] = np.concatenate([info[key] for info in infodicts])
+    # counters are cumulative within a segment
+    for key in ["nst", "nfe", "nje"]:
+        if key not in merged:
+            continue
+        offsets = np.cumsum([0] + [info[key][-1] for info in infodicts[:-1]])
+        merged[key] = np.concatenate(
+            [info[key] + offset for info, offset in zip(infodicts, offsets)]
+        )
+    failed = [
+        info["message"]
+        for info in infodicts
+        if info["message"] != "Integration successful."
+    ]
+    merged["message"] = failed[0] if failed else "Integration successful."
+    return merged
+
+
+def _odeint(
+    model: typing.Any,
+    IC: typing.Any,
+    tspan: np.ndarray,
+    rhs_args: typing.Tuple[typing.Any, ...],
+    solver_hmax: float,
+    tcrit: typing.Sequence[float] = (),
+    rtol: float = RTOL,
+    atol: float = ATOL,
+    mxstep: int = 0,
+) -> typing.Tuple[np.ndarray, typing.Any]:
+    tcrit = [c for c in tcrit if tspan[0] < c < tspan[-1]]
+    return odeint(
+        model,
+        IC,
+        tspan,
+        rhs_args,
+        Dfun=_jacobian_of(model),
+        tcrit=tcrit or None,
         tfirst=True,
         printmessg=False,
         full_output=True,
         hmax=solver_hmax,
+        rtol=rtol,
+        atol=atol,
+        mxstep=mxstep,
+        # the sensitivity jacobian is block diagonal, see `_sensitivity_jacobian`
+        **({"ml": 9, "mu": 9} if model is _sensitivity_rhs else {}),
     )
-    state_vars = []
-    for i in range(len(tspan)):
-        state_vars.append(
-            list(
-                growth_model.state_vars(
-                    tspan[i], state_model[i], params, feed_fn, temp_fn
-                )
-            )
+
+
+def _solve_ivp(
+    model: typing.Any,
+    IC: typing.Any,
+    tspan: np.ndarray,
+    rhs_args: typing.Tuple[typing.Any, ...],
+    solver_hmax: float,
+    tcrit: typing.Sequence[float] = (),
+    rtol: float = RTOL,
+    atol: float = ATOL,
+    method: str = "RK45",
+) -> typing.Tuple[np.ndarray, typing.Any]:
+    """Integrates with a scipy.integrate.solve_ivp method, stopping at critical
+    points since solve_ivp cannot step onto them."""
+    jacobian = _jacobian_of(model)
+    kwargs: typing.Dict[str, typing.Any] = {}
+    if jacobian is not None and method in ["Radau", "BDF", "LSODA"]:
+        kwargs["jac"] = lambda t, y: jacobian(t, y, *rhs_args)
+
+    def fun(t, y):
+        # the kernel returns the same buffer on every call, solve_ivp keeps them
+        return np.array(model(t, y, *rhs_args), dtype=float)
+
+    bounds = [tspan[0], *[c for c in tcrit if tspan[0] < c < tspan[-1]], tspan[-1]]
+    state_model = np.full((len(tspan), len(IC)), np.nan)
+    y = np.asarray(IC, dtype=float)
+    nfe, nje = 0, 0
+    message = "Integration successful."
+    for t_start, t_stop in zip(bounds[:-1], bounds[1:]):
+        inside = (tspan >= t_start) & (tspan <= t_stop)
+        t_eval = np.union1d(tspan[inside], [t_start, t_stop])
+        solution = solve_ivp(
+            fun,
+            (t_start, t_stop),
+            y,
+            method=method,
+            t_eval=t_eval,
+            max_step=solver_hmax,
+            rtol=rtol,
+            atol=atol,
+            **kwargs,
         )
-    return state_model, np.array(state_vars, dtype=float), info
+        nfe, nje = nfe + solution.nfev, nje + solution.njev
+        if not solution.success:
+            message = solution.message
+            break
+        state_model[inside] = solution.y.T[np.isin(t_eval, tspan[inside])]
+        y = solution.y[:, -1]
+    return state_model, {
+        "message": message,
+        "nfe": np.full(len(tspan) - 1, nfe),
+        "nje": np.full(len(tspan) - 1, nje),
+    }
+
+
+def _rk4(
+    model: typing.Any,
+    IC: typing.Any,
+    tspan: np.ndarray,
+    rhs_args: typing.Tuple[typing.Any, ...],
+    solver_hmax: float,
+    tcrit: typing.Sequence[float] = (),
+    rtol: float = RTOL,
+    atol: float = ATOL,
+) -> typing.Tuple[np.ndarray, typing.Any]:
+    """Classic Runge-Kutta over fixed steps, interpolating output points with cubic
+    Hermite splines. Tolerances are ignored."""
+    h = solver_hmax if np.isfinite(solver_hmax) else FIXED_STEP
+    bounds = np.union1d(
+        [tspan[0], tspan[-1]], [c for c in tcrit if tspan[0] < c < tspan[-1]]
+    )
+    # equal steps of at most h between consecutive critical points
+    t = np.concatenate(
+        [
+            np.linspace(t_start, t_stop, int(np.ceil((t_stop - t_start) / h)) + 1)[:-1]
+            for t_start, t_stop in zip(bounds[:-1], bounds[1:])
+        ]
+        + [bounds[-1:]]
+    )
+
+    def f(t, y):
+        return np.array(model(t, y, *rhs_args), dtype=float)
+
+    y = np.empty((len(t), len(IC)))
+    dydt = np.empty((len(t), len(IC)))
+    y[0] = IC
+    message = "Integration successful."
+    for k in range(len(t) - 1):
+        dt = t[k + 1] - t[k]
+        k1 = dydt[k] = f(t[k], y[k])
+        k2 = f(t[k] + dt / 2, y[k] + dt / 2 * k1)
+        k3 = f(t[k] + dt / 2, y[k] + dt / 2 * k2)
+        k4 = f(t[k + 1], y[k] + dt * k3)
+        y[k + 1] = y[k] + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+        if not np.all(np.isfinite(y[k + 1])):
+            message = f"Integration failed: non-finite states at t={t[k + 1]}."
+            return np.full((len(tspan), len(IC)), np.nan), {"message": message}
+    dydt[-1] = f(t[-1], y[-1])
+
+    nfe = 4 * (len(t) - 1) + 1
+    return CubicHermiteSpline(t, y, dydt, axis=0)(tspan), {
+        "message": message,
+        "nfe": np.full(len(tspan) - 1, nfe),
+        "nje": np.zeros(len(tspan) - 1, dtype=int),
+    }
+
+
+def select_method(
+    model: typing.Any,
+    IC: typing.Any,
+    tspan: np.ndarray,
+    rhs_args: typing.Tuple[typing.Any, ...],
+) -> str:
+    """Method "auto" resolves to, from the stiffness of `model` at the initial states.
+
+    Stiffness is measured as the fastest decay rate of the model, i.e. the largest
+    magnitude of the real parts of the eigenvalues of its jacobian, times the horizon.
+    Problems within NONSTIFF_LIMIT are integrated with RK45, all others (and models
+    without an analytic jacobian) with odeint.
+
+    Args:
+        model (typing.Any): Differential equations, see `solve`.
+        IC (typing.Any): Initial states.
+        tspan (np.ndarray): Output times (in hrs).
+        rhs_args (typing.Tuple[typing.Any, ...]): Further arguments of `model`.
+
+    Returns:
+        str: One of METHODS.
+    """
+    jacobian = _jacobian_of(model)
+    if jacobian is None:
+        return "odeint"
+    J = jacobian(tspan[0], np.asarray(IC, dtype=float), *rhs_args)
+    rate = np.max(np.abs(np.linalg.eigvals(J).real))
+    return "RK45" if rate * (tspan[-1] - tspan[0]) <= NONSTIFF_LIMIT else "odeint"
+
+
+def _integrator(
+    method: typing.Union[str, IntegratorType],
+    rtol: float,
+    atol: float,
+    max_steps: typing.Optional[int] = None,
+) -> IntegratorType:
+    """Integrator of `method` with the tolerances (and odeint's step budget) bound."""
+    if callable(method):
+        integrator = method
+    elif method == "odeint":
+        integrator = _odeint
+        if max_steps:
+            integrator = functools.partial(_odeint, mxstep=max_steps)
+    elif method == "rk4":
+        integrator = _rk4
+    elif method in IVP_METHODS:
+        integrator = functools.partial(_solve_ivp, method=method)
+    else:
+        raise ValueError(f"Unknown method: {method}")
+    return functools.partial(integrator, rtol=rtol, atol=atol)
+
+
+def _kernel_jacobian(
+    t: float,
+    state: np.ndarray,
+    args: typing.Tuple[float, ...],
+    feed_fn: growth_model.FeedFunctionType,
+    temp_fn: growth_model.TempFunctionType,
+    out: np.ndarray,
+) -> np.ndarray:
+    """Adapts growth_model.jacobian to the arguments odeint passes to the kernel."""
+    return growth_model.jacobian(t, state, args, feed_fn, temp_fn)
+
+
+def _sensitivity_system(
+    params: parameters.InputParameters, names: typing.Sequence[str]
+) -> types.SimpleNamespace:
+    """Parameters to compute sensitivities for, and their perturbations for central
+    differences of bolus jumps."""
+    fields = [f.name for f in dataclasses.fields(parameters.InputParameters)]
+    index = [fields.index(name) for name in names]
+    values = np.array(params.tolist(), dtype=float)[index]
+    # cube root of the machine epsilon balances truncation and round-off errors
+    h = np.cbrt(np.finfo(float).eps) * np.maximum(np.abs(values), 1e-8)
+    return types.SimpleNamespace(
+        index=index,
+        h=h,
+        perturbed=[
+            dataclasses.replace(params, **{name: value + sign * step})
+            for sign in [1, -1]
+            for name, value, step in zip(names, values, h)
+        ],
+    )
+
+
+def _sensitivity_rhs(
+    t: float,
+    z: np.ndarray,
+    args: typing.Tuple[float, ...],
+    feed_fn: growth_model.FeedFunctionType,
+    temp_fn: growth_model.TempFunctionType,
+    out: np.ndarray,
+    system: types.SimpleNamespace,
+) -> np.ndarray:
+    """States and forward sensitivities S, with dS/dt = J S + df/dp."""
+    n = len(out)
+    state = z[:n]
+    S = z[n:].reshape(len(system.index), n)
+    f = growth_model.kernel(t, state, args, feed_fn, temp_fn, out)
+    J = growth_model.jacobian(t, state, args, feed_fn, temp_fn)
+    df_dp = growth_model.parameter_jacobian(t, state, args, feed_fn, temp_fn)
+    return np.concatenate([f, (S @ J.T + df_dp[:, system.index].T).ravel()])
+
+
+def _sensitivity_jacobian(
+    t: float,
+    z: np.ndarray,
+    args: typing.Tuple[float, ...],
+    feed_fn: growth_model.FeedFunctionType,
+    temp_fn: growth_model.TempFunctionType,
+    out: np.ndarray,
+    system: types.SimpleNamespace,
+) -> np.ndarray:
+    """Block diagonal approximation of the jacobian of `_sensitivity_rhs`, in banded
+    form.
+
+    Every block is the model jacobian J. The neglected dependence of the sensitivity
+    equations on the states only slows the solver's Newton iterations down a little;
+    the states themselves do not depend on the sensitivities.
+    """
+    n = len(out)
+    J = growth_model.jacobian(t, z[:n], args, feed_fn, temp_fn)
+    # band[i - j + n - 1, j] holds J[i, j] for rows/columns i, j of the same block
+    rows, cols = np.indices((n, n))
+    band = np.zeros((2 * n - 1, n))
+    band[rows - cols + n - 1, cols] = J
+    return np.tile(band, (1, len(z) // n))
+
+
+def _sensitivity_bolus_events(
+    boluses: typing.Optional[typing.Sequence[feeds.Bolus]],
+    params: parameters.InputParameters,
+    system: types.SimpleNamespace,
+) -> typing.List[EventType]:
+    return [
+        (
+            float(b.time),
+            functools.partial(
+                _sensitivity_bolus, bolus=b, params=params, system=system
+            ),
+        )
+        for b in feeds.as_boluses(boluses)
+    ]
+
+
+def _sensitivity_bolus(
+    z: np.ndarray,
+    bolus: feeds.Bolus,
+    params: parameters.InputParameters,
+    system: types.SimpleNamespace,
+) -> np.ndarray:
+    """Applies a bolus to the states, and its chain rule to the sensitivities."""
+    n = len(growth_model.STATE_NAMES)
+    state = z[:n]
+    S = z[n:].reshape(len(system.index), n)
+
+    # d(jump)/d(state), by central differences
+    h = np.cbrt(np.finfo(float).eps) * np.maximum(np.abs(state), 1.0)
+    dg_dy = np.empty((n, n))
+    for j in range(n):
+        step = np.zeros(n)
+        step[j] = h[j]
+        dg_dy[:, j] = (
+            feeds.apply_bolus(state + step, bolus, params)
+            - feeds.apply_bolus(state - step, bolus, params)
+        ) / (2 * h[j])
+    # d(jump)/d(params), for boluses of the default feed composition
+    jumps = np.array([feeds.apply_bolus(state, bolus, p) for p in system.perturbed])
+    dg_dp = (jumps[: len(system.h)] - jumps[len(system.h) :]) / (
+        2 * system.h[:, np.newaxis]
+    )
+    return np.concatenate(
+        [feeds.apply_bolus(state, bolus, params), (S @ dg_dy.T + dg_dp).ravel()]
+    )
+
+
+_JACOBIANS = {
+    growth_model.kernel: _kernel_jacobian,
+    _sensitivity_rhs: _sensitivity_jacobian,
+}
+
+
+def _jacobian_of(model: typing.Any) -> typing.Any:
+    """Analytic jacobian of a model: registered in _JACOBIANS, or carried as its
+    `jacobian` attribute (see modelspec.CompiledModel.rhs). None if it has none."""
+    return _JACOBIANS.get(model) or getattr(model, "jacobian", None)
+
+
+def _as_matrix(rows: typing.Any) -> np.ndarray:
+    """Stacks parameter/initial condition objects (or plain rows) into a matrix."""
+    if isinstance(rows, np.ndarray):
+        return np.atleast_2d(rows).astype(float)
+    return np.array(
+        [
+            r.tolist() if isinstance(r, parameters.UnitValidationMixin) else r
+            for r in rows
+        ],
+        dtype=float,
+    )
+
+
+def _per_member(fn: typing.Any, N: int) -> typing.List[typing.Any]:
+    if fn is None or callable(fn):
+        return [fn] * N
+    fns = list(fn)
+    if len(fns) != N:
+        raise ValueError(f"Got {len(fns)} profiles for {N} ensemble members.")
+    return fns
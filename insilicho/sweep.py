@@ -0,0 +1,179 @@
+import copy
+import itertools
+import types
+import typing
+
+import numpy as np
+
+from insilicho import profiles, run
+
+
+def divergence_time(a: typing.Any, b: typing.Any) -> float:
+    """Earliest time (in hrs) from which two feed or temp profiles may differ.
+
+    Piecewise profiles of the same kind (see insilicho.profiles) are compared exactly.
+    Other callables are only known to agree if they are the same object.
+
+    Args:
+        a (typing.Any): A profile or callable.
+        b (typing.Any): Another profile or callable.
+
+    Returns:
+        float: -inf if the profiles may differ from the start, inf if they are
+            identical.
+    """
+    if a is b:
+        return np.inf
+    if not (
+        isinstance(a, profiles.PiecewiseConstant)
+        and isinstance(b, profiles.PiecewiseConstant)
+        and a.continuous == b.continuous
+    ):
+        return -np.inf
+
+    # both profiles are constant (or linear) in between the union of their times
+    times = np.union1d(a.times, b.times)
+    differs = np.asarray(a(times)) != np.asarray(b(times))
+    if not differs.any():
+        return np.inf
+    k = int(np.argmax(differs))
+    if k == 0:
+        return -np.inf
+    # linear profiles part right after the last common point, constant ones jump
+    return float(times[k - 1] if a.continuous else times[k])
+
+
+def execute_shared(
+    runs: typing.Sequence[run.GrowCHO],
+    tspan: typing.Optional[np.ndarray] = None,
+) -> typing.List[types.SimpleNamespace]:
+    """Solves GrowCHO runs that differ only in their profiles, sharing common prefixes.
+
+    Runs are arranged in a tree: every stretch of time over which a group of runs has
+    identical feed and temp profiles is integrated once, and the group branches off
+    from the state at its end. Total integration time thus grows with the number of
+    distinct segments rather than the number of runs, e.g. for temperature shifts on
+    different days.
+
+    Args:
+        runs (typing.Sequence[run.GrowCHO]): Runs with identical parameters, initial
+            conditions, boluses and solver settings.
+        tspan (typing.Optional[np.ndarray], optional): time array (in hours) over
+            which to solve. Defaults to the dense grid of run.GrowCHO.execute.
+
+    Raises:
+        ValueError: If the runs differ in anything but their profiles.
+        RuntimeError: If integration/LSODA solver runs into failures.
+
+    Returns:
+        typing.List[types.SimpleNamespace]: The full result (state, state_vars, t,
+            info) of every run; info["segments"] lists the tree segments the run was
+            assembled from. Use run.flex2_sampling to sample them.
+    """
+    if not runs:
+        return []
+    first = runs[0]
+    for other in runs[1:]:
+        if (
+            other.params.tolist() != first.params.tolist()
+            or other.initial_conditions.tolist() != first.initial_conditions.tolist()
+            or other.boluses != first.boluses
+            or _solver_settings(other) != _solver_settings(first)
+        ):
+            raise ValueError("Runs may only differ in their feed and temp profiles")
+
+    if tspan is None:
+        tspan = np.linspace(0, 24 * first.params.Ndays, 1000 * first.params.Ndays)
+    tspan = np.asarray(tspan, dtype=float)
+
+    root = copy.copy(first)
+    root.reset(t0=tspan[0])
+    chunks: typing.List[typing.List[typing.Any]] = [[] for _ in runs]
+    _grow(root, list(range(len(runs))), runs, tspan, chunks, itertools.count())
+
+    results = []
+    for run_chunks in chunks:
+        segment_ids, ts, states, state_vars = zip(*run_chunks)
+        results.append(
+            types.SimpleNamespace(
+                state=np.concatenate(states),
+                state_vars=np.concatenate(state_vars),
+                t=np.concatenate(ts),
+                info={
+                    "message": "Integration successful.",
+                    "segments": list(segment_ids),
+                },
+            )
+        )
+    return results
+
+
+def _solver_settings(model: run.GrowCHO) -> typing.Tuple[typing.Any, ...]:
+    return (
+        model.solver_max_step_size,
+        model.solver_method,
+        model.solver_rtol,
+        model.solver_atol,
+    )
+
+
+def _grow(
+    model: run.GrowCHO,
+    members: typing.List[int],
+    runs: typing.Sequence[run.GrowCHO],
+    tspan: np.ndarray,
+    chunks: typing.List[typing.List[typing.Any]],
+    segment_ids: typing.Iterator[int],
+):
+    """Integrates the segment `members` share from model.t on, then branches."""
+    ref = runs[members[0]]
+    shared_until = min(
+        min(
+            divergence_time(ref.feed_fn, runs[m].feed_fn),
+            divergence_time(ref.temp_fn, runs[m].temp_fn),
+        )
+        for m in members
+    )
+    t_end = tspan[-1]
+    stop = min(max(shared_until, model.t), t_end)
+
+    if stop > model.t:
+        # the point at `stop` belongs to the next segment, unless this is the last
+        inside = (tspan >= model.t) & (
+            (tspan <= stop) if stop == t_end else (tspan < stop)
+        )
+        result = model.advance(
+            stop, feed=ref.feed_fn, temp=ref.temp_fn, output=tspan[inside]
+        )
+        keep = np.isin(result.t, tspan[inside])
+        segment = next(segment_ids)
+        for m in members:
+            chunks[m].append(
+                (
+                    segment,
+                    result.t[keep],
+                    result.state[keep],
+                    result.state_vars[keep],
+                )
+            )
+    if stop == t_end:
+        return
+
+    # members sharing their profiles beyond `stop` stay together
+    groups: typing.List[typing.List[int]] = []
+    for m in members:
+        for group in groups:
+            rep = runs[group[0]]
+            if (
+                min(
+                    divergence_time(rep.feed_fn, runs[m].feed_fn),
+                    divergence_time(rep.temp_fn, runs[m].temp_fn),
+                )
+                > stop
+            ):
+                group.append(m)
+                break
+        else:
+            groups.append([m])
+    for group in groups:
+        _grow(copy.copy(model), group, runs, tspan, chunks, segment_ids)
@@ -1,9 +1,100 @@
+import functools
+import re
 import typing
 
-import pint
+UnitType = typing.Any
 
-# Setup the pint unit-tracking system.
-# All units must come from same registry.
-UNIT = pint.UnitRegistry()
+_QUANTITY = re.compile(r"^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*(.*?)\s*$")
 
-UnitType = typing.Any
+
+@functools.lru_cache(maxsize=None)
+def registry() -> typing.Any:
+    """The pint unit registry, built on first use since it is slow to set up.
+
+    All units must come from same registry. Also available as `units.UNIT`.
+    """
+    import pint
+
+    return pint.UnitRegistry()
+
+
+def __getattr__(name: str) -> typing.Any:
+    # Lazy module attributes: the registry and pint itself are only loaded when used.
+    if name == "UNIT":
+        return registry()
+    if name == "pint":
+        import pint
+
+        return pint
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@functools.lru_cache(maxsize=4096)
+def parse(value: str) -> typing.Tuple[float, str]:
+    """Parses a quantity string (e.g. "0.05 1/h", "36 degC") into magnitude and units.
+
+    Args:
+        value (str): Quantity string.
+
+    Returns:
+        typing.Tuple[float, str]: Magnitude and canonical units.
+    """
+    UNIT = registry()
+    match = _QUANTITY.match(value)
+    if match:
+        try:
+            # Parsing number and units apart also supports offset units (degC)
+            return float(match[1]), str(UNIT.Unit(match[2] or "dimensionless"))
+        except (ValueError, AttributeError):
+            pass
+    quantity = UNIT(value)
+    if not isinstance(quantity, UNIT.Quantity):
+        return float(quantity), "dimensionless"
+    return float(quantity.magnitude), str(quantity.units)
+
+
+@functools.lru_cache(maxsize=1024)
+def affine(from_units: str, to_units: str) -> typing.Tuple[float, float]:
+    """Scale and offset converting magnitudes between two units.
+
+    Args:
+        from_units (str): Source units.
+        to_units (str): Target units.
+
+    Raises:
+        ValueError: If the units have different dimensionality.
+
+    Returns:
+        typing.Tuple[float, float]: (scale, offset), such that
+            value_in_to_units = value_in_from_units * scale + offset.
+    """
+    import pint
+
+    UNIT = registry()
+    try:
+        offset = UNIT.Quantity(0.0, from_units).to(to_units).magnitude
+        one = UNIT.Quantity(1.0, from_units).to(to_units).magnitude
+    except pint.errors.DimensionalityError:
+        raise ValueError(f"cannot convert from: {from_units} to: {to_units}")
+    return one - offset, offset
+
+
+def convert(value: str, to_units: str) -> float:
+    """Converts a quantity string to a magnitude in `to_units`.
+
+    Parsed strings and unit pairs are memoized, so repeated conversions reduce to a
+    dictionary lookup and an affine transform.
+
+    Args:
+        value (str): Quantity string, e.g. "50 mL".
+        to_units (str): Target units, e.g. "L".
+
+    Raises:
+        ValueError: If the units of `value` cannot be converted to `to_units`.
+
+    Returns:
+        float: Magnitude in `to_units`.
+    """
+    magnitude, from_units = parse(value)
+    scale, offset = affine(from_units, to_units)
+    return magnitude * scale + offset
@@ -47,3 +47,19 @@ def bolus_feed():
         temp_fn=T,
         solver_max_step_size=0.1,
     )
+
+
+@pytest.fixture
+def bolus_events():
+    def F(time):
+        return 0.0
+
+    def T(time):
+        return 36.4
+
+    return run.GrowCHO(
+        CFG_DICT,
+        feed_fn=F,
+        temp_fn=T,
+        boluses=[((i + 1) * 24, 0.03) for i in range(10)],
+    )
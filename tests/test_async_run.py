@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from insilicho import async_run, parallel, profiles, run
+
+CFG_DICT = {"parameters": {"K_lys": "0.05 1/h"}, "initial_conditions": {"V": 0.025}}
+FEED = profiles.PiecewiseConstant([0.0], [0.003])
+TEMP = profiles.SetpointShift(36.4, [(120.0, 33.0)])
+SAMPLES = {"output": "samples"}
+
+
+def job(feed_fn=FEED, **kwargs):
+    return parallel.Job(CFG_DICT, feed_fn, TEMP, execute_kwargs=SAMPLES, **kwargs)
+
+
+class SlowFeed:
+    """Constant feed taking a millisecond per call, counting calls."""
+
+    def __init__(self, gate=None):
+        self.calls = 0
+        self.gate = gate
+
+    def __call__(self, t):
+        if self.gate is not None:
+            assert self.gate.wait(10)
+        self.calls += 1
+        time.sleep(1e-3)
+        return 0.003
+
+
+class TestAsyncRunner:
+    def test_matches_execute(self):
+        async def main():
+            async with async_run.AsyncRunner() as runner:
+                return await runner.execute(job(), random_seed=3)
+
+        sampled, full_result = asyncio.run(main())
+        model = run.GrowCHO(CFG_DICT, FEED, TEMP, random_seed=3)
+        expected = model.execute(**SAMPLES)
+        np.testing.assert_array_equal(full_result.state, model.full_result.state)
+        for name in expected:
+            np.testing.assert_array_equal(sampled[name], expected[name])
+
+    def test_coalesces_identical_requests(self):
+        async def main():
+            async with async_run.AsyncRunner() as runner:
+                results = await asyncio.gather(
+                    runner.execute(job()),
+                    runner.execute(job()),
+                    runner.execute(job(), random_seed=1),
+                )
+                return results, runner.computations, runner.in_flight
+
+        results, computations, in_flight = asyncio.run(main())
+        assert computations == 2 and in_flight == 0
+        assert results[0] is results[1]
+        assert results[0][0]["Xv"] != results[2][0]["Xv"]
+
+    def test_concurrency_limit(self):
+        gate = threading.Event()
+        feeds = [SlowFeed(gate), SlowFeed(gate)]
+
+        async def main():
+            async with async_run.AsyncRunner(max_concurrency=1) as runner:
+                tasks = [asyncio.ensure_future(runner.execute(job(f))) for f in feeds]
+                await asyncio.sleep(0.2)
+                gate.set()
+                await asyncio.sleep(0.01)
+                started = [f.calls > 0 for f in feeds]
+                await asyncio.gather(*tasks)
+                return started
+
+        assert asyncio.run(main()) == [True, False]
+
+    def test_cancellation_aborts_solve(self):
+        feed = SlowFeed()
+
+        async def main():
+            async with async_run.AsyncRunner(max_concurrency=1) as runner:
+                task = asyncio.ensure_future(runner.execute(job(feed)))
+                while feed.calls < 10:
+                    await asyncio.sleep(0.01)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+                # the slot is free again once the solve stopped
+                sampled, _ = await asyncio.wait_for(runner.execute(job()), 10)
+                return sampled
+
+        sampled = asyncio.run(main())
+        calls = feed.calls
+        time.sleep(0.05)
+        # a full solve takes some 1000 feed evaluations
+        assert calls == feed.calls < 100
+        assert len(sampled["Xv"]) > 0
+
+    def test_cancelling_one_of_coalesced_requests(self):
+        async def main():
+            async with async_run.AsyncRunner() as runner:
+                first = asyncio.ensure_future(runner.execute(job()))
+                second = asyncio.ensure_future(runner.execute(job()))
+                await asyncio.sleep(0)
+                first.cancel()
+                result = await second
+                return first.cancelled(), result, runner.computations
+
+        cancelled, (sampled, _), computations = asyncio.run(main())
+        assert cancelled and computations == 1
+        assert len(sampled["Xv"]) > 0
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="max_concurrency"):
+            async_run.AsyncRunner(max_concurrency=0)
+
+
+class TestRequestKey:
+    def test_keys(self):
+        key = async_run.request_key(job())
+        assert key == async_run.request_key(job())
+        assert key != async_run.request_key(job(), random_seed=1)
+        assert key != async_run.request_key(job(solver_rtol=1e-6))
+        assert async_run.request_key(job(lambda t: 0.003)) is None
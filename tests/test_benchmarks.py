@@ -0,0 +1,25 @@
+from benchmarks import bench
+
+
+class TestCompare:
+    def results(self, **best):
+        return {"results": {name: {"best": t} for name, t in best.items()}}
+
+    def test_flags_regressions_beyond_threshold(self):
+        report = bench.compare(
+            self.results(a=1.3, b=1.1, c=1.0),
+            self.results(a=1.0, b=1.0),
+            threshold=0.2,
+        )
+        assert report["a"]["regressed"]
+        assert not report["b"]["regressed"]
+        assert "c" not in report
+
+    def test_per_benchmark_thresholds(self):
+        report = bench.compare(
+            self.results(a=1.3),
+            self.results(a=1.0),
+            threshold=0.2,
+            thresholds={"a": 0.5},
+        )
+        assert not report["a"]["regressed"]
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from insilicho import cache, profiles, run
+
+CFG_DICT = {
+    "parameters": {"K_lys": "0.05 1/h"},
+    "initial_conditions": {"V": 0.025},
+    "feed_profile": {"type": "constant", "value": 0.003},
+    "temp_profile": {"type": "setpoint_shift", "initial": 36.4},
+}
+
+
+def make_model(result_cache, **kwargs):
+    return run.GrowCHO(CFG_DICT, None, None, result_cache=result_cache, **kwargs)
+
+
+class TestResultCache:
+    def test_memory_hits(self):
+        result_cache = cache.ResultCache()
+
+        first = make_model(result_cache).execute()
+        second = make_model(result_cache).execute()
+
+        assert first == second
+        assert result_cache.stats == cache.CacheStats(hits=1, misses=1)
+
+        make_model(result_cache, random_seed=1).execute()
+        assert result_cache.stats.misses == 2
+        assert len(result_cache) == 2
+
+    def test_cached_arrays_are_read_only(self):
+        result_cache = cache.ResultCache()
+        missed = make_model(result_cache)
+        missed.execute()
+        hit = make_model(result_cache)
+        hit.execute()
+
+        with pytest.raises(ValueError):
+            hit.full_result.state[0, 0] = 0.0
+        # only what the cache holds is frozen, not the result it was given
+        missed.full_result.state[0, 0] = 0.0
+        missed.full_result.state_vars[0, 0] = 0.0
+        assert hit.full_result.state[0, 0] != 0.0
+
+    def test_lru_eviction(self):
+        result_cache = cache.ResultCache(maxsize=1)
+
+        make_model(result_cache, random_seed=0).execute()
+        make_model(result_cache, random_seed=1).execute()
+        make_model(result_cache, random_seed=0).execute()
+
+        assert result_cache.stats.misses == 3
+        assert len(result_cache) == 1
+
+    def test_disk_tier_shared_between_caches(self, tmp_path):
+        writer = cache.ResultCache(directory=str(tmp_path))
+        model = make_model(writer)
+        model.execute()
+
+        reader = cache.ResultCache(directory=str(tmp_path))
+        cached = make_model(reader)
+        cached.execute()
+
+        assert reader.stats.disk_hits == 1
+        np.testing.assert_array_equal(cached.full_result.state, model.full_result.state)
+        assert cached.full_result.info["message"] == "Integration successful."
+
+        reader.clear()
+        assert not list(tmp_path.iterdir())
+
+    def test_failed_store_leaves_no_files(self, tmp_path, monkeypatch):
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(np, "savez", fail)
+        model = make_model(cache.ResultCache(directory=str(tmp_path)))
+        with pytest.raises(OSError, match="disk full"):
+            model.execute()
+        assert not list(tmp_path.iterdir())
+
+    def test_model_version_invalidates(self, tmp_path):
+        make_model(cache.ResultCache(directory=str(tmp_path))).execute()
+
+        result_cache = cache.ResultCache(directory=str(tmp_path), model_version="new")
+        make_model(result_cache).execute()
+
+        assert result_cache.stats.misses == 1
+
+    def test_bypass(self):
+        result_cache = cache.ResultCache()
+
+        run.GrowCHO(
+            CFG_DICT, lambda t: 0.003, None, result_cache=result_cache
+        ).execute()
+        make_model(result_cache).execute(use_cache=False)
+
+        assert result_cache.stats == cache.CacheStats(bypasses=1)
+
+    def test_key_depends_on_profile_definition(self):
+        model = make_model(None)
+        result_cache = cache.ResultCache()
+        tspan = np.linspace(0, 1, 3)
+
+        def key(temp_fn):
+            return result_cache.make_key(
+                model.params, model.initial_conditions, tspan, model.feed_fn, temp_fn
+            )
+
+        assert key(profiles.SetpointShift(36.4)) == key(profiles.SetpointShift(36.4))
+        assert key(profiles.SetpointShift(36.4)) != key(profiles.SetpointShift(36.0))
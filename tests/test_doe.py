@@ -0,0 +1,166 @@
+import numpy as np
+import pytest
+
+from insilicho import doe, profiles, run
+
+CFG_DICT = {"parameters": {"K_lys": "0.05 1/h"}, "initial_conditions": {"V": 0.025}}
+FACTORS = [
+    doe.Factor("mu_max", 0.03, 0.05),
+    doe.Factor("feed", 1e-3, 3e-3),
+    doe.Factor("V", 0.02, 0.03),
+]
+
+
+def F(time):
+    return 0.003
+
+
+def T(time):
+    return 36.4
+
+
+def T2(time):
+    return 33.0
+
+
+class TestDesign:
+    def test_full_factorial(self):
+        points = doe.design(FACTORS[:2], "full_factorial", levels=3)
+        assert points.shape == (9, 2)
+        assert sorted(set(points[:, 0])) == pytest.approx([0.03, 0.04, 0.05])
+        assert len({tuple(p) for p in points}) == 9
+
+    @pytest.mark.parametrize("kind", ["latin_hypercube", "sobol"])
+    def test_space_filling(self, kind):
+        points = doe.design(FACTORS, kind, n=16, seed=3)
+        assert points.shape == (16, 3)
+        for k, factor in enumerate(FACTORS):
+            assert np.all((points[:, k] >= factor.low) & (points[:, k] <= factor.high))
+        np.testing.assert_array_equal(points, doe.design(FACTORS, kind, n=16, seed=3))
+
+    def test_latin_hypercube_strata(self):
+        points = doe.design(FACTORS, "latin_hypercube", n=10)
+        for k, factor in enumerate(FACTORS):
+            strata = (points[:, k] - factor.low) / (factor.high - factor.low) * 10
+            assert sorted(strata.astype(int)) == list(range(10))
+
+    def test_log_factor(self):
+        points = doe.design(
+            [doe.Factor("K_lys", 1e-3, 1e-1, log=True)], "full_factorial", levels=3
+        )
+        np.testing.assert_allclose(points[:, 0], [1e-3, 1e-2, 1e-1])
+
+    @pytest.mark.parametrize(
+        "factors, kind, error",
+        [
+            ([doe.Factor("nope", 0, 1)], "sobol", "Unknown factor"),
+            ([doe.Factor("mu_max", 1, 0)], "sobol", "Invalid range"),
+            ([doe.Factor("mu_max", 0, 1, log=True)], "sobol", "Invalid range"),
+            ([FACTORS[0], FACTORS[0]], "sobol", "more than once"),
+            (FACTORS, "random", "Unknown design"),
+            (FACTORS, "sobol", "Number of points"),
+        ],
+    )
+    def test_invalid(self, factors, kind, error):
+        with pytest.raises(ValueError, match=error):
+            doe.design(factors, kind)
+
+
+class TestSweep:
+    def test_results_match_single_runs(self, tmp_path):
+        points = doe.design(FACTORS, "latin_hypercube", n=3)
+        sweep = doe.Sweep(str(tmp_path), CFG_DICT, FACTORS, points, F, T)
+
+        assert sweep.run(max_workers=2) == {}
+        assert sweep.done.all()
+        for i in range(3):
+            values = sweep.values(i)
+            config = {
+                "parameters": {"K_lys": "0.05 1/h", "mu_max": values["mu_max"]},
+                "initial_conditions": {"V": values["V"]},
+            }
+            model = run.GrowCHO(
+                config,
+                feed_fn=profiles.PiecewiseConstant([0.0], [values["feed"]]),
+                temp_fn=T,
+                param_rel_stddev=0.0,
+            )
+            model.execute(output=sweep.trajectories.t)
+            np.testing.assert_allclose(
+                sweep.trajectories.run(i).state, model.full_result.state, rtol=1e-10
+            )
+
+    def test_resume(self, tmp_path):
+        points = doe.design(FACTORS, "sobol", n=4)
+        sweep = doe.Sweep(str(tmp_path), CFG_DICT, FACTORS, points, F, T)
+        sweep.done[[0, 2]] = True
+        sweep.done.flush()
+
+        resumed = doe.Sweep(str(tmp_path), CFG_DICT, FACTORS, points, F, T)
+        np.testing.assert_array_equal(resumed.pending, [1, 3])
+        assert resumed.run(max_workers=1) == {}
+
+        reopened = doe.Sweep(str(tmp_path), CFG_DICT, FACTORS, points, F, T)
+        assert len(reopened.pending) == 0
+        # points 0 and 2 were marked done without running
+        assert not reopened.trajectories["Xv"][0].any()
+        assert reopened.trajectories["Xv"][1].all()
+
+        with pytest.raises(ValueError, match="different sweep"):
+            doe.Sweep(str(tmp_path), CFG_DICT, FACTORS, points[::-1], F, T)
+
+    @pytest.mark.parametrize(
+        "changes",
+        [
+            {"config": {"parameters": {"K_lys": "0.04 1/h"}}},
+            {"temp_fn": T2},
+            {"param_rel_stddev": 0.05},
+            {"root_seed": 1},
+            {"model_kwargs": {"solver_rtol": 1e-6}},
+            {"output": [0.0, 24.0]},
+            {"record": ["Xv"]},
+            {"dtype": np.float32},
+        ],
+    )
+    def test_reopen_with_other_settings(self, tmp_path, changes):
+        points = doe.design(FACTORS, "sobol", n=2)
+        kwargs = dict(config=CFG_DICT, feed_fn=F, temp_fn=T)
+        doe.Sweep(str(tmp_path), factors=FACTORS, points=points, **kwargs)
+        doe.Sweep(str(tmp_path), factors=FACTORS, points=points, **kwargs)
+
+        with pytest.raises(ValueError, match="different sweep"):
+            doe.Sweep(
+                str(tmp_path),
+                factors=FACTORS,
+                points=points,
+                **dict(kwargs, **changes),
+            )
+
+    def test_record_and_initial_cells(self, tmp_path):
+        factors = [doe.Factor("Xv", 1e9, 5e9), doe.Factor("temp", 34.0, 37.0)]
+        sweep = doe.Sweep(
+            str(tmp_path),
+            CFG_DICT,
+            factors,
+            doe.design(factors, "full_factorial", levels=2),
+            F,
+            output=[0.0, 24.0, 48.0],
+            record=["Xv", "Xt", "T"],
+            dtype=np.float32,
+        )
+        assert sweep.run(max_workers=1) == {}
+
+        trajectories = sweep.trajectories
+        assert trajectories.names == ["Xv", "Xt", "T"]
+        np.testing.assert_allclose(trajectories["Xv"][:, 0], [1e9, 1e9, 5e9, 5e9])
+        np.testing.assert_allclose(trajectories["Xt"][:, 0], trajectories["Xv"][:, 0])
+        np.testing.assert_allclose(trajectories["T"][:, -1], [34.0, 37.0, 34.0, 37.0])
+
+    @pytest.mark.filterwarnings("ignore::scipy.integrate.ODEintWarning")
+    def test_failures_stay_pending(self, tmp_path):
+        factors = [doe.Factor("V", -1.0, -1.0)]
+        sweep = doe.Sweep(str(tmp_path), CFG_DICT, factors, [[-1.0]], F, T)
+        errors = sweep.run(max_workers=1)
+        assert list(errors) == [0]
+        assert errors[0].startswith("RuntimeError")
+        np.testing.assert_array_equal(sweep.pending, [0])
@@ -0,0 +1,107 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from insilicho import fit, parameters, profiles, run, solver
+
+
+@pytest.fixture
+def experiment():
+    truth = dataclasses.replace(
+        parameters.InputParameters(Ndays=5), mu_max=0.05, K_lys=0.003
+    )
+    feed_fn = profiles.PiecewiseConstant([0.0, 48.0], [0.0, 0.003])
+    temp_fn = profiles.PiecewiseConstant([0.0], [36.4])
+    tspan = np.linspace(0, 120, 5000)
+    state, state_vars, _ = solver.solve(
+        truth,
+        parameters.InitialConditions(),
+        tspan=tspan,
+        feed_fn=feed_fn,
+        temp_fn=temp_fn,
+    )
+    measurements = run.flex2_sampling(state, state_vars, truth, tspan, 0.0)
+    measurements["Cgln"][3] = None  # a missing sample
+    return truth, measurements, feed_fn, temp_fn
+
+
+class TestFit:
+    @pytest.mark.parametrize("jacobian", ["sensitivities", "fd"])
+    def test_recovers_parameters(self, experiment, jacobian):
+        truth, measurements, feed_fn, temp_fn = experiment
+        free = [
+            fit.FreeParameter("mu_max", 0.01, 0.1),
+            fit.FreeParameter("K_lys", 1e-4, 0.05),
+        ]
+
+        result = fit.fit(
+            measurements,
+            free,
+            feed_fn,
+            temp_fn,
+            params=parameters.InputParameters(Ndays=5),
+            jacobian=jacobian,
+        )
+
+        assert result.success
+        assert result.values["mu_max"] == pytest.approx(truth.mu_max, rel=1e-4)
+        assert result.values["K_lys"] == pytest.approx(truth.K_lys, rel=1e-3)
+        assert result.params.mu_max == result.values["mu_max"]
+        assert result.nsolves > 0
+        solving = ["residuals", "jacobian", "augmented"]
+        assert result.timings["total"] >= sum(result.timings[k] for k in solving)
+        if jacobian == "sensitivities":
+            assert result.timings["augmented"] > 0
+            assert result.timings["residuals"] == result.timings["jacobian"] == 0
+        else:
+            assert result.timings["residuals"] > 0 and result.timings["jacobian"] > 0
+            assert result.timings["augmented"] == 0
+
+    def test_invalid_inputs(self, experiment):
+        _, measurements, feed_fn, temp_fn = experiment
+        with pytest.raises(ValueError):
+            fit.fit(measurements, [fit.FreeParameter("Ndays", 1, 20)], feed_fn, temp_fn)
+        with pytest.raises(ValueError):
+            fit.fit(
+                dict(measurements, Titer=[1.0]),
+                [fit.FreeParameter("mu_max", 0.01, 0.1)],
+                feed_fn,
+                temp_fn,
+            )
+        with pytest.raises(ValueError):
+            fit.fit(
+                measurements,
+                [fit.FreeParameter("mu_max", 0.01, 0.1)],
+                feed_fn,
+                temp_fn,
+                jacobian="bfgs",
+            )
+        with pytest.raises(ValueError, match="precede"):
+            fit.fit(
+                measurements,
+                [fit.FreeParameter("mu_max", 0.01, 0.1)],
+                feed_fn,
+                temp_fn,
+                t0=24.0,
+            )
+        with pytest.raises(ValueError, match="No measured values"):
+            fit.fit(
+                {"time": [24.0, 48.0], "Cglc": [None, np.nan]},
+                [fit.FreeParameter("mu_max", 0.01, 0.1)],
+                feed_fn,
+                temp_fn,
+            )
+
+    def test_unmeasured_quantity_is_skipped(self, experiment):
+        _, measurements, feed_fn, temp_fn = experiment
+        measurements["Cglc"] = [None] * len(measurements["time"])
+        result = fit.fit(
+            measurements,
+            [fit.FreeParameter("mu_max", 0.01, 0.1)],
+            feed_fn,
+            temp_fn,
+            params=parameters.InputParameters(Ndays=5),
+            max_nfev=2,
+        )
+        assert result.nsolves > 0
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 
 from insilicho import growth_model, parameters
@@ -27,3 +28,166 @@ class TestGrowthModel:
     def test_missing_fns_raise_errors(self):
         with pytest.raises(ValueError):
             assert growth_model.state_vars(1, ([1] * 10), parameters.InputParameters)
+
+    def test_kernel_matches_model(self):
+        params = parameters.InputParameters()
+        state = np.array(parameters.InitialConditions().tolist())
+        args = params.tolist()
+
+        for Cglc, Camm in [(150.0, 0.1), (0.2, 0.1), (150.0, 12.0)]:
+            state[2], state[5] = Cglc, Camm
+            expected = growth_model.model(
+                5.0, state, args, lambda t: 0.003, lambda t: 35.0
+            )
+            out = growth_model.kernel(
+                5.0,
+                state,
+                growth_model.flat_parameters(params),
+                lambda t: 0.003,
+                lambda t: 35.0,
+                np.empty(10),
+            )
+            np.testing.assert_allclose(out, expected, rtol=1e-12)
+
+    def test_state_vars_array_matches_state_vars(self):
+        params = parameters.InputParameters()
+        t = np.linspace(0, 48, 7)
+        state = np.tile(parameters.InitialConditions().tolist(), (len(t), 1))
+        state[:, 2] = np.linspace(0.1, 20, len(t))  # Cglc crosses 0.5
+        state[:, 5] = np.linspace(1, 15, len(t))  # Camm crosses Ki_amm
+
+        def F(time):
+            return 0.003 if time < 24 else 0.001  # scalar-only
+
+        def T(time):
+            return 36.4 - 0.1 * time
+
+        expected = [
+            growth_model.state_vars(ti, si, params, F, T) for ti, si in zip(t, state)
+        ]
+        np.testing.assert_allclose(
+            growth_model.state_vars_array(t, state, params, F, T),
+            expected,
+            rtol=1e-12,
+        )
+
+    def test_jacobian_matches_finite_differences(self):
+        args = growth_model.flat_parameters(parameters.InputParameters())
+        state = np.array([3e9, 3.2e9, 20, 5, 3, 2, 100, 0.2, 0.05, 7.1])
+
+        def F(time):
+            return 0.003
+
+        def T(time):
+            return 35.0
+
+        def rhs(y):
+            return growth_model.kernel(1.0, y, args, F, T, np.empty(10))
+
+        expected = np.zeros((10, 10))
+        for j in range(10):
+            h = 1e-6 * abs(state[j])
+            step = np.zeros(10)
+            step[j] = h
+            expected[:, j] = (rhs(state + step) - rhs(state - step)) / (2 * h)
+
+        J = growth_model.jacobian(1.0, state, args, F, T)
+        np.testing.assert_allclose(J, expected, rtol=1e-5, atol=1e-12 * abs(J).max())
+        assert not J[~growth_model.jacobian_sparsity()].any()
+
+    def test_parameter_jacobian_matches_finite_differences(self):
+        args = growth_model.flat_parameters(parameters.InputParameters())
+        state = np.array([3e9, 3.2e9, 20, 5, 3, 2, 100, 0.2, 0.05, 7.1])
+
+        def F(time):
+            return 0.003
+
+        def T(time):
+            return 35.0
+
+        def rhs(p):
+            return growth_model.kernel(1.0, state, tuple(p), F, T, np.empty(10))
+
+        expected = np.zeros((10, len(args)))
+        for k in range(len(args)):
+            h = 1e-4 * abs(args[k])
+            step = np.zeros(len(args))
+            step[k] = h
+            expected[:, k] = (rhs(args + step) - rhs(args - step)) / (2 * h)
+
+        J = growth_model.parameter_jacobian(1.0, state, args, F, T)
+        np.testing.assert_allclose(J, expected, rtol=1e-5, atol=1e-9 * abs(J).max())
+
+
+# Cglc and Camm on either side of the q_lac and q_mab switches
+@pytest.mark.parametrize("Cglc, Camm", [(20.0, 2.0), (0.2, 2.0), (20.0, 12.0)])
+class TestKineticsAgree:
+    """Every hand-written copy of the kinetics against the reference `model`."""
+
+    args = growth_model.flat_parameters(parameters.InputParameters())
+    t = 1.0
+
+    @staticmethod
+    def F(time):
+        return 0.003
+
+    @staticmethod
+    def T(time):
+        return 35.0
+
+    def state(self, Cglc, Camm):
+        return np.array([3e9, 3.2e9, Cglc, 5, 3, Camm, 100, 0.2, 0.05, 7.1])
+
+    def reference(self, state, args):
+        return np.array(growth_model.model(self.t, state, list(args), self.F, self.T))
+
+    def test_kernel(self, Cglc, Camm):
+        state = self.state(Cglc, Camm)
+        np.testing.assert_allclose(
+            growth_model.kernel(self.t, state, self.args, self.F, self.T, np.empty(10)),
+            self.reference(state, self.args),
+            rtol=1e-12,
+        )
+
+    def test_state_vars(self, Cglc, Camm):
+        state = self.state(Cglc, Camm)
+        params = parameters.InputParameters(*self.args)
+        expected = growth_model.state_vars(self.t, state, params, self.F, self.T)
+        np.testing.assert_allclose(
+            growth_model.kinetics(0.003, 35.0, state, params), expected, rtol=1e-12
+        )
+        np.testing.assert_allclose(
+            growth_model.state_vars_array(
+                np.array([self.t]), state[np.newaxis], params, self.F, self.T
+            )[0],
+            expected,
+            rtol=1e-12,
+        )
+
+    def test_jacobian(self, Cglc, Camm):
+        state = self.state(Cglc, Camm)
+        expected = np.zeros((10, 10))
+        for j in range(10):
+            step = np.zeros(10)
+            step[j] = 1e-6 * abs(state[j])
+            expected[:, j] = (
+                self.reference(state + step, self.args)
+                - self.reference(state - step, self.args)
+            ) / (2 * step[j])
+
+        J = growth_model.jacobian(self.t, state, self.args, self.F, self.T)
+        np.testing.assert_allclose(J, expected, rtol=1e-5, atol=1e-12 * abs(J).max())
+
+    def test_parameter_jacobian(self, Cglc, Camm):
+        state = self.state(Cglc, Camm)
+        args = np.array(self.args)
+        expected = np.zeros((10, len(args)))
+        for k in range(len(args)):
+            step = np.zeros(len(args))
+            step[k] = 1e-4 * abs(args[k])
+            expected[:, k] = (
+                self.reference(state, args + step) - self.reference(state, args - step)
+            ) / (2 * step[k])
+
+        J = growth_model.parameter_jacobian(self.t, state, self.args, self.F, self.T)
+        np.testing.assert_allclose(J, expected, rtol=1e-5, atol=1e-9 * abs(J).max())
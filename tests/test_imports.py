@@ -0,0 +1,36 @@
+import json
+import subprocess
+import sys
+
+# Import time of insilicho itself, on top of numpy and scipy.integrate which any
+# simulation needs. Measured at ~0.02s; the budget leaves room for slow CI machines.
+IMPORT_TIME_BUDGET = 0.25  # seconds
+
+MEASURE = """
+import json, sys, time
+t0 = time.perf_counter()
+import numpy, scipy.integrate
+t1 = time.perf_counter()
+import insilicho.run
+t2 = time.perf_counter()
+print(json.dumps({
+    "dependencies": t1 - t0,
+    "insilicho": t2 - t1,
+    "loaded": [m for m in ["matplotlib", "pint", "yaml", "pandas"] if m in sys.modules],
+}))
+"""
+
+
+def measure():
+    out = subprocess.run(
+        [sys.executable, "-c", MEASURE], capture_output=True, check=True, text=True
+    )
+    return json.loads(out.stdout)
+
+
+class TestImports:
+    def test_optional_modules_loaded_lazily(self):
+        assert measure()["loaded"] == []
+
+    def test_import_time_budget(self):
+        assert measure()["insilicho"] < IMPORT_TIME_BUDGET
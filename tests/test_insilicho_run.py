@@ -4,7 +4,7 @@ import dataclasses
 import numpy as np
 import pytest
 
-from insilicho import run
+from insilicho import feeds, profiles, run
 
 
 class TestInsilichoRun:
@@ -50,6 +50,48 @@ class TestInsilichoRun:
             else:
                 assert v1 != v2
 
+    def test_flex2_sampling_batch(self, constant_feed: run.GrowCHO):
+        constant_feed.execute(output="samples")
+        result = constant_feed.full_result
+        samples = run.flex2_sampling_batch(
+            np.stack([result.state] * 3),
+            np.stack([result.state_vars] * 3),
+            constant_feed.params,
+            result.t,
+            rng=np.random.default_rng(0),
+        )
+
+        n_samples = len(result.t)
+        assert samples["time"].shape == (n_samples,)
+        assert samples["Xv"].shape == (3, n_samples)
+        # members draw independent noise, exact quantities are shared
+        assert not np.array_equal(samples["Xv"][0], samples["Xv"][1])
+        np.testing.assert_array_equal(samples["V"][0], samples["V"][1])
+
+        frame = run.to_frame(samples)
+        assert len(frame) == 3 * n_samples
+        assert list(frame.columns[:2]) == ["member", "time"]
+
+    def test_flex2_sampling_is_a_single_member_batch(self, constant_feed: run.GrowCHO):
+        constant_feed.execute(output="samples")
+        result = constant_feed.full_result
+        args = (result.state, result.state_vars, constant_feed.params, result.t, 0.05)
+
+        sampled = run.flex2_sampling(*args, rng=np.random.RandomState(1))
+        batch = run.flex2_sampling_batch(*args, rng=np.random.RandomState(1))
+        assert sampled == {name: v.tolist() for name, v in batch.items()}
+
+        # the legacy stream: one draw per noisy quantity, in order
+        rng = np.random.RandomState(1)
+        Xv = result.state[:, 0] * 1e-9
+        Xt = result.state[:, 1] * 1e-9
+        np.testing.assert_array_equal(
+            sampled["Xv"], Xv * rng.normal(1.0, 0.05, len(Xv))
+        )
+        np.testing.assert_array_equal(
+            sampled["Xt"], Xt * rng.normal(1.0, 0.05, len(Xt))
+        )
+
 
 class TestGrowCHO:
     def test_random_noise(self, constant_feed: run.GrowCHO):
@@ -68,3 +110,183 @@ class TestGrowCHO:
         ):
             if f.name in noisy_params:
                 assert v1 != v2
+
+    def test_does_not_touch_global_random_state(self):
+        np.random.seed(1)
+        expected = np.random.normal()
+
+        np.random.seed(1)
+        run.GrowCHO({}, feed_fn=None, temp_fn=None, random_seed=5)
+        assert np.random.normal() == expected
+
+    def test_generator_seed(self):
+        def make(seed):
+            return run.GrowCHO(
+                {}, None, None, random_seed=np.random.default_rng(seed)
+            ).params.tolist()
+
+        assert make(3) == make(3)
+        assert make(3) != make(4)
+
+
+class TestOutputModes:
+    def test_sampled_output_is_independent_of_mode(self, constant_feed):
+        dense = copy.deepcopy(constant_feed).execute()
+        n_samples = constant_feed.params.Ndays * constant_feed.params.Nsamples + 1
+        for output in ["samples", "native", np.linspace(0, 48, 7)]:
+            grow_cho = copy.deepcopy(constant_feed)
+            sampled = grow_cho.execute(output=output)
+            assert sampled["time"] == dense["time"]
+            for k in dense:
+                np.testing.assert_allclose(sampled[k], dense[k], rtol=1e-5)
+            if isinstance(output, str) and output == "samples":
+                assert len(grow_cho.full_result.t) == n_samples
+
+    def test_explicit_grid(self, constant_feed):
+        grid = np.linspace(0, 48, 7)
+        constant_feed.execute(output=grid)
+        np.testing.assert_array_equal(constant_feed.full_result.t, grid)
+        assert constant_feed.full_result.state.shape == (7, 10)
+
+    def test_grid_outside_simulated_days(self, constant_feed):
+        with pytest.raises(ValueError, match="Output times"):
+            constant_feed.execute(starting_at_day=1, output=[0.0, 12.0, 24.0, 48.0])
+        with pytest.raises(ValueError, match="Output times"):
+            constant_feed.execute(output=[24.0, 1000.0])
+
+    def test_native_steps(self, constant_feed):
+        constant_feed.execute(output="native")
+        t = constant_feed.full_result.t
+        assert np.all(np.diff(t) > 0)
+        assert len(t) < 1000 * constant_feed.params.Ndays
+
+    def test_record(self, constant_feed):
+        constant_feed.execute(output="samples", record=["Xv", "Cmab", "mu"])
+        result = constant_feed.full_result
+        assert result.state_names == ["Xv", "Cmab"]
+        assert result.state_var_names == ["mu"]
+        assert result.state.shape[1] == 2 and result.state_vars.shape[1] == 1
+
+        with pytest.raises(ValueError):
+            constant_feed.execute(record=["Xq"])
+        with pytest.raises(ValueError):
+            constant_feed.execute(output="sparse")
+
+
+class TestAdvance:
+    def test_steps_match_single_run(self, constant_feed: run.GrowCHO):
+        constant_feed.boluses = feeds.as_boluses([(24, 0.03), (36, 0.03)])
+        constant_feed.execute(output=np.arange(0, 73.0))
+        expected = constant_feed.full_result.state
+
+        for to_t in range(6, 73, 6):
+            interval = constant_feed.advance(to_t)
+            assert interval.t[0] == to_t - 6 and interval.t[-1] == to_t
+        assert constant_feed.t == 72
+        np.testing.assert_allclose(constant_feed.state, expected[-1], rtol=1e-5)
+
+    def test_held_controls(self, constant_feed: run.GrowCHO):
+        constant_feed.advance(12, feed=0.0, temp=33)
+        interval = constant_feed.advance(24, output=np.array([18.0]))
+        np.testing.assert_array_equal(interval.t, [12, 18, 24])
+        np.testing.assert_array_equal(interval.state_vars[:, :2], [[0.0, 33.0]] * 3)
+
+        constant_feed.reset()
+        assert constant_feed.t == 0
+        assert constant_feed.advance(12).state_vars[0, 1] == 36.4
+
+    def test_reassigned_profiles_are_used(self, constant_feed: run.GrowCHO):
+        constant_feed.advance(12)
+        constant_feed.feed_fn = profiles.PiecewiseConstant([0.0], [0.0])
+        constant_feed.temp_fn = profiles.PiecewiseConstant([0.0], [33.0])
+        interval = constant_feed.advance(24, output=np.array([18.0]))
+        np.testing.assert_array_equal(interval.state_vars[:, :2], [[0.0, 33.0]] * 3)
+
+        constant_feed.advance(36, feed=0.001)
+        constant_feed.feed_fn = profiles.PiecewiseConstant([0.0], [0.002])
+        assert constant_feed.advance(48).state_vars[-1, 0] == 0.001
+
+    def test_invalid_steps(self, constant_feed: run.GrowCHO):
+        constant_feed.advance(12)
+        with pytest.raises(ValueError):
+            constant_feed.advance(12)
+        with pytest.raises(ValueError):
+            constant_feed.advance(24, output=np.array([30.0]))
+
+
+class TestCheckpoint:
+    @pytest.fixture
+    def grow_cho(self):
+        return run.GrowCHO(
+            {"parameters": {"K_lys": "0.05 1/h"}, "initial_conditions": {"V": 0.025}},
+            feed_fn=profiles.PiecewiseConstant([0.0], [0.003]),
+            temp_fn=profiles.SetpointShift(36.4, [(48.0, 33.0)]),
+            random_seed=3,
+            boluses=[(24, 0.03), (60, 0.03)],
+        )
+
+    @pytest.mark.parametrize("seed", [3, np.random.default_rng(3)])
+    def test_resume_is_exact(self, grow_cho: run.GrowCHO, tmp_path, seed):
+        if not isinstance(seed, int):
+            grow_cho.rng = seed
+        grow_cho.advance(36, feed=0.002)
+        grow_cho.save_checkpoint(str(tmp_path / "checkpoint.json"))
+        resumed = run.GrowCHO.load_checkpoint(str(tmp_path / "checkpoint.json"))
+
+        assert resumed.t == 36
+        assert resumed.params == grow_cho.params
+        np.testing.assert_array_equal(
+            resumed.advance(72).state, grow_cho.advance(72).state
+        )
+        assert resumed.rng.normal() == grow_cho.rng.normal()
+
+    def test_file_is_strict_json(self, grow_cho: run.GrowCHO, tmp_path):
+        grow_cho.advance(24)
+        assert grow_cho.solver_max_step_size == np.inf
+        grow_cho.save_checkpoint(str(tmp_path / "checkpoint.json"))
+        with open(tmp_path / "checkpoint.json") as f:
+            text = f.read()
+        assert "Infinity" not in text and "NaN" not in text
+
+        resumed = run.GrowCHO.load_checkpoint(str(tmp_path / "checkpoint.json"))
+        assert resumed.solver_max_step_size == np.inf
+        np.testing.assert_array_equal(
+            resumed.advance(48).state, grow_cho.advance(48).state
+        )
+
+    def test_restore_does_not_randomize(self, grow_cho: run.GrowCHO, monkeypatch):
+        checkpoint = grow_cho.checkpoint()
+
+        def randomize(self, rel_stddev):
+            raise AssertionError("parameters were randomized again")
+
+        monkeypatch.setattr(run.GrowCHO, "_randomize_params", randomize)
+        resumed = run.GrowCHO.from_checkpoint(checkpoint)
+        assert resumed.params == grow_cho.params
+
+    def test_plain_callables_are_passed_on_restore(self, constant_feed: run.GrowCHO):
+        checkpoint = constant_feed.checkpoint()
+        with pytest.raises(ValueError):
+            run.GrowCHO.from_checkpoint(checkpoint)
+
+        resumed = run.GrowCHO.from_checkpoint(
+            checkpoint,
+            feed_fn=constant_feed.feed_fn,
+            temp_fn=constant_feed.temp_fn,
+        )
+        assert resumed.params == constant_feed.params
+
+        with pytest.raises(ValueError):
+            run.GrowCHO.from_checkpoint(dict(checkpoint, version=0))
+
+    def test_solver_settings_are_kept(self, grow_cho: run.GrowCHO):
+        grow_cho.solver_method = "rk4"
+        grow_cho.solver_rtol = grow_cho.solver_atol = 1e-6
+        resumed = run.GrowCHO.from_checkpoint(grow_cho.checkpoint())
+
+        assert resumed.solver_method == "rk4"
+        assert resumed.solver_rtol == resumed.solver_atol == 1e-6
+        np.testing.assert_array_equal(
+            resumed.advance(36).state, grow_cho.advance(36).state
+        )
+        assert resumed.advance(40).info["method"] == "rk4"
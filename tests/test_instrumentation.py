@@ -0,0 +1,63 @@
+import typing
+
+from insilicho import cache, instrumentation, run
+
+CFG_DICT = {
+    "parameters": {"K_lys": "0.05 1/h"},
+    "initial_conditions": {"V": 0.025},
+    "feed_profile": {"type": "constant", "value": 0.003},
+    "temp_profile": {"type": "setpoint_shift", "initial": 36.4},
+}
+
+
+class TestInstrumentation:
+    def test_disabled_by_default(self, constant_feed: run.GrowCHO):
+        constant_feed.execute()
+        assert constant_feed.full_result.stats is None
+
+    def test_counts(self, constant_feed: run.GrowCHO):
+        exported: typing.List[instrumentation.RunStats] = []
+        constant_feed.stats_hook = exported.append
+        constant_feed.execute()
+
+        stats = constant_feed.full_result.stats
+        info = constant_feed.full_result.info
+        assert exported == [stats]
+        assert stats.rhs_evals == info["nfe"][-1] > 0
+        assert stats.jacobian_evals == info["nje"][-1]
+        assert stats.steps == info["nst"][-1]
+        assert stats.method_switches is not None
+        # every rhs and jacobian evaluation calls the profiles, plus state_vars
+        assert stats.feed_calls == stats.temp_calls
+        assert stats.feed_calls >= stats.rhs_evals + stats.jacobian_evals + 1
+        assert stats.feed_time > 0
+        assert set(stats.phases) == {
+            "solve",
+            "integrate",
+            "state_vars",
+            "sampling",
+            "total",
+        }
+        assert stats.phases["integrate"] < stats.phases["solve"]
+        assert stats.phases["solve"] < stats.phases["total"]
+        assert stats.as_dict()["phase_total"] == stats.phases["total"]
+
+    def test_cached_runs_call_nothing(self):
+        model = run.GrowCHO(CFG_DICT, None, None, result_cache=cache.ResultCache())
+        model.execute(instrument=True)
+        first = model.full_result.stats
+        model.execute(instrument=True)
+        second = model.full_result.stats
+
+        assert not first.cached and second.cached
+        assert second.rhs_evals == first.rhs_evals
+        assert second.feed_calls == second.temp_calls == 0
+        assert "integrate" not in second.phases
+
+    def test_counter_forwards_profile_attributes(self):
+        model = run.GrowCHO(CFG_DICT, None, None)
+        counter = instrumentation.CallCounter(model.temp_fn)
+        assert counter.continuous == model.temp_fn.continuous
+        assert list(counter.breakpoints) == list(model.temp_fn.breakpoints)
+        assert counter(1.0) == model.temp_fn(1.0)
+        assert counter.calls == 1
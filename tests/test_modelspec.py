@@ -0,0 +1,239 @@
+import dataclasses
+import pickle
+
+import numpy as np
+import pytest
+
+from insilicho import chemistry, growth_model, modelspec, parameters, solver
+
+
+def feed(t):
+    return 0.001
+
+
+def temp(t):
+    return 36.0
+
+
+@pytest.fixture
+def aspartate():
+    """GROWCHO with aspartate consumption."""
+    spec = modelspec.GROWCHO
+    return dataclasses.replace(
+        spec,
+        states=spec.states
+        + [modelspec.StateSpec("Casp", "5 mM", species=chemistry.Species.Asp)],
+        parameters=dict(spec.parameters, q_asp_max="0.5 pmol/hr"),
+        parameter_units=dict(spec.parameter_units, q_asp_max="mmol/hr"),
+        rates=dict(spec.rates, q_asp="q_asp_max * Casp / (Casp + 0.1)"),
+        derivatives=dict(spec.derivatives, Casp="-q_asp * Xv - F * Casp / V"),
+    )
+
+
+class TestCompile:
+    def test_matches_kernel(self):
+        compiled = modelspec.compile_spec(modelspec.GROWCHO)
+        params = parameters.InputParameters()
+        args = compiled.parameter_vector(params)
+        rng = np.random.default_rng(0)
+        for _ in range(5):
+            state = np.array(parameters.InitialConditions().tolist())
+            state *= rng.uniform(0.5, 2.0, len(state))
+            expected = growth_model.kernel(
+                0.0,
+                state,
+                growth_model.flat_parameters(params),
+                feed,
+                temp,
+                np.empty(10),
+            )
+            np.testing.assert_array_equal(
+                compiled.rhs(0.0, state, args, feed, temp, np.empty(10)), expected
+            )
+            np.testing.assert_allclose(
+                compiled.jacobian(0.0, state, args, feed, temp, None),
+                growth_model.jacobian(
+                    0.0, state, growth_model.flat_parameters(params), feed, temp
+                ),
+                rtol=1e-9,
+                atol=1e-12,
+            )
+
+    def test_state_vars_match(self):
+        compiled = modelspec.compile_spec(modelspec.GROWCHO)
+        t = np.linspace(0, 288, 50)
+        state, state_vars, _ = solver.solve(
+            None, None, model=compiled, tspan=t, feed_fn=feed, temp_fn=temp
+        )
+        assert compiled.state_var_names == list(growth_model.STATE_VAR_NAMES)
+        np.testing.assert_allclose(
+            state_vars,
+            growth_model.state_vars_array(
+                t, state, parameters.InputParameters(), feed, temp
+            ),
+            rtol=1e-12,
+            atol=1e-15,
+        )
+
+    def test_solve_matches_kernel(self):
+        t = np.linspace(0, 288, 100)
+        expected, _, _ = solver.solve(None, None, tspan=t, feed_fn=feed, temp_fn=temp)
+        state, _, info = solver.solve(
+            None,
+            None,
+            model=modelspec.compile_spec(modelspec.GROWCHO),
+            tspan=t,
+            feed_fn=feed,
+            temp_fn=temp,
+        )
+        assert info["message"] == "Integration successful."
+        np.testing.assert_allclose(state, expected, rtol=1e-10)
+
+    def test_cached_per_spec(self, aspartate):
+        compiled = modelspec.compile_spec(aspartate)
+        assert modelspec.compile_spec(dataclasses.replace(aspartate)) is compiled
+        assert modelspec.compile_spec(modelspec.GROWCHO) is not compiled
+        assert pickle.loads(pickle.dumps(compiled)) is compiled
+
+
+class TestVariant:
+    def test_solve(self, aspartate):
+        compiled = modelspec.compile_spec(aspartate)
+        t = np.linspace(0, 96, 50)
+        state, state_vars, _ = solver.solve(
+            {"q_asp_max": "0.002 pmol/hr"},
+            {"Casp": 2.0},
+            model=compiled,
+            tspan=t,
+            feed_fn=feed,
+            temp_fn=temp,
+            method="auto",
+        )
+
+        assert state.shape == (50, 11)
+        assert state[0, -1] == 2.0
+        assert np.all(np.diff(state[:, -1]) < 0) and state[-1, -1] > 0
+        q_asp = state_vars[:, compiled.state_var_names.index("q_asp")]
+        np.testing.assert_allclose(q_asp[0], 2e-12 * 2.0 / 2.1)
+        osmolarity = state_vars[:, -1]
+        np.testing.assert_allclose(
+            osmolarity,
+            state[:, 2] + state[:, 3] + 2 * state[:, 4] + state[:, 5] + state[:, 10],
+        )
+
+    def test_jacobian(self, aspartate):
+        compiled = modelspec.compile_spec(aspartate)
+        args = compiled.parameter_vector()
+        state = np.array(compiled.initial_state())
+        J = compiled.jacobian(0.0, state, args, feed, temp, None)
+        # central differences
+        expected = np.empty_like(J)
+        for j in range(len(state)):
+            h = 1e-6 * max(abs(state[j]), 1e-3)
+            up, down = state.copy(), state.copy()
+            up[j] += h
+            down[j] -= h
+            expected[:, j] = (
+                compiled.rhs(0.0, up, args, feed, temp, np.empty(11))
+                - compiled.rhs(0.0, down, args, feed, temp, np.empty(11))
+            ) / (2 * h)
+        np.testing.assert_allclose(J, expected, rtol=1e-5, atol=1e-9)
+
+    def test_rate_named_like_a_parameter(self):
+        spec = modelspec.ModelSpec(
+            states=[modelspec.StateSpec("X", 3.0)],
+            parameters={"k": 2.0},
+            rates={"k": "k * X"},
+            derivatives={"X": "-k"},
+        )
+        compiled = modelspec.compile_spec(spec)
+        state, h = np.array([3.0]), 1e-6
+        expected = (
+            compiled.rhs(0.0, state + h, (2.0,), feed, temp, np.empty(1))
+            - compiled.rhs(0.0, state - h, (2.0,), feed, temp, np.empty(1))
+        ) / (2 * h)
+        J = compiled.jacobian(0.0, state, (2.0,), feed, temp)
+        np.testing.assert_allclose(J[:, 0], expected, rtol=1e-6)
+        np.testing.assert_allclose(J, [[-2.0]])
+        state_vars = compiled.state_vars(np.zeros(1), state[None], (2.0,), feed, temp)
+        np.testing.assert_allclose(state_vars[:, 2], [6.0])
+
+    def test_functions(self):
+        spec = modelspec.ModelSpec(
+            states=[modelspec.StateSpec("x", 1.0), modelspec.StateSpec("y", 2.0)],
+            parameters={"k": 0.5},
+            rates={"r": "maximum(sqrt(x) * exp(-k * y), log(y) / abs(x - 3))"},
+            derivatives={"x": "-r * x ** 3", "y": "where(x > 0.5, r, 0.0) * y"},
+        )
+        compiled = modelspec.compile_spec(spec)
+        state = np.array([1.0, 2.0])
+        J = compiled.jacobian(0.0, state, (0.5,), feed, temp)
+        h = 1e-7
+        for j in range(2):
+            step = np.eye(2)[j] * h
+            expected = (
+                compiled.rhs(0.0, state + step, (0.5,), feed, temp, np.empty(2))
+                - compiled.rhs(0.0, state - step, (0.5,), feed, temp, np.empty(2))
+            ) / (2 * h)
+            np.testing.assert_allclose(J[:, j], expected, rtol=1e-6, atol=1e-8)
+        state_vars = compiled.state_vars(
+            np.zeros(3), np.tile(state, (3, 1)), (0.5,), feed, temp
+        )
+        assert compiled.state_var_names == ["F", "T", "r"]
+        np.testing.assert_allclose(state_vars[:, 2], max(np.exp(-1.0), np.log(2) / 2))
+
+
+class TestValidation:
+    @pytest.mark.parametrize(
+        "rates, error",
+        [
+            ({"r": "x +"}, "Invalid expression"),
+            ({"r": "undefined * x"}, "Unknown name"),
+            ({"r": "x.real"}, "Unsupported syntax"),
+            ({"r": "open(x)"}, "Unsupported call"),
+            ({"r": "exp(x, 2)"}, "Unsupported call"),
+            ({"r": "0 < x < 1"}, "Chained comparison"),
+            ({"r": "s * x", "s": "x"}, "Unknown name"),
+            ({"x": "1.0"}, "defined more than once"),
+            ({"_r": "1.0"}, "reserved"),
+            ({"exp": "1.0"}, "reserved"),
+        ],
+    )
+    def test_invalid(self, rates, error):
+        spec = modelspec.ModelSpec(
+            states=[modelspec.StateSpec("x")],
+            parameters={},
+            rates=rates,
+            derivatives={"x": "-x"},
+        )
+        with pytest.raises(ValueError, match=error):
+            modelspec.CompiledModel(spec)
+
+    def test_units(self):
+        spec = modelspec.ModelSpec(
+            states=[modelspec.StateSpec("V", "50 mL", units="L")],
+            parameters={"k": "1 1/day"},
+            derivatives={"V": "-k * V"},
+            parameter_units={"k": "1/hr"},
+        )
+        compiled = modelspec.CompiledModel(spec)
+        assert compiled.initial_state() == pytest.approx([0.05])
+        assert compiled.parameter_vector() == pytest.approx((1 / 24,))
+        assert compiled.parameter_vector({"k": 2.0}) == (2.0,)
+        with pytest.raises(ValueError, match="Dimensionality"):
+            compiled.parameter_vector({"k": "1 mL"})
+        with pytest.raises(ValueError, match="Unknown"):
+            compiled.parameter_vector({"K": 1.0})
+        with pytest.raises(ValueError, match="initial states"):
+            compiled.initial_state([1.0, 2.0])
+
+    def test_boluses_unsupported(self):
+        with pytest.raises(ValueError, match="Boluses"):
+            solver.solve(
+                None,
+                None,
+                model=modelspec.compile_spec(modelspec.GROWCHO),
+                feed_fn=feed,
+                temp_fn=temp,
+                boluses=[(24.0, {"Cglc": 10.0})],
+            )
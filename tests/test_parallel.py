@@ -0,0 +1,36 @@
+import numpy as np
+
+from insilicho import parallel
+
+CFG_DICT = {"parameters": {"K_lys": "0.05 1/h"}, "initial_conditions": {"V": 0.025}}
+
+
+def F(time):
+    return 0.003
+
+
+def T(time):
+    return 36.4
+
+
+class TestRunMany:
+    def test_results_independent_of_worker_count(self):
+        jobs = [parallel.Job(CFG_DICT, F, T) for _ in range(4)]
+
+        serial = {i: r for i, r, _ in parallel.run_many(jobs, 7, max_workers=1)}
+        pooled = {i: r for i, r, _ in parallel.run_many(jobs, 7, max_workers=2)}
+
+        assert sorted(serial) == list(range(4))
+        for i in range(4):
+            assert serial[i] == pooled[i]
+        # each job draws its own stream
+        assert serial[0]["Xv"] != serial[1]["Xv"]
+
+    def test_full_result_returned(self):
+        jobs = [parallel.Job(CFG_DICT, F, T, execute_kwargs={"sampling_stddev": 0.0})]
+
+        [(i, sampled, full_result)] = list(parallel.run_many(jobs, max_workers=1))
+
+        assert i == 0
+        assert full_result.info["message"] == "Integration successful."
+        np.testing.assert_allclose(sampled["V"][-1], full_result.state[-1, 8])
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from insilicho import parameters, profiles, run, solver
+
+
+class TestProfiles:
+    def test_piecewise_constant(self):
+        p = profiles.PiecewiseConstant([0, 24, 48], [0.0, 0.002, 0.004])
+
+        assert p(-1.0) == 0.0
+        assert p(24.0) == 0.002
+        assert p(47.9) == 0.002
+        assert p(100.0) == 0.004
+        np.testing.assert_array_equal(
+            p(np.array([-1.0, 24.0, 47.9, 100.0])), [0.0, 0.002, 0.002, 0.004]
+        )
+        np.testing.assert_array_equal(p.breakpoints, [24, 48])
+
+    def test_piecewise_linear(self):
+        p = profiles.PiecewiseLinear([0, 10], [36.0, 34.0])
+
+        assert p(5.0) == pytest.approx(35.0)
+        assert p(20.0) == 34.0
+        t = np.linspace(-5, 15, 21)
+        np.testing.assert_allclose(p(t), [p(float(ti)) for ti in t])
+        assert p.continuous
+
+    def test_setpoint_shift(self):
+        p = profiles.SetpointShift(36.5, [(120, 33.0)])
+
+        assert p(0.0) == 36.5
+        assert p(120.0) == 33.0
+        np.testing.assert_array_equal(p.breakpoints, [120])
+
+    def test_from_config_round_trip(self):
+        for p in [
+            profiles.PiecewiseConstant([0, 24], [0.0, 0.002]),
+            profiles.PiecewiseLinear([0, 10], [36.0, 34.0]),
+            profiles.SetpointShift(36.5, [(120, 33.0)]),
+        ]:
+            assert profiles.from_config(p.to_config()) == p
+            assert hash(profiles.from_config(p.to_config())) == hash(p)
+
+        assert profiles.from_config({"type": "constant", "value": 3})(50.0) == 3
+
+        with pytest.raises(ValueError):
+            profiles.from_config({"type": "spline"})
+
+    def test_hashable(self):
+        constant = profiles.PiecewiseConstant([0, 24], [0.0, 0.002])
+        linear = profiles.PiecewiseLinear([0, 24], [0.0, 0.002])
+        assert len({constant, profiles.PiecewiseConstant([0, 24], [0, 0.002])}) == 1
+        assert len({constant, linear}) == 2
+
+    def test_invalid_times_raise(self):
+        with pytest.raises(ValueError):
+            profiles.PiecewiseConstant([0, 0], [1, 2])
+
+
+class TestProfilesInSolver:
+    def test_temperature_shift_matches_plain_callable(self):
+        params = parameters.InputParameters()
+        ic = parameters.InitialConditions()
+        tspan = np.linspace(0, 240, 1000)
+        shift = profiles.SetpointShift(36.5, [(120, 33.0)])
+
+        state, state_vars, info = solver.solve(
+            params, ic, tspan=tspan, feed_fn=lambda t: 0.003, temp_fn=shift
+        )
+        expected, _, _ = solver.solve(
+            params,
+            ic,
+            tspan=tspan,
+            feed_fn=lambda t: 0.003,
+            temp_fn=lambda t: 36.5 if t < 120 else 33.0,
+            solver_hmax=0.01,
+        )
+
+        assert info["message"] == "Integration successful."
+        np.testing.assert_allclose(state[-1], expected[-1], rtol=1e-4)
+        np.testing.assert_array_equal(state_vars[:, 1], shift(tspan))
+
+    def test_growcho_profiles_from_config(self):
+        model = run.GrowCHO(
+            {
+                "parameters": {"K_lys": "0.05 1/h"},
+                "initial_conditions": {"V": 0.05},
+                "feed_profile": {"type": "constant", "value": 0.003},
+                "temp_profile": {"type": "setpoint_shift", "initial": 36.4},
+            },
+            feed_fn=None,
+            temp_fn=None,
+        )
+
+        model.execute()
+        assert model.full_result.state[-1, 8] == pytest.approx(0.05 + 0.003 * 288)
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from insilicho import parameters, profiles, reactor, solver
+
+FEED = profiles.PiecewiseConstant([0.0, 48.0], [0.0, 0.0005])
+TEMP = profiles.SetpointShift(36.5, [(120.0, 33.0)])
+IC = parameters.InitialConditions(V=0.025)
+T = np.linspace(0, 288, 289)
+
+
+def simulate(*vessels, feed_fns=FEED, temp_fns=TEMP):
+    return reactor.VesselArray(
+        vessels, feed_fns, temp_fns, initial_conditions=IC
+    ).simulate(T)
+
+
+class TestVessel:
+    def test_defaults(self):
+        vessel = reactor.Vessel()
+        assert vessel.on_full == "overflow"
+        assert vessel.harvest_volume == pytest.approx(0.125)
+
+    @pytest.mark.parametrize(
+        "kwargs, error",
+        [
+            ({"on_full": "spill"}, "Unknown on_full"),
+            ({"harvest_volume": 0.3}, "harvest_volume"),
+            ({"harvest_volume": 0.0}, "harvest_volume"),
+        ],
+    )
+    def test_invalid(self, kwargs, error):
+        with pytest.raises(ValueError, match=error):
+            reactor.Vessel(**kwargs)
+
+
+class TestVesselArray:
+    def test_below_volume_matches_solve(self):
+        result = simulate(reactor.Vessel(1.0))
+        state, state_vars, _ = solver.solve(
+            None, IC, tspan=T, feed_fn=FEED, temp_fn=TEMP
+        )
+        np.testing.assert_array_equal(result.state[0], state)
+        np.testing.assert_array_equal(result.state_vars[0], state_vars)
+        assert np.isnan(result.full_at[0]) and result.removed[0] == 0.0
+
+    def test_overflow(self):
+        result = simulate(reactor.Vessel(0.05), reactor.Vessel(1.0))
+        # 25 mL more at 0.5 mL/hr from 48 hrs on
+        assert result.full_at[0] == pytest.approx(98.0)
+        assert result.removed[0] == pytest.approx(0.0005 * (288 - 98))
+
+        V = result.state[0, :, 8]
+        np.testing.assert_allclose(V[T >= 98], 0.05, rtol=1e-7)
+        np.testing.assert_allclose(
+            result.state[0, T <= 98], result.state[1, T <= 98], rtol=1e-6
+        )
+        # feed keeps diluting the culture, at a higher rate than in the open vessel
+        Cglc = result.state[:, -1, 2]
+        assert Cglc[0] > Cglc[1]
+
+    def test_harvest(self):
+        vessel = reactor.Vessel(0.05, "harvest", harvest_volume=0.03)
+        result = simulate(vessel)
+        # refills from 30 to 50 mL take 40 hrs
+        np.testing.assert_allclose(result.harvest_times[0], [98, 138, 178, 218, 258])
+        assert result.removed[0] == pytest.approx(5 * 0.02)
+
+        V = result.state[0, :, 8]
+        assert V.max() <= 0.05 * (1 + 1e-7)
+        for t in result.harvest_times[0]:
+            assert V[T == t] == pytest.approx(0.03)
+        # concentrations are those of the culture drawn
+        before = solver.solve(None, IC, tspan=T[T <= 98], feed_fn=FEED, temp_fn=TEMP)[0]
+        np.testing.assert_allclose(result.state[0, 98, :8], before[-1, :8], rtol=1e-6)
+
+    def test_stop_feed(self):
+        result = simulate(reactor.Vessel(0.05, "stop_feed"))
+        F = result.state_vars[0, :, 0]
+        assert np.all(F[T >= 98] == 0.0) and np.all(F[(T >= 48) & (T < 98)] > 0)
+        np.testing.assert_allclose(result.state[0, T >= 98, 8], 0.05, rtol=1e-7)
+
+    def test_per_vessel_profiles(self):
+        feeds = [profiles.PiecewiseConstant([0.0], [rate]) for rate in (1e-4, 2e-4)]
+        temps = [profiles.PiecewiseConstant([0.0], [t]) for t in (36.0, 33.0)]
+        result = simulate(
+            reactor.Vessel(0.05), reactor.Vessel(0.05), feed_fns=feeds, temp_fns=temps
+        )
+        assert result.state.shape == (2, 289, 10)
+        np.testing.assert_allclose(result.full_at, [250.0, 125.0])
+        np.testing.assert_allclose(result.state_vars[:, 0, 1], [36.0, 33.0])
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="2 feed profiles for 1 vessels"):
+            reactor.VesselArray([reactor.Vessel()], [FEED, FEED], TEMP)
+        with pytest.raises(ValueError, match="above its volume"):
+            reactor.VesselArray(
+                [reactor.Vessel(0.02)], FEED, TEMP, initial_conditions=IC
+            )
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from insilicho import results, run
+
+
+@pytest.fixture
+def full_results(constant_feed: run.GrowCHO):
+    out = []
+    for seed in range(2):
+        model = run.GrowCHO(
+            {"parameters": {"K_lys": "0.05 1/h"}, "initial_conditions": {"V": 0.025}},
+            feed_fn=constant_feed.feed_fn,
+            temp_fn=constant_feed.temp_fn,
+            random_seed=seed,
+        )
+        model.execute(output="samples")
+        out.append(model.full_result)
+    return out
+
+
+class TestTrajectories:
+    def test_round_trip(self, full_results, tmp_path):
+        trajectories = results.Trajectories.from_results(full_results)
+        trajectories.save(str(tmp_path))
+        opened = results.Trajectories.open(str(tmp_path))
+
+        assert isinstance(opened.data, np.memmap)
+        assert len(opened) == 2
+        assert opened.names == results.NAMES
+        for i, result in enumerate(full_results):
+            np.testing.assert_array_equal(opened.run(i).state, result.state)
+            np.testing.assert_array_equal(opened.run(i).state_vars, result.state_vars)
+        np.testing.assert_array_equal(opened.t, full_results[0].t)
+
+    def test_columns_are_views(self, full_results, tmp_path):
+        trajectories = results.Trajectories.from_results(full_results, dtype=np.float32)
+        Xv = trajectories["Xv"]
+        assert Xv.shape == (2, len(full_results[0].t))
+        assert Xv.base is not None
+        np.testing.assert_allclose(Xv[1], full_results[1].state[:, 0], rtol=1e-6)
+
+    def test_write_to_disk(self, full_results, tmp_path):
+        trajectories = results.Trajectories.create(
+            str(tmp_path), 2, full_results[0].t, names=["Xv", "mu"]
+        )
+        for i, result in enumerate(full_results):
+            trajectories[i] = result
+        trajectories.flush()
+
+        opened = results.Trajectories.open(str(tmp_path))
+        assert opened.names == ["Xv", "mu"]
+        np.testing.assert_array_equal(opened["mu"][1], full_results[1].state_vars[:, 2])
+        assert opened.run(0).state.shape == (len(opened.t), 1)
+
+    def test_invalid(self, full_results):
+        with pytest.raises(ValueError):
+            results.Trajectories.empty(1, [0.0, 1.0], names=["Xv", "unknown"])
+
+        trajectories = results.Trajectories.empty(1, full_results[0].t[:-1])
+        with pytest.raises(ValueError):
+            trajectories[0] = full_results[0]
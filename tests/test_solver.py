@@ -1,6 +1,10 @@
+import dataclasses
+import functools
+
+import numpy as np
 import pytest
 
-from insilicho import run
+from insilicho import feeds, growth_model, parameters, run, solver
 
 
 class TestBolusFeed:
@@ -20,6 +24,72 @@ class TestBolusFeed:
         )  # CGlc
 
 
+class TestBolusEvents:
+    def test_bolus_events_match_bolus_feed(
+        self, bolus_events: run.GrowCHO, bolus_feed: run.GrowCHO
+    ):
+        bolus_events.execute(plot=False)
+        bolus_feed.execute(plot=False)
+
+        assert bolus_events.full_result.info["message"] == "Integration successful."
+        # tent functions smear each bolus over 0.2 hrs, Cgln is depleted in both
+        compared = [0, 1, 2, 4, 5, 6, 8]
+        np.testing.assert_allclose(
+            bolus_events.full_result.state[-1, compared],
+            bolus_feed.full_result.state[-1, compared],
+            rtol=0.015,
+        )
+        assert (
+            bolus_events.full_result.info["nfe"][-1]
+            < bolus_feed.full_result.info["nfe"][-1] / 3
+        )
+
+    def test_bolus_is_exact_jump(self):
+        params = parameters.InputParameters()
+        ic = parameters.InitialConditions(V=0.04)
+        tspan = np.array([0.0, 1.0, 2.0])
+
+        state, _, info = solver.solve(
+            params,
+            ic,
+            tspan=tspan,
+            feed_fn=lambda t: 0.0,
+            temp_fn=lambda t: 36.4,
+            boluses=[feeds.Bolus("1 hr", "10 mL", {"Cglc": 100.0})],
+        )
+
+        assert info["message"] == "Integration successful."
+        before, _, _ = solver.solve(
+            params,
+            ic,
+            tspan=tspan[:2],
+            feed_fn=lambda t: 0.0,
+            temp_fn=lambda t: 36.4,
+        )
+        V, Cglc, Cgln = before[-1, 8], before[-1, 2], before[-1, 3]
+        assert state[1, 8] == pytest.approx(V + 0.01)
+        assert state[1, 2] == pytest.approx((Cglc * V + 100.0 * 0.01) / (V + 0.01))
+        assert state[1, 3] == pytest.approx(Cgln * V / (V + 0.01))
+
+    @pytest.mark.parametrize("offset", [-3e-14, 3e-14])
+    def test_event_next_to_output_point(self, offset):
+        def halve_volume(state):
+            state = state.copy()
+            state[8] /= 2
+            return state
+
+        state, _, info = solver.solve(
+            None,
+            parameters.InitialConditions(V=0.04),
+            tspan=np.linspace(0, 4, 5),
+            feed_fn=lambda t: 0.0,
+            temp_fn=lambda t: 36.4,
+            events=[(2.0 + offset, halve_volume)],
+        )
+        assert info["message"] == "Integration successful."
+        np.testing.assert_allclose(state[:, 8], [0.04, 0.04, 0.02, 0.02, 0.02])
+
+
 class TestConstantFeed:
     def test_solver_with_constant_feed(self, constant_feed: run.GrowCHO):
         constant_feed.execute(plot=False)
@@ -55,3 +125,256 @@ class TestConstantFeed:
         assert model.initial_conditions.V == 50 / 1000
         final_V = model.full_result.state[-1, 8]
         assert final_V == pytest.approx(0.914)
+
+
+class TestKernel:
+    def test_kernel_matches_legacy_model(self):
+        def F(time):
+            return 0.003
+
+        def T(time):
+            return 36.4
+
+        params = parameters.InputParameters()
+        ic = parameters.InitialConditions()
+        tspan = np.linspace(0, 288, 2000)
+
+        state, state_vars, _ = solver.solve(
+            params, ic, tspan=tspan, feed_fn=F, temp_fn=T
+        )
+        legacy_state, legacy_state_vars, _ = solver.solve(
+            params, ic, model=growth_model.model, tspan=tspan, feed_fn=F, temp_fn=T
+        )
+
+        np.testing.assert_allclose(state, legacy_state, rtol=1e-6)
+        np.testing.assert_allclose(state_vars, legacy_state_vars, rtol=1e-6)
+
+
+class TestSolveBatch:
+    def test_batch_matches_individual_solves(self):
+        def F(time):
+            return 0.003
+
+        def T(time):
+            return 36.4
+
+        params = [
+            parameters.InputParameters(),
+            parameters.InputParameters(mu_max=0.05),
+            parameters.InputParameters(K_lys=0.05),
+        ]
+        ic = parameters.InitialConditions()
+        tspan = np.linspace(0, 288, 500)
+
+        state, state_vars, infodicts = solver.solve_batch(
+            params, ic, tspan=tspan, feed_fn=F, temp_fn=T
+        )
+
+        assert state.shape == (3, 500, 10)
+        assert state_vars.shape == (3, 500, 10)
+        assert len(infodicts) == 3
+        for i, p in enumerate(params):
+            expected_state, expected_state_vars, _ = solver.solve(
+                p, ic, tspan=tspan, feed_fn=F, temp_fn=T
+            )
+            np.testing.assert_allclose(state[i], expected_state, rtol=1e-12)
+            np.testing.assert_allclose(state_vars[i], expected_state_vars, rtol=1e-12)
+
+    def test_batch_with_per_member_profiles(self):
+        feeds = [lambda t: 0.001, lambda t: 0.003]
+        temps = [lambda t: 36.4, lambda t: 35.0]
+        ic = parameters.InitialConditions()
+        tspan = np.linspace(0, 48, 50)
+
+        state, state_vars, _ = solver.solve_batch(
+            [parameters.InputParameters()] * 2,
+            ic,
+            tspan=tspan,
+            feed_fn=feeds,
+            temp_fn=temps,
+        )
+
+        np.testing.assert_allclose(state_vars[:, :, 0], [[0.001] * 50, [0.003] * 50])
+        np.testing.assert_allclose(state_vars[:, :, 1], [[36.4] * 50, [35.0] * 50])
+
+    def test_mismatched_sizes_raise(self):
+        with pytest.raises(ValueError):
+            solver.solve_batch(
+                [parameters.InputParameters()] * 2,
+                [parameters.InitialConditions()] * 3,
+                feed_fn=lambda t: 0.0,
+                temp_fn=lambda t: 36.4,
+            )
+
+
+class TestMissingProfiles:
+    def test_raise(self):
+        with pytest.raises(ValueError, match="feed/temp model missing"):
+            solver.solve(None, None, feed_fn=lambda t: 0.0)
+        with pytest.raises(ValueError, match="feed/temp model missing"):
+            solver.solve_native(
+                parameters.InputParameters(),
+                parameters.InitialConditions(),
+                temp_fn=lambda t: 36.4,
+            )
+        with pytest.raises(ValueError, match="feed/temp model missing"):
+            solver.solve_batch(
+                [parameters.InputParameters()], parameters.InitialConditions()
+            )
+
+
+class TestMaxSteps:
+    def test_sparse_grid_needs_budget(self):
+        kwargs = dict(
+            tspan=[0.0, 288.0], feed_fn=lambda t: 0.001, temp_fn=lambda t: 36.4
+        )
+        with pytest.warns(Warning):
+            _, _, info = solver.solve(None, None, **kwargs)
+        assert info["message"] != "Integration successful."
+        assert info["nst"][-1] == 500
+
+        _, _, info = solver.solve(
+            None, None, max_steps=12 * solver.MAX_STEPS_PER_DAY, **kwargs
+        )
+        assert info["message"] == "Integration successful."
+
+
+class TestSolveNative:
+    def test_matches_solve_at_requested_times(self):
+        params = parameters.InputParameters()
+        ic = parameters.InitialConditions()
+        t_eval = np.linspace(0, 96, 9)
+        boluses = [feeds.Bolus(24.0 * i, 0.03) for i in range(1, 4)]
+        kwargs = dict(feed_fn=lambda t: 0.0, temp_fn=lambda t: 36.4, boluses=boluses)
+
+        t, state, state_vars, info = solver.solve_native(
+            params, ic, t_span=(0, 96), t_eval=t_eval, **kwargs
+        )
+        expected, _, _ = solver.solve(params, ic, tspan=t_eval, **kwargs)
+
+        assert info["message"] == "Integration successful."
+        assert np.all(np.diff(t) > 0)
+        assert state.shape == state_vars.shape == (len(t), 10)
+        assert len(info["nfe"]) == len(t) - 1
+        idx = np.searchsorted(t, t_eval)
+        np.testing.assert_array_equal(t[idx], t_eval)
+        # states at bolus times are those right after the bolus
+        np.testing.assert_allclose(state[idx], expected, rtol=1e-5, atol=1e-8)
+
+
+class TestSensitivities:
+    def test_match_finite_differences(self):
+        params = parameters.InputParameters()
+        ic = parameters.InitialConditions()
+        kwargs = dict(
+            tspan=np.linspace(0, 120, 121),
+            feed_fn=lambda t: 0.003,
+            temp_fn=lambda t: 36.4,
+            boluses=[feeds.Bolus(48.0, 0.03)],
+        )
+        names = ["mu_max", "K_lys", "Cglc_feed"]
+
+        state, _, info = solver.solve(params, ic, sensitivities=names, **kwargs)
+        expected_state, _, _ = solver.solve(params, ic, **kwargs)
+
+        assert info["sensitivity_params"] == names
+        assert info["sensitivities"].shape == (121, 10, 3)
+        np.testing.assert_allclose(state, expected_state, rtol=1e-6)
+        for k, name in enumerate(names):
+            h = 1e-4 * getattr(params, name)
+            plus, _, _ = solver.solve(
+                dataclasses.replace(params, **{name: getattr(params, name) + h}),
+                ic,
+                **kwargs,
+            )
+            minus, _, _ = solver.solve(
+                dataclasses.replace(params, **{name: getattr(params, name) - h}),
+                ic,
+                **kwargs,
+            )
+            expected = (plus - minus) / (2 * h)
+            # V does not depend on the parameters
+            np.testing.assert_allclose(
+                info["sensitivities"][:, :8, k],
+                expected[:, :8],
+                rtol=1e-4,
+                atol=1e-6 * np.abs(expected).max(),
+            )
+
+    def test_unknown_parameters(self):
+        with pytest.raises(ValueError):
+            solver.solve(
+                parameters.InputParameters(),
+                parameters.InitialConditions(),
+                tspan=np.linspace(0, 24, 10),
+                feed_fn=lambda t: 0.003,
+                temp_fn=lambda t: 36.4,
+                sensitivities=["Ndays"],
+            )
+
+
+class TestMethods:
+    @pytest.fixture
+    def problem(self):
+        return dict(
+            params=parameters.InputParameters(),
+            initial_conditions=parameters.InitialConditions(),
+            tspan=np.linspace(0, 96, 97),
+            feed_fn=lambda t: 0.003,
+            temp_fn=lambda t: 36.4,
+            boluses=[feeds.Bolus(48.0, 0.03)],
+        )
+
+    @pytest.mark.parametrize("method", solver.METHODS)
+    def test_methods_agree(self, problem, method):
+        expected, _, _ = solver.solve(**problem)
+        state, state_vars, info = solver.solve(
+            **problem, method=method, rtol=1e-8, atol=1e-8
+        )
+
+        assert info["message"] == "Integration successful."
+        assert state_vars.shape == state.shape
+        np.testing.assert_allclose(state[:, :4], expected[:, :4], rtol=1e-4)
+
+    def test_looser_tolerances_take_fewer_evaluations(self, problem):
+        _, _, tight = solver.solve(**problem, rtol=1e-10, atol=1e-10)
+        _, _, loose = solver.solve(**problem, rtol=1e-4, atol=1e-4)
+        assert loose["nfe"][-1] < tight["nfe"][-1]
+
+    def test_auto_measures_stiffness(self, problem):
+        # lactate starts at zero, where the model is stiff
+        _, _, info = solver.solve(**problem, method="auto")
+        assert info["method"] == "odeint"
+
+        problem["initial_conditions"] = dataclasses.replace(
+            problem["initial_conditions"], Clac=5.0, Camm=1.0, Cmab=0.1
+        )
+        problem["tspan"] = np.linspace(0, 12, 13)
+        _, _, info = solver.solve(**problem, method="auto")
+        assert info["method"] == "RK45"
+
+    def test_custom_integrator(self, problem):
+        calls = []
+
+        def integrator(*args, **kwargs):
+            calls.append(kwargs)
+            return solver._odeint(*args, **kwargs)
+
+        expected, _, _ = solver.solve(**problem, rtol=1e-6)
+        state, _, info = solver.solve(**problem, method=integrator, rtol=1e-6)
+
+        assert info["method"] == "integrator"
+        # one segment on either side of the bolus
+        assert calls == [{"rtol": 1e-6, "atol": solver.ATOL}] * 2
+        np.testing.assert_array_equal(state, expected)
+
+        _, _, info = solver.solve(
+            **problem, method=functools.partial(solver._odeint, mxstep=1000)
+        )
+        assert info["method"] == "partial"
+
+    def test_invalid(self, problem):
+        with pytest.raises(ValueError):
+            solver.solve(**problem, method="Euler")
+        with pytest.raises(ValueError):
+            solver.solve(**problem, method="rk4", sensitivities=["mu_max"])
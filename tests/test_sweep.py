@@ -0,0 +1,77 @@
+import copy
+
+import numpy as np
+import pytest
+
+from insilicho import profiles, run, sweep
+
+CFG_DICT = {"parameters": {"K_lys": "0.05 1/h"}, "initial_conditions": {"V": 0.025}}
+
+
+class TestDivergenceTime:
+    def test_piecewise_constant(self):
+        a = profiles.SetpointShift(36.5, [(120, 33.0)])
+        assert sweep.divergence_time(a, a) == np.inf
+        assert sweep.divergence_time(
+            a, profiles.SetpointShift(36.5, [(120, 33.0)])
+        ) == (np.inf)
+        assert sweep.divergence_time(
+            a, profiles.SetpointShift(36.5, [(144, 33.0)])
+        ) == (120)
+        assert sweep.divergence_time(a, profiles.SetpointShift(37.0)) == -np.inf
+
+    def test_piecewise_linear(self):
+        a = profiles.PiecewiseLinear([0, 24, 48], [0.0, 1.0, 1.0])
+        b = profiles.PiecewiseLinear([0, 24, 48], [0.0, 1.0, 2.0])
+        assert sweep.divergence_time(a, b) == 24
+
+    def test_unknown_callables(self):
+        def F(t):
+            return 0.003
+
+        assert sweep.divergence_time(F, F) == np.inf
+        assert sweep.divergence_time(F, lambda t: 0.003) == -np.inf
+        linear = profiles.PiecewiseLinear([0.0], [0.003])
+        constant = profiles.PiecewiseConstant([0.0], [0.003])
+        assert sweep.divergence_time(linear, constant) == -np.inf
+
+
+class TestExecuteShared:
+    def make(self, temp_fn, feed_fn=profiles.PiecewiseConstant([0, 48], [0.0, 0.003])):
+        return run.GrowCHO(CFG_DICT, feed_fn, temp_fn, boluses=[(24, 0.03)])
+
+    def test_matches_separate_runs(self):
+        runs = [
+            self.make(profiles.SetpointShift(36.4, [(24.0 * day, 33.0)]))
+            for day in [5, 6, 7]
+        ]
+        runs.append(self.make(profiles.SetpointShift(36.4)))
+        runs.append(
+            self.make(
+                profiles.SetpointShift(36.4),
+                profiles.PiecewiseConstant([0.0], [0.001]),
+            )
+        )
+
+        results = sweep.execute_shared(runs)
+
+        for grow_cho, result in zip(runs, results):
+            grow_cho = copy.deepcopy(grow_cho)
+            grow_cho.execute()
+            np.testing.assert_array_equal(result.t, grow_cho.full_result.t)
+            np.testing.assert_allclose(
+                result.state, grow_cho.full_result.state, rtol=1e-5, atol=1e-4
+            )
+            np.testing.assert_array_equal(
+                result.state_vars[:, :2], grow_cho.full_result.state_vars[:, :2]
+            )
+
+        # the first 5 days are integrated once for the temperature shifts
+        assert len({r.info["segments"][0] for r in results[:4]}) == 1
+        assert results[4].info["segments"][0] != results[0].info["segments"][0]
+
+    def test_runs_must_share_parameters(self):
+        runs = [self.make(profiles.SetpointShift(36.4)) for _ in range(2)]
+        runs[1].params.mu_max *= 2
+        with pytest.raises(ValueError):
+            sweep.execute_shared(runs)
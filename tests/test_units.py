@@ -0,0 +1,37 @@
+import pytest
+
+from insilicho import parameters, units
+
+
+class TestUnits:
+    @pytest.mark.parametrize(
+        "value, to_units",
+        [("0.05 1/h", "1/hr"), ("50 mL", "L"), ("300 K", "degC"), ("2 mmol/mL", "mM")],
+    )
+    def test_convert_matches_pint(self, value, to_units):
+        assert units.convert(value, to_units) == pytest.approx(
+            units.UNIT(value).to(to_units).magnitude, rel=1e-12
+        )
+
+    def test_offset_units(self):
+        assert units.convert("36 degC", "degC") == pytest.approx(36.0)
+        assert units.convert("97 degF", "degC") == pytest.approx(36.1111111111)
+        assert units.convert("36 degC", "K") == pytest.approx(309.15)
+
+    def test_conversions_are_memoized(self):
+        units.convert("40 mL", "L")
+        hits = units.affine.cache_info().hits
+        units.convert("41 mL", "L")
+        assert units.affine.cache_info().hits == hits + 1
+
+    def test_dimensionality_error(self):
+        with pytest.raises(ValueError):
+            units.convert("5 mL", "1/hr")
+
+        with pytest.raises(ValueError, match="K_lys"):
+            parameters.InputParameters(K_lys="5 mL")
+
+    def test_temperature_parameter_from_string(self):
+        assert parameters.InputParameters(T_optimal="310 K").T_optimal == (
+            pytest.approx(36.85)
+        )